@@ -11,6 +11,7 @@ from Modules.ToucanTTS.EnergyCalculator import EnergyCalculator
 from Modules.ToucanTTS.PitchCalculator import Parselmouth
 from Preprocessing.AudioPreprocessor import AudioPreprocessor
 from Preprocessing.TextFrontend import ArticulatoryCombinedTextFrontend
+from Preprocessing.VoiceActivityDetector import get_voice_activity_detector
 from Preprocessing.articulatory_features import get_feature_to_index_lookup
 from Utility.storage_config import MODEL_DIR
 from Utility.utils import float2pcm
@@ -30,16 +31,7 @@ class UtteranceCloner:
         self.device = device
         acoustic_checkpoint_path = hf_hub_download(cache_dir=MODEL_DIR, repo_id="Flux9665/ToucanTTS", filename="Aligner.pt")
         self.aligner_weights = torch.load(acoustic_checkpoint_path, map_location=device)["asr_model"]
-        torch.hub._validate_not_a_forked_repo = lambda a, b, c: True  # torch 1.9 has a bug in the hub loading, this is a workaround
-        # careful: assumes 16kHz or 8kHz audio
-        self.silero_model, utils = torch.hub.load(repo_or_dir='snakers4/silero-vad',
-                                                  model='silero_vad',
-                                                  force_reload=False,
-                                                  onnx=False,
-                                                  verbose=False)
-        (self.get_speech_timestamps, _, _, _, _) = utils
-        torch.set_grad_enabled(True)  # finding this issue was very infuriating: silero sets
-        # this to false globally during model loading rather than using inference_mode or no_grad
+        self.vad = get_voice_activity_detector(device=device)
         self.acoustic_model = Aligner()
         self.acoustic_model = self.acoustic_model.to(self.device)
         self.acoustic_model.load_state_dict(self.aligner_weights)
@@ -68,8 +60,7 @@ class UtteranceCloner:
             print('Something went wrong, the reference wave might be too short.')
             raise RuntimeError
 
-        with torch.inference_mode():
-            speech_timestamps = self.get_speech_timestamps(norm_wave, self.silero_model, sampling_rate=16000)
+        speech_timestamps = self.vad.speech_timestamps([norm_wave], sampling_rate=16000)[0]
         if len(speech_timestamps) == 0:
             speech_timestamps = [{'start': 0, 'end': len(norm_wave)}]
         start_silence = speech_timestamps[0]['start']
@@ -82,6 +82,25 @@ class Aligner(torch.nn.Module):
 
     @torch.inference_mode()
     def inference(self, features, tokens, save_img_for_debug=None, train=False, pathfinding="MAS", return_ctc=False):
+        pred_max, tokens, ctc_loss = self.alignment_scores(features, tokens, train=train, return_ctc=return_ctc)
+
+        # run monotonic alignment search
+        alignment_matrix = binarize_alignment(pred_max)
+
+        if save_img_for_debug is not None:
+            save_alignment_plot(alignment_matrix, phones=[self.tf.id_to_phone[index] for index in tokens], path=save_img_for_debug)
+
+        if return_ctc:
+            return alignment_matrix, ctc_loss
+        return alignment_matrix
+
+    @torch.inference_mode()
+    def alignment_scores(self, features, tokens, train=False, return_ctc=False):
+        """
+        The neural part of the inference: the scores of every token in every
+        frame, which the monotonic alignment search needs. Split off, so the
+        search can run somewhere else, e.g. in a pool of CPU workers.
+        """
         if not train:
             tokens_indexed = self.tf.text_vectors_to_id_sequence(text_vector=tokens)  # first we need to convert the articulatory vectors to IDs, so we can apply dijkstra or viterbi
             tokens = np.asarray(tokens_indexed)
@@ -89,69 +108,110 @@ class Aligner(torch.nn.Module):
             tokens = tokens.cpu().detach().numpy()
 
         pred = self(features.unsqueeze(0))
+        ctc_loss = None
         if return_ctc:
             ctc_loss = self.ctc_loss(pred.transpose(0, 1).log_softmax(2), torch.LongTensor(tokens), torch.LongTensor([len(pred[0])]),
                                      torch.LongTensor([len(tokens)])).item()
         pred = pred.squeeze().cpu().detach().numpy()
         pred_max = pred[:, tokens]
+        return pred_max, tokens, ctc_loss
 
-        # run monotonic alignment search
-        alignment_matrix = binarize_alignment(pred_max)
-
-        if save_img_for_debug is not None:
-            phones = list()
-            for index in tokens:
-                phones.append(self.tf.id_to_phone[index])
-            fig, ax = plt.subplots(nrows=1, ncols=1, figsize=(10, 5))
-
-            ax.imshow(alignment_matrix, interpolation='nearest', aspect='auto', origin="lower", cmap='cividis')
-            ax.set_ylabel("Mel-Frames")
-            ax.set_xticks(range(len(pred_max[0])))
-            ax.set_xticklabels(labels=phones)
-            ax.set_title("MAS Path")
-
-            plt.tight_layout()
-            fig.savefig(save_img_for_debug)
-            fig.clf()
-            plt.close()
-
-        if return_ctc:
-            return alignment_matrix, ctc_loss
-        return alignment_matrix
-
-
-def binarize_alignment(alignment_prob):
+    @torch.inference_mode()
+    def batched_alignment_scores(self, features, feature_lengths, tokens, return_ctc=False):
+        """
+        Same as alignment_scores, but for a padded batch of features [B, T, F]
+        and a list of token sequences (articulatory vectors without word
+        boundaries), all in one forward pass. The padding is set to zero after
+        every convolution, so it looks exactly like the zero padding that the
+        convolutions see at the end of a single utterance.
+        """
+        tokens = [token_sequence.numpy() for token_sequence in self.tf.text_vectors_to_id_sequences(tokens)]
+        frame_masks = make_non_pad_mask(feature_lengths).unsqueeze(-1).to(features.device)
+        x = features * frame_masks
+        for conv in self.convs:
+            x = conv(x) * frame_masks
+        x = pack_padded_sequence(x, feature_lengths.cpu(), batch_first=True, enforce_sorted=False)
+        x, _ = self.rnn1(x)
+        x, _ = self.rnn2(x)
+        x, _ = pad_packed_sequence(x, batch_first=True)
+        preds = self.proj(x)
+
+        pred_maxes = list()
+        ctc_losses = list()
+        for pred, feature_length, token_sequence in zip(preds, feature_lengths, tokens):
+            pred = pred[:feature_length].unsqueeze(0)
+            if return_ctc:
+                ctc_losses.append(self.ctc_loss(pred.transpose(0, 1).log_softmax(2), torch.LongTensor(token_sequence), torch.LongTensor([len(pred[0])]),
+                                                torch.LongTensor([len(token_sequence)])).item())
+            else:
+                ctc_losses.append(None)
+            pred_maxes.append(pred.squeeze(0).cpu().detach().numpy()[:, token_sequence])
+        return pred_maxes, tokens, ctc_losses
+
+
+def save_alignment_plot(alignment_matrix, phones, path):
+    fig, ax = plt.subplots(nrows=1, ncols=1, figsize=(10, 5))
+
+    ax.imshow(alignment_matrix, interpolation='nearest', aspect='auto', origin="lower", cmap='cividis')
+    ax.set_ylabel("Mel-Frames")
+    ax.set_xticks(range(len(alignment_matrix[0])))
+    ax.set_xticklabels(labels=phones)
+    ax.set_title("MAS Path")
+
+    plt.tight_layout()
+    fig.savefig(path)
+    fig.clf()
+    plt.close()
+
+
+def binarize_alignment(alignment_prob, feature_lengths=None, token_lengths=None):
     """
     # Implementation by:
     # https://github.com/NVIDIA/DeepLearningExamples/blob/master/PyTorch/SpeechSynthesis/FastPitch/fastpitch/alignment.py
     # https://github.com/NVIDIA/DeepLearningExamples/blob/master/PyTorch/SpeechSynthesis/FastPitch/fastpitch/attn_loss_function.py
 
     Binarizes alignment with MAS.
+
+    The dynamic programming runs over the frames, but updates all the
+    tokens of a frame at once. Also works on a padded batch [B, T, N]
+    with the lengths of the features and tokens of every item.
     """
     # assumes features x text
+    if alignment_prob.ndim == 2:
+        return binarize_alignment(alignment_prob[np.newaxis], feature_lengths=[alignment_prob.shape[0]], token_lengths=[alignment_prob.shape[1]])[0]
+    batch_size, max_feature_length, max_token_length = alignment_prob.shape
+    feature_lengths = np.asarray(feature_lengths if feature_lengths is not None else [max_feature_length] * batch_size, dtype=np.int64)
+    token_lengths = np.asarray(token_lengths if token_lengths is not None else [max_token_length] * batch_size, dtype=np.int64)
+    batch_indexes = np.arange(batch_size)
+
     opt = np.zeros_like(alignment_prob)
-    alignment_prob = alignment_prob + (np.abs(alignment_prob).max() + 1.0)  # make all numbers positive and add an offset to avoid log of 0 later
-    alignment_prob * alignment_prob * (1.0 / alignment_prob.max())  # normalize to (0,  1]
-    attn_map = np.log(alignment_prob)
-    attn_map[0, 1:] = -np.inf
+    attn_map = list()
+    for alignment_prob_of_item, feature_length, token_length in zip(alignment_prob, feature_lengths, token_lengths):
+        # the normalization only looks at the part of an item that isn't padding
+        alignment_prob_of_item = alignment_prob_of_item + (np.abs(alignment_prob_of_item[:feature_length, :token_length]).max() + 1.0)  # make all numbers positive and add an offset to avoid log of 0 later
+        alignment_prob_of_item * alignment_prob_of_item * (1.0 / alignment_prob_of_item.max())  # normalize to (0,  1]
+        attn_map.append(np.log(alignment_prob_of_item))
+    attn_map = np.stack(attn_map)
+    attn_map[:, 0, 1:] = -np.inf
     log_p = np.zeros_like(attn_map)
-    log_p[0, :] = attn_map[0, :]
+    log_p[:, 0, :] = attn_map[:, 0, :]
     prev_ind = np.zeros_like(attn_map, dtype=np.int64)
-    for i in range(1, attn_map.shape[0]):
-        for j in range(attn_map.shape[1]):  # for each text dim
-            prev_log = log_p[i - 1, j]
-            prev_j = j
-            if j - 1 >= 0 and log_p[i - 1, j - 1] >= log_p[i - 1, j]:
-                prev_log = log_p[i - 1, j - 1]
-                prev_j = j - 1
-            log_p[i, j] = attn_map[i, j] + prev_log
-            prev_ind[i, j] = prev_j
+    token_indexes = np.arange(max_token_length)
+    for i in range(1, max_feature_length):
+        prev_log = log_p[:, i - 1, :]
+        # coming from the previous token is preferred, if it's at least as likely as staying on the same token
+        prev_log_of_previous_token = np.concatenate([np.full((batch_size, 1), -np.inf, dtype=prev_log.dtype), prev_log[:, :-1]], axis=1)
+        from_previous_token = prev_log_of_previous_token >= prev_log
+        from_previous_token[:, 0] = False
+        log_p[:, i, :] = attn_map[:, i, :] + np.where(from_previous_token, prev_log_of_previous_token, prev_log)
+        prev_ind[:, i, :] = token_indexes - from_previous_token
     # now backtrack
-    curr_text_idx = attn_map.shape[1] - 1
-    for i in range(attn_map.shape[0] - 1, -1, -1):
-        opt[i, curr_text_idx] = 1
-        curr_text_idx = prev_ind[i, curr_text_idx]
-    opt[0, curr_text_idx] = 1
+    curr_text_idx = token_lengths - 1
+    for i in range(max_feature_length - 1, -1, -1):
+        in_item = i < feature_lengths
+        opt[batch_indexes[in_item], i, curr_text_idx[in_item]] = 1
+        curr_text_idx[in_item] = prev_ind[batch_indexes[in_item], i, curr_text_idx[in_item]]
+    opt[batch_indexes, 0, curr_text_idx] = 1
     return opt
 
 
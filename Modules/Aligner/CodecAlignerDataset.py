@@ -1,11 +1,10 @@
 import os
 import random
+import shutil
 
 import librosa
-import soundfile as sf
 import torch
 from speechbrain.pretrained import EncoderClassifier
-from torch.multiprocessing import Manager
 from torch.multiprocessing import Process
 from torch.utils.data import Dataset
 from torchaudio.transforms import Resample
@@ -13,9 +12,35 @@ from tqdm import tqdm
 
 from Preprocessing.EnCodecAudioPreprocessor import CodecAudioPreprocessor
 from Preprocessing.TextFrontend import ArticulatoryCombinedTextFrontend
+from Preprocessing.VoiceActivityDetector import get_voice_activity_detector
+from Preprocessing.VoiceActivityDetector import remove_silences
+from Utility.ShardedCache import ShardedCache
+from Utility.ShardedCache import ShardedCacheWriter
+from Utility.ShardedCache import merge_sharded_caches
+from Utility.ShardedCache import sharded_cache_exists
+from Utility.audio_archives import get_archive_member_signature
+from Utility.audio_archives import index_archives
+from Utility.audio_archives import read_audio
 from Utility.storage_config import MODEL_DIR
 
 
+def get_file_signature(path):
+    # size and modification time tell us whether a file changed since its features were added to a cache
+    try:
+        file_stats = os.stat(path)
+    except OSError:
+        try:
+            return get_archive_member_signature(path)  # files in archives change together with their archive
+        except OSError:
+            return None
+    return file_stats.st_size, file_stats.st_mtime_ns
+
+
+def aligner_cache_exists(cache_dir):
+    # caches of older versions are a single file, they get converted to the sharded format when they are loaded for the first time
+    return sharded_cache_exists(os.path.join(cache_dir, "aligner_train_cache")) or os.path.exists(os.path.join(cache_dir, "aligner_train_cache.pt"))
+
+
 class CodecAlignerDataset(Dataset):
 
     def __init__(self,
@@ -31,11 +56,13 @@ class CodecAlignerDataset(Dataset):
                  phone_input=False,
                  allow_unknown_symbols=False,
                  gpu_count=1,
-                 rank=0):
+                 rank=0,
+                 update_cache=False  # only process the files that are new or changed (by size and modification time) since the cache was built and drop the ones that are gone
+                 ):
 
         self.gpu_count = gpu_count
         self.rank = rank
-        if not os.path.exists(os.path.join(cache_dir, "aligner_train_cache.pt")) or rebuild_cache:
+        if not aligner_cache_exists(cache_dir) or rebuild_cache:
             self._build_dataset_cache(path_to_transcript_dict=path_to_transcript_dict,
                                       cache_dir=cache_dir,
                                       lang=lang,
@@ -52,18 +79,29 @@ class CodecAlignerDataset(Dataset):
         self.device = device
         self.cache_dir = cache_dir
         self.tf = ArticulatoryCombinedTextFrontend(language=self.lang, device=device)
-        cache = torch.load(os.path.join(self.cache_dir, "aligner_train_cache.pt"), map_location='cpu')
-        self.speaker_embeddings = cache[2]
-        self.filepaths = cache[3]
-        self.datapoints = cache[0]
+        if not sharded_cache_exists(os.path.join(self.cache_dir, "aligner_train_cache")):
+            self._convert_legacy_cache()
+        elif update_cache and not rebuild_cache:
+            self._update_dataset_cache(path_to_transcript_dict=path_to_transcript_dict,
+                                       cache_dir=cache_dir,
+                                       lang=lang,
+                                       loading_processes=loading_processes,
+                                       device=device,
+                                       min_len_in_seconds=min_len_in_seconds,
+                                       max_len_in_seconds=max_len_in_seconds,
+                                       verbose=verbose,
+                                       phone_input=phone_input,
+                                       allow_unknown_symbols=allow_unknown_symbols)
+        # the cache stays on the disk, items are only read when they are accessed
+        self.cache = ShardedCache(os.path.join(self.cache_dir, "aligner_train_cache"))
+        self.item_ids = list(self.cache.item_ids)
         if self.gpu_count > 1:
-            # we only keep a chunk of the dataset in memory to avoid redundancy. Which chunk, we figure out using the rank.
-            while len(self.datapoints) % self.gpu_count != 0:
-                self.datapoints.pop(-1)  # a bit unfortunate, but if you're using multiple GPUs, you probably have a ton of datapoints anyway.
-            chunksize = int(len(self.datapoints) / self.gpu_count)
-            self.datapoints = self.datapoints[chunksize * self.rank:chunksize * (self.rank + 1)]
-            self.speaker_embeddings = self.speaker_embeddings[chunksize * self.rank:chunksize * (self.rank + 1)]
-        print(f"Loaded an Aligner dataset with {len(self.datapoints)} datapoints from {cache_dir}.")
+            # every rank only uses a chunk of the dataset. Which chunk, we figure out using the rank.
+            while len(self.item_ids) % self.gpu_count != 0:
+                self.item_ids.pop(-1)  # a bit unfortunate, but if you're using multiple GPUs, you probably have a ton of datapoints anyway.
+            chunksize = int(len(self.item_ids) / self.gpu_count)
+            self.item_ids = self.item_ids[chunksize * self.rank:chunksize * (self.rank + 1)]
+        print(f"Loaded an Aligner dataset with {len(self.item_ids)} datapoints from {cache_dir}.")
 
     def _build_dataset_cache(self,
                              path_to_transcript_dict,
@@ -77,7 +115,8 @@ class CodecAlignerDataset(Dataset):
                              phone_input=False,
                              allow_unknown_symbols=False,
                              gpu_count=1,
-                             rank=0
+                             rank=0,
+                             append=False
                              ):
         if gpu_count != 1:
             import sys
@@ -87,33 +126,26 @@ class CodecAlignerDataset(Dataset):
         if type(path_to_transcript_dict) != dict:
             path_to_transcript_dict = path_to_transcript_dict()  # in this case we passed a function instead of the dict, so that the function isn't executed if not necessary.
         torch.multiprocessing.set_start_method('spawn', force=True)
-        torch.multiprocessing.set_sharing_strategy('file_system')
-        resource_manager = Manager()
-        self.path_to_transcript_dict = resource_manager.dict(path_to_transcript_dict)
-        key_list = list(self.path_to_transcript_dict.keys())
-        with open(os.path.join(cache_dir, "files_used.txt"), encoding='utf8', mode="w") as files_used_note:
+        key_list = list(path_to_transcript_dict.keys())
+        with open(os.path.join(cache_dir, "files_used.txt"), encoding='utf8', mode="a" if append else "w") as files_used_note:
             files_used_note.write(str(key_list))
+        loading_processes = min(loading_processes, len(key_list))
         fisher_yates_shuffle(key_list)
         # build cache
         print("... building dataset cache ...")
-        torch.hub._validate_not_a_forked_repo = lambda a, b, c: True  # torch 1.9 has a bug in the hub loading, this is a workaround
-        # careful: assumes 16kHz or 8kHz audio
-        _, _ = torch.hub.load(repo_or_dir='snakers4/silero-vad',  # make sure it gets downloaded during single-processing first, if it's not already downloaded
-                              model='silero_vad',
-                              force_reload=False,
-                              onnx=False,
-                              verbose=False)
-        self.result_pool = resource_manager.list()
-        # make processes
-        key_splits = list()
+        get_voice_activity_detector()  # make sure it gets downloaded during single-processing first, in case it has to be downloaded at all
+        EncoderClassifier.from_hparams(source="speechbrain/spkrec-ecapa-voxceleb",
+                                       savedir=os.path.join(MODEL_DIR, "Embedding", "speechbrain_speaker_embedding_ecapa"))  # same for the speaker embedding
+        index_archives(key_list)  # same for the indexes of the archives the audios are in, so the processes don't all build them at once
+        # every process writes the datapoints it finishes to its own part of the cache right away, so they don't have to be kept in memory and sent to the main process
+        part_paths = [os.path.join(cache_dir, "aligner_train_cache_parts", f"part_{i}") for i in range(loading_processes)]
         process_list = list()
         for i in range(loading_processes):
-            key_splits.append(
-                key_list[i * len(key_list) // loading_processes:(i + 1) * len(key_list) // loading_processes])
-        for key_split in key_splits:
+            key_split = key_list[i * len(key_list) // loading_processes:(i + 1) * len(key_list) // loading_processes]
             process_list.append(
                 Process(target=self._cache_builder_process,
-                        args=(key_split,
+                        args=({path: path_to_transcript_dict[path] for path in key_split},
+                              part_paths[i],
                               lang,
                               min_len_in_seconds,
                               max_len_in_seconds,
@@ -125,44 +157,66 @@ class CodecAlignerDataset(Dataset):
             process_list[-1].start()
         for process in process_list:
             process.join()
-        print("pooling results...")
-        pooled_datapoints = list()
-        for chunk in self.result_pool:
-            for datapoint in chunk:
-                pooled_datapoints.append(datapoint)  # unpack into a joint list
-        self.result_pool = pooled_datapoints
-        del pooled_datapoints
-        print("converting text to tensors...")
-        text_tensors = [torch.ShortTensor(x[0]) for x in self.result_pool]  # turn everything back to tensors (had to turn it to np arrays to avoid multiprocessing issues)
-        print("converting speech to tensors...")
-        speech_tensors = [torch.ShortTensor(x[1]) for x in self.result_pool]
-        print("converting waves to tensors...")
-        norm_waves = [torch.Tensor(x[2]) for x in self.result_pool]
-        print("unpacking file list...")
-        filepaths = [x[3] for x in self.result_pool]
-        del self.result_pool
-        self.datapoints = list(zip(text_tensors, speech_tensors))
-        del text_tensors
-        del speech_tensors
-        print("done!")
-
-        # add speaker embeddings
-        self.speaker_embeddings = list()
-        speaker_embedding_func_ecapa = EncoderClassifier.from_hparams(source="speechbrain/spkrec-ecapa-voxceleb",
-                                                                      run_opts={"device": str(device)},
-                                                                      savedir=os.path.join(MODEL_DIR, "Embedding", "speechbrain_speaker_embedding_ecapa"))
-        with torch.inference_mode():
-            for wave in tqdm(norm_waves):
-                self.speaker_embeddings.append(speaker_embedding_func_ecapa.encode_batch(wavs=wave.to(device).unsqueeze(0)).squeeze().cpu())
-
-        # save to cache
-        if len(self.datapoints) == 0:
+        unfinished_parts = [part_path for process, part_path in zip(process_list, part_paths) if process.exitcode != 0 or not sharded_cache_exists(part_path)]
+        if len(unfinished_parts) > 0:
+            # the files of an unfinished part are neither in the cache nor skipped, so they must not end up in skipped_files.pt as if they had been looked at
+            shutil.rmtree(os.path.join(cache_dir, "aligner_train_cache_parts"), ignore_errors=True)
+            raise RuntimeError(f"{len(unfinished_parts)} of the {loading_processes} processes that build the cache in {cache_dir} did not finish, the cache was left unchanged.")
+        print("merging the parts of the cache...")
+        number_of_new_datapoints = merge_sharded_caches(os.path.join(cache_dir, "aligner_train_cache"), part_paths, append=append)
+        shutil.rmtree(os.path.join(cache_dir, "aligner_train_cache_parts"), ignore_errors=True)
+        if number_of_new_datapoints == 0 and not append:
+            shutil.rmtree(os.path.join(cache_dir, "aligner_train_cache"))  # an empty cache should not count as existing
             raise RuntimeError  # something went wrong and there are no datapoints
-        torch.save((self.datapoints, None, self.speaker_embeddings, filepaths),
-                   os.path.join(cache_dir, "aligner_train_cache.pt"))
+
+        # we also remember the files that were not used (e.g. too long or unknown symbols), so an update doesn't process them again
+        skipped_files = load_skipped_files(cache_dir) if append else dict()
+        used_files = set(ShardedCache(os.path.join(cache_dir, "aligner_train_cache")).metadata.get("filepath", list()))
+        for path in key_list:
+            if path not in used_files:
+                skipped_files[path] = get_file_signature(path)
+        torch.save(skipped_files, os.path.join(cache_dir, "aligner_train_cache", "skipped_files.pt"))
+
+    def _update_dataset_cache(self, path_to_transcript_dict, cache_dir, **build_arguments):
+        if type(path_to_transcript_dict) != dict:
+            path_to_transcript_dict = path_to_transcript_dict()
+        cache = ShardedCache(os.path.join(cache_dir, "aligner_train_cache"))
+        current_signatures = {path: get_file_signature(path) for path in path_to_transcript_dict}
+        processed_files = {cache.metadata["filepath"][item_id]: (item_id, cache.metadata["file_signature"][item_id]) for item_id in cache.item_ids}
+        skipped_files = load_skipped_files(cache_dir)
+
+        outdated_item_ids = [item_id for path, (item_id, signature) in processed_files.items() if path not in current_signatures or current_signatures[path] != signature]
+        new_path_to_transcript_dict = dict()
+        for path, transcript in path_to_transcript_dict.items():
+            if path in processed_files and processed_files[path][1] == current_signatures[path]:
+                continue  # already in the cache and unchanged
+            if path in skipped_files and skipped_files[path] == current_signatures[path]:
+                continue  # we already decided not to use this one
+            new_path_to_transcript_dict[path] = transcript
+        print(f"Updating the aligner cache in {cache_dir}: removing {len(outdated_item_ids)} outdated datapoints and processing {len(new_path_to_transcript_dict)} new or changed files.")
+
+        if len(outdated_item_ids) > 0:
+            cache.remove(outdated_item_ids)
+        if len(new_path_to_transcript_dict) > 0:
+            self._build_dataset_cache(path_to_transcript_dict=new_path_to_transcript_dict, cache_dir=cache_dir, append=True, **build_arguments)
+
+    def _convert_legacy_cache(self):
+        print("converting the aligner cache to the sharded format...")
+        datapoints, _, speaker_embeddings, filepaths = torch.load(os.path.join(self.cache_dir, "aligner_train_cache.pt"), map_location='cpu')
+        token_tensors = self.tf.text_vectors_to_id_sequences([datapoint[0] for datapoint in datapoints])
+        cache_writer = ShardedCacheWriter(os.path.join(self.cache_dir, "aligner_train_cache"))
+        for (text, codes), tokens, speaker_embedding, filepath in zip(datapoints, token_tensors, speaker_embeddings, filepaths):
+            cache_writer.append(text=text,
+                                tokens=tokens,
+                                codes=codes if codes.size()[1] == 24 else codes.transpose(0, 1),  # the codes are stored as [length, 24]
+                                speaker_embedding=speaker_embedding,
+                                filepath=filepath,
+                                file_signature=get_file_signature(filepath))  # we assume that the files did not change since the old cache was built
+        cache_writer.close()
 
     def _cache_builder_process(self,
-                               path_list,
+                               transcripts,
+                               part_path,
                                lang,
                                min_len,
                                max_len,
@@ -170,145 +224,151 @@ class CodecAlignerDataset(Dataset):
                                device,
                                phone_input,
                                allow_unknown_symbols):
-        process_internal_dataset_chunk = list()
-        torch.hub._validate_not_a_forked_repo = lambda a, b, c: True  # torch 1.9 has a bug in the hub loading, this is a workaround
-        # careful: assumes 16kHz or 8kHz audio
-        silero_model, utils = torch.hub.load(repo_or_dir='snakers4/silero-vad',
-                                             model='silero_vad',
-                                             force_reload=False,
-                                             onnx=False,
-                                             verbose=False)
-        (get_speech_timestamps,
-         save_audio,
-         read_audio,
-         VADIterator,
-         collect_chunks) = utils
-        torch.set_grad_enabled(True)  # finding this issue was very infuriating: silero sets
-        # this to false globally during model loading rather than using inference mode or no_grad
-        silero_model = silero_model.to(device)
-        silence = torch.zeros([16000 // 8]).to(device)
-        tf = ArticulatoryCombinedTextFrontend(language=lang, device=device)
-        _, sr = sf.read(path_list[0])
+        path_list = list(transcripts.keys())
+        cache_writer = ShardedCacheWriter(part_path)
+        speaker_embedding_func_ecapa = EncoderClassifier.from_hparams(source="speechbrain/spkrec-ecapa-voxceleb",
+                                                                      run_opts={"device": str(device)},
+                                                                      savedir=os.path.join(MODEL_DIR, "Embedding", "speechbrain_speaker_embedding_ecapa"))
+        vad = get_voice_activity_detector(device=device)
+        tf = ArticulatoryCombinedTextFrontend(language=lang, device=device, use_g2p_cache=True)
+        _, sr = read_audio(path_list[0])
         assumed_sr = sr
         ap = CodecAudioPreprocessor(input_sr=assumed_sr, device=device)
         resample = Resample(orig_freq=assumed_sr, new_freq=16000).to(device)
 
-        for path in tqdm(path_list):
-            if self.path_to_transcript_dict[path].strip() == "":
-                continue
+        path_to_phones = dict()
+        if not phone_input:
+            # phonemizing all transcripts in one go is much faster than doing it one by one in the loop below
+            paths_with_text = [path for path in path_list if transcripts[path].strip() != ""]
             try:
-                wave, sr = sf.read(path)
-            except:
-                print(f"Problem with an audio file: {path}")
-                continue
-
-            if len(wave.shape) > 1:  # oh no, we found a stereo audio!
-                if len(wave[0]) == 2:  # let's figure out whether we need to switch the axes
-                    wave = wave.transpose()  # if yes, we switch the axes.
-            wave = librosa.to_mono(wave)
-
-            if sr != assumed_sr:
-                assumed_sr = sr
-                ap = CodecAudioPreprocessor(input_sr=assumed_sr, device=device)
-                resample = Resample(orig_freq=assumed_sr, new_freq=16000).to(device)
-                print(f"{path} has a different sampling rate --> adapting the codec processor")
+                path_to_phones = dict(zip(paths_with_text, tf.get_phone_strings([transcripts[path] for path in paths_with_text],
+                                                                                include_eos_symbol=True,
+                                                                                for_feature_extraction=True)))
+            except (ValueError, KeyError):
+                pass  # some transcript can't be phonemized, so we go one by one in the loop below and skip the problematic ones
 
-            try:
-                norm_wave = resample(torch.tensor(wave).float().to(device))
-            except ValueError:
-                continue
-            dur_in_seconds = len(norm_wave) / 16000
-            if not (min_len <= dur_in_seconds <= max_len):
-                if verbose:
-                    print(f"Excluding {path} because of its duration of {round(dur_in_seconds, 2)} seconds.")
-                continue
-            with torch.inference_mode():
-                speech_timestamps = get_speech_timestamps(norm_wave, silero_model, sampling_rate=16000)
-            try:
-                silence_timestamps = invert_segments(speech_timestamps, len(norm_wave))
-                for silence_timestamp in silence_timestamps:
-                    begin = silence_timestamp['start']
-                    end = silence_timestamp['end']
-                    norm_wave = torch.cat([norm_wave[:begin], torch.zeros([end - begin], device=device), norm_wave[end:]])
-                result = norm_wave[speech_timestamps[0]['start']:speech_timestamps[-1]['end']]
-            except IndexError:
-                print("Audio might be too short to cut silences from front and back.")
-                continue
-            norm_wave = torch.cat([silence, result, silence])
-
-            # raw audio preprocessing is done
-            transcript = self.path_to_transcript_dict[path]
+        vad_batch_size = 16  # the VAD scores this many files at once
+        progress_bar = tqdm(total=len(path_list))
+        for batch_start in range(0, len(path_list), vad_batch_size):
+            loaded_waves = list()
+            for path in path_list[batch_start:batch_start + vad_batch_size]:
+                progress_bar.update(1)
+                if transcripts[path].strip() == "":
+                    continue
+                try:
+                    wave, sr = read_audio(path)
+                except:
+                    print(f"Problem with an audio file: {path}")
+                    continue
 
-            try:
+                if len(wave.shape) > 1:  # oh no, we found a stereo audio!
+                    if len(wave[0]) == 2:  # let's figure out whether we need to switch the axes
+                        wave = wave.transpose()  # if yes, we switch the axes.
+                wave = librosa.to_mono(wave)
+
+                if sr != assumed_sr:
+                    assumed_sr = sr
+                    ap = CodecAudioPreprocessor(input_sr=assumed_sr, device=device)
+                    resample = Resample(orig_freq=assumed_sr, new_freq=16000).to(device)
+                    print(f"{path} has a different sampling rate --> adapting the codec processor")
+
+                try:
+                    norm_wave = resample(torch.tensor(wave).float().to(device))
+                except ValueError:
+                    continue
+                dur_in_seconds = len(norm_wave) / 16000
+                if not (min_len <= dur_in_seconds <= max_len):
+                    if verbose:
+                        print(f"Excluding {path} because of its duration of {round(dur_in_seconds, 2)} seconds.")
+                    continue
+                loaded_waves.append((path, norm_wave))
+
+            speech_timestamps_of_batch = vad.speech_timestamps([norm_wave for _, norm_wave in loaded_waves], sampling_rate=16000)
+            prepared_datapoints = list()
+            for (path, norm_wave), speech_timestamps in zip(loaded_waves, speech_timestamps_of_batch):
                 try:
-                    cached_text = tf.string_to_tensor(transcript, handle_missing=False, input_phonemes=phone_input).squeeze(0).cpu().numpy()
+                    result = remove_silences(norm_wave, speech_timestamps)
+                except IndexError:
+                    print("Audio might be too short to cut silences from front and back.")
+                    continue
+                norm_wave = torch.nn.functional.pad(result, (16000 // 8, 16000 // 8))  # an eighth of a second of silence on both sides
+
+                # raw audio preprocessing is done
+                if path in path_to_phones:
+                    transcript, transcript_is_phones = path_to_phones[path], True
+                else:
+                    transcript, transcript_is_phones = transcripts[path], phone_input
+
+                try:
+                    try:
+                        cached_text = tf.string_to_tensor(transcript, handle_missing=False, input_phonemes=transcript_is_phones).squeeze(0).cpu().numpy()
+                    except KeyError:
+                        cached_text = tf.string_to_tensor(transcript, handle_missing=True, input_phonemes=transcript_is_phones).squeeze(0).cpu().numpy()
+                        if not allow_unknown_symbols:
+                            continue  # we skip sentences with unknown symbols
+                except ValueError:
+                    # this can happen for Mandarin Chinese, when the syllabification of pinyin doesn't work. In that case, we just skip the sample.
+                    continue
                 except KeyError:
-                    cached_text = tf.string_to_tensor(transcript, handle_missing=True, input_phonemes=phone_input).squeeze(0).cpu().numpy()
-                    if not allow_unknown_symbols:
-                        continue  # we skip sentences with unknown symbols
-            except ValueError:
-                # this can happen for Mandarin Chinese, when the syllabification of pinyin doesn't work. In that case, we just skip the sample.
-                continue
-            except KeyError:
-                # this can happen for Mandarin Chinese, when the syllabification of pinyin doesn't work. In that case, we just skip the sample.
-                continue
-
-            cached_speech = ap.audio_to_codebook_indexes(audio=norm_wave, current_sampling_rate=16000).transpose(0, 1).cpu().numpy()
-            process_internal_dataset_chunk.append([cached_text,
-                                                   cached_speech,
-                                                   norm_wave.cpu().detach().numpy(),
-                                                   path])
-        self.result_pool.append(process_internal_dataset_chunk)
+                    # this can happen for Mandarin Chinese, when the syllabification of pinyin doesn't work. In that case, we just skip the sample.
+                    continue
+
+                cached_tokens = tf.text_vectors_to_ids(torch.ShortTensor(cached_text))
+                prepared_datapoints.append((cached_text, norm_wave, path, cached_tokens[cached_tokens != -1].numpy()))
+
+            # the codec encodes all the waves of the batch that made it this far together
+            codes_of_batch = ap.audios_to_codebook_indexes([norm_wave for _, norm_wave, _, _ in prepared_datapoints], current_sampling_rate=16000)
+            for (cached_text, norm_wave, path, cached_tokens), codes in zip(prepared_datapoints, codes_of_batch):
+                with torch.inference_mode():
+                    speaker_embedding = speaker_embedding_func_ecapa.encode_batch(wavs=norm_wave.unsqueeze(0)).squeeze().cpu()
+                cache_writer.append(text=torch.ShortTensor(cached_text),
+                                    tokens=torch.LongTensor(cached_tokens),  # the articulatory features converted to IDs, so this doesn't need to happen every time an item is accessed
+                                    codes=codes.transpose(0, 1).short(),
+                                    speaker_embedding=speaker_embedding,
+                                    filepath=path,
+                                    file_signature=get_file_signature(path))
+        progress_bar.close()
+        if tf.g2p_cache is not None:
+            tf.g2p_cache.flush()  # worker processes don't run exit handlers
+        cache_writer.close()
 
     def __getitem__(self, index):
-        text_vector = self.datapoints[index][0]
-        tokens = self.tf.text_vectors_to_id_sequence(text_vector=text_vector)
-        tokens = torch.LongTensor(tokens)
+        datapoint = self.cache.get(self.item_ids[index])
+        tokens = datapoint["tokens"]
         token_len = torch.LongTensor([len(tokens)])
 
-        codes = self.datapoints[index][1]
-        if codes.size()[0] != 24:  # no clue why this is sometimes the case
+        codes = datapoint["codes"]
+        if codes.size()[0] != 24:  # the codes are stored as [length, 24]
             codes = codes.transpose(0, 1)
 
         return tokens, \
             token_len, \
             codes, \
             None, \
-            self.speaker_embeddings[index]
+            datapoint["speaker_embedding"]
+
+    def get_lengths(self):
+        # in frames of the spectrogram that is computed from the decoded codes (320 samples per codec frame, 256 per spectrogram frame)
+        return [length * 320 // 256 + 1 for length in self.cache.get_lengths("codes", self.item_ids)]
 
     def __len__(self):
-        return len(self.datapoints)
+        return len(self.item_ids)
 
     def remove_samples(self, list_of_samples_to_remove):
+        item_ids_to_remove = [self.item_ids[remove_id] for remove_id in list_of_samples_to_remove]
         for remove_id in sorted(list_of_samples_to_remove, reverse=True):
-            self.datapoints.pop(remove_id)
-            self.speaker_embeddings.pop(remove_id)
-            self.filepaths.pop(remove_id)
-        torch.save((self.datapoints, None, self.speaker_embeddings, self.filepaths),
-                   os.path.join(self.cache_dir, "aligner_train_cache.pt"))
+            self.item_ids.pop(remove_id)
+        self.cache.remove(item_ids_to_remove)  # only the index is rewritten, the data stays where it is
         print("Dataset updated!")
 
 
+def load_skipped_files(cache_dir):
+    if not os.path.exists(os.path.join(cache_dir, "aligner_train_cache", "skipped_files.pt")):
+        return dict()
+    return torch.load(os.path.join(cache_dir, "aligner_train_cache", "skipped_files.pt"))
+
+
 def fisher_yates_shuffle(lst):
     for i in range(len(lst) - 1, 0, -1):
         j = random.randint(0, i)
         lst[i], lst[j] = lst[j], lst[i]
-
-
-def invert_segments(segments, total_duration):
-    if not segments:
-        return [{'start': 0, 'end': total_duration}]
-
-    inverted_segments = []
-    previous_end = 0
-
-    for segment in segments:
-        start = segment['start']
-        if previous_end < start:
-            inverted_segments.append({'start': previous_end, 'end': start})
-        previous_end = segment['end']
-
-    if previous_end < total_duration:
-        inverted_segments.append({'start': previous_end, 'end': total_duration})
-
-    return inverted_segments
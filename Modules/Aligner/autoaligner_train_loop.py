@@ -12,6 +12,8 @@ from Modules.Aligner.Aligner import Aligner
 from Modules.Aligner.Reconstructor import Reconstructor
 from Preprocessing.AudioPreprocessor import AudioPreprocessor
 from Preprocessing.EnCodecAudioPreprocessor import CodecAudioPreprocessor
+from Utility.FrameBudgetBatchSampler import FrameBudgetBatchSampler
+from Utility.FrameBudgetBatchSampler import get_lengths
 
 
 def collate_and_pad(batch):
@@ -35,7 +37,8 @@ def train_loop(train_dataset,
                use_reconstruction=True,
                gpu_count=1,
                rank=0,
-               steps_per_checkpoint=None):
+               steps_per_checkpoint=None,
+               frames_per_batch=None):
     """
     Args:
         resume: whether to resume from the most recent checkpoint
@@ -48,13 +51,12 @@ def train_loop(train_dataset,
         batch_size: How many elements should be loaded at once
         debug_img_path: where to put images of the training progress if desired
         use_reconstruction: whether to use the auxiliary reconstruction procedure/loss, which can make the alignment sharper
+        frames_per_batch: if given, batches are filled with utterances of similar length up to this many spectrogram frames (including padding) instead of having batch_size utterances
     """
     os.makedirs(save_directory, exist_ok=True)
     torch.multiprocessing.set_sharing_strategy('file_system')
     torch.multiprocessing.set_start_method('spawn', force=True)
 
-    if steps_per_checkpoint is None:
-        steps_per_checkpoint = len(train_dataset) // batch_size
     ap = CodecAudioPreprocessor(input_sr=-1, device=device)  # only used to transform features into continuous matrices
     spectrogram_extractor = AudioPreprocessor(input_sr=16000, output_sr=16000, device=device)
 
@@ -80,8 +82,13 @@ def train_loop(train_dataset,
             find_unused_parameters=True,
         ).module
         torch.distributed.barrier()
-    train_sampler = torch.utils.data.RandomSampler(train_dataset)
-    batch_sampler_train = torch.utils.data.BatchSampler(train_sampler, batch_size, drop_last=True)
+    if frames_per_batch is not None:
+        batch_sampler_train = FrameBudgetBatchSampler(get_lengths(train_dataset), frames_per_batch=frames_per_batch, gpu_count=gpu_count)
+    else:
+        train_sampler = torch.utils.data.RandomSampler(train_dataset)
+        batch_sampler_train = torch.utils.data.BatchSampler(train_sampler, batch_size, drop_last=True)
+    if steps_per_checkpoint is None:
+        steps_per_checkpoint = len(batch_sampler_train)
 
     train_loader = DataLoader(dataset=train_dataset,
                               num_workers=0,  # unfortunately necessary for big data due to mmap errors
@@ -118,18 +125,12 @@ def train_loop(train_dataset,
             tokens_len = batch[1].to(device)
             speaker_embeddings = batch[4].to(device)
 
-            mels = list()
-            mel_lengths = list()
-            for datapoint in batch[2]:
-                with torch.inference_mode():
-                    # extremely unfortunate that we have to do this over here, but multiprocessing and this don't go together well
-                    speech = ap.indexes_to_audio(datapoint.int().to(device))
-                    mel = spectrogram_extractor.audio_to_mel_spec_tensor(speech, explicit_sampling_rate=16000).transpose(0, 1).cpu()
-                speech_len = torch.LongTensor([len(mel)])
-                mels.append(mel.clone())
-                mel_lengths.append(speech_len)
+            with torch.inference_mode():
+                # extremely unfortunate that we have to do this over here, but multiprocessing and this don't go together well
+                mels = ap.indexes_to_mel_specs(batch[2], spectrogram_extractor)  # the whole batch is decoded in one forward pass
+            mels = [mel.clone() for mel in mels]
             mel = pad_sequence(mels, batch_first=True).to(device)
-            mel_len = torch.stack(mel_lengths).squeeze(1).to(device)
+            mel_len = torch.LongTensor([len(mel) for mel in mels]).to(device)
 
             pred = asr_model(mel, mel_len)
 
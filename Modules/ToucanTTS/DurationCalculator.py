@@ -6,6 +6,8 @@ import matplotlib.pyplot as plt
 
 import torch
 
+from Utility.utils import make_non_pad_mask
+
 
 class DurationCalculator(torch.nn.Module):
 
@@ -13,10 +15,16 @@ class DurationCalculator(torch.nn.Module):
         super().__init__()
 
     @torch.no_grad()
-    def forward(self, att_ws, vis=None):
+    def forward(self, att_ws, vis=None, feature_lengths=None):
         """
         Convert alignment matrix to durations.
+
+        Also works on a padded batch of alignment matrices [B, T, N],
+        in which case feature_lengths tells which frames are padding.
         """
+        if att_ws.dim() == 3:
+            frame_masks = make_non_pad_mask(feature_lengths, device=att_ws.device) if feature_lengths is not None else torch.ones(att_ws.shape[:2], dtype=torch.bool, device=att_ws.device)
+            return (torch.nn.functional.one_hot(att_ws.argmax(-1), num_classes=att_ws.shape[2]) * frame_masks.unsqueeze(-1)).sum(1)
         if vis is not None:
             plt.figure(figsize=(8, 4))
             plt.imshow(att_ws.cpu().numpy(), interpolation='nearest', aspect='auto', origin="lower")
@@ -26,5 +34,23 @@ class DurationCalculator(torch.nn.Module):
             plt.savefig(vis)
             plt.close()
         # calculate duration from 2d alignment matrix
-        durations = torch.stack([att_ws.argmax(-1).eq(i).sum() for i in range(att_ws.shape[1])])
+        durations = torch.bincount(att_ws.argmax(-1), minlength=att_ws.shape[1])
         return durations.view(-1)
+
+
+def insert_word_boundary_durations(durations, is_word_boundary, text_lengths=None):
+    """
+    The aligner doesn't see word boundaries, so they get a duration of 0
+    inserted at their positions. Works for a single sequence of durations
+    with the word boundary mask of its text, as well as for a padded batch
+    [B, N] with the masks [B, M] and the lengths of the texts.
+    """
+    if durations.dim() == 1:
+        durations_with_word_boundaries = durations.new_zeros(len(is_word_boundary))
+        durations_with_word_boundaries[~is_word_boundary] = durations
+        return durations_with_word_boundaries
+    text_masks = make_non_pad_mask(text_lengths, device=durations.device) if text_lengths is not None else torch.ones_like(is_word_boundary)
+    token_lengths = (text_masks & ~is_word_boundary).sum(1)
+    durations_with_word_boundaries = durations.new_zeros(is_word_boundary.shape)
+    durations_with_word_boundaries[text_masks & ~is_word_boundary] = durations[make_non_pad_mask(token_lengths, device=durations.device)]
+    return durations_with_word_boundaries
@@ -6,6 +6,7 @@ import torch
 import torch.nn.functional as F
 
 from Modules.GeneralLayers.STFT import STFT
+from Utility.utils import average_by_duration
 from Utility.utils import pad_list
 
 
@@ -58,7 +59,9 @@ class EnergyCalculator(torch.nn.Module):
 
         # (Optional): Average by duration to calculate token-wise energy
         if self.use_token_averaged_energy:
-            energy = [self._average_by_duration(e[:el].view(-1), d, text) for e, el, d in zip(energy, energy_lengths, durations)]
+            if isinstance(energy, list):
+                energy = pad_list(energy, 0.0)
+            energy = self._average_by_duration(energy, durations, text, x_lengths=energy_lengths)
             energy_lengths = durations_lengths
 
         # Padding
@@ -72,9 +75,8 @@ class EnergyCalculator(torch.nn.Module):
         # Return with the shape (B, T, 1)
         return energy.unsqueeze(-1), energy_lengths
 
-    def _average_by_duration(self, x, d, text=None):
-        d_cumsum = F.pad(d.cumsum(dim=0), (1, 0))
-        x_avg = [x[start:end].mean() if len(x[start:end]) != 0 else x.new_tensor(0.0) for start, end in zip(d_cumsum[:-1], d_cumsum[1:])]
+    def _average_by_duration(self, x, d, text=None, x_lengths=None):
+        x_avg = average_by_duration(x, d, x_lengths=x_lengths)
 
         # find tokens that are not phoneme and set energy to 0
         # while this makes sense, it make sit harder to model, so we leave this out
@@ -83,7 +85,7 @@ class EnergyCalculator(torch.nn.Module):
         #        if vector[get_feature_to_index_lookup()["phoneme"]] == 0:
         #            x_avg[i] = torch.tensor(0.0, device=x.device)
 
-        return torch.stack(x_avg)
+        return x_avg
 
     @staticmethod
     def _adjust_num_frames(x, num_frames):
@@ -2,6 +2,7 @@ import os.path
 
 import torch
 
+from Preprocessing.TextFrontend import get_iso_codes_to_ids
 from Preprocessing.multilinguality.create_distance_lookups import CacheCreator
 from Utility.utils import load_json_from_path
 
@@ -27,7 +28,7 @@ class LanguageEmbeddingSpaceStructureLoss(torch.nn.Module):
             for _, value in values.items():
                 self.largest_value_map_dist = max(self.largest_value_map_dist, value)
 
-        self.iso_codes_to_ids = load_json_from_path("Preprocessing/multilinguality/iso_lookup.json")[-1]
+        self.iso_codes_to_ids = get_iso_codes_to_ids()
         self.ids_to_iso_codes = {v: k for k, v in self.iso_codes_to_ids.items()}
 
     def forward(self, language_ids, language_embeddings):
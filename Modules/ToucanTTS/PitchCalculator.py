@@ -10,6 +10,8 @@ import torch
 import torch.nn.functional as F
 from scipy.interpolate import interp1d
 
+from Utility.utils import average_by_duration
+
 
 class Parselmouth(torch.nn.Module):
     """
@@ -17,8 +19,12 @@ class Parselmouth(torch.nn.Module):
     """
 
     def __init__(self, fs=16000, n_fft=1024, hop_length=256, f0min=40, f0max=600, use_token_averaged_f0=True,
-                 use_continuous_f0=True, use_log_f0=False, reduction_factor=1):
+                 use_continuous_f0=True, use_log_f0=False, reduction_factor=1,
+                 f0_estimator="parselmouth"  # "yin" uses the batched tensor implementation below instead, which is much faster, but not exactly the same
+                 ):
         super().__init__()
+        assert f0_estimator in ["parselmouth", "yin"]
+        self.f0_estimator = f0_estimator
         self.fs = fs
         self.n_fft = n_fft
         self.hop_length = hop_length
@@ -38,13 +44,18 @@ class Parselmouth(torch.nn.Module):
     def get_parameters(self):
         return dict(fs=self.fs, n_fft=self.n_fft, hop_length=self.hop_length, f0min=self.f0min, f0max=self.f0max,
                     use_token_averaged_f0=self.use_token_averaged_f0, use_continuous_f0=self.use_continuous_f0, use_log_f0=self.use_log_f0,
-                    reduction_factor=self.reduction_factor)
+                    reduction_factor=self.reduction_factor, f0_estimator=self.f0_estimator)
 
     def forward(self, input_waves, input_waves_lengths=None, feats_lengths=None, durations=None,
-                durations_lengths=None, norm_by_average=True, text=None):
+                durations_lengths=None, norm_by_average=True, text=None,
+                frame_level_f0=None  # F0 of every frame (0 where unvoiced), if it has already been estimated for the whole batch, e.g. with yin on the GPU
+                ):
 
         # F0 extraction
-        pitch = self._calculate_f0(input_waves[0])
+        if frame_level_f0 is None:
+            pitch = self._calculate_f0(input_waves[0])
+        else:
+            pitch = self._postprocess_f0(frame_level_f0[0].cpu().numpy().astype(np.double), input_waves)
 
         # Adjust length to match with the feature sequences
         pitch = self._adjust_num_frames(pitch, feats_lengths[0]).view(-1)
@@ -60,9 +71,15 @@ class Parselmouth(torch.nn.Module):
         return pitch.unsqueeze(-1), pitch_lengths
 
     def _calculate_f0(self, input):
-        x = input.cpu().numpy().astype(np.double)
-        snd = parselmouth.Sound(values=x, sampling_frequency=self.fs)
-        f0 = snd.to_pitch(time_step=self.hop_length / self.fs, pitch_floor=self.f0min, pitch_ceiling=self.f0max).selected_array['frequency']
+        if self.f0_estimator == "yin":
+            f0 = yin(input.unsqueeze(0), fs=self.fs, hop_length=self.hop_length, f0min=self.f0min, f0max=self.f0max)[0].cpu().numpy().astype(np.double)
+        else:
+            x = input.cpu().numpy().astype(np.double)
+            snd = parselmouth.Sound(values=x, sampling_frequency=self.fs)
+            f0 = snd.to_pitch(time_step=self.hop_length / self.fs, pitch_floor=self.f0min, pitch_ceiling=self.f0max).selected_array['frequency']
+        return self._postprocess_f0(f0, input)
+
+    def _postprocess_f0(self, f0, input):
         if self.use_continuous_f0:
             f0 = self._convert_to_continuous_f0(f0)
         if self.use_log_f0:
@@ -102,10 +119,8 @@ class Parselmouth(torch.nn.Module):
         return f0
 
     def _average_by_duration(self, x, d, text=None):
-        d_cumsum = F.pad(d.cumsum(dim=0), (1, 0))
-        x_avg = [
-            x[start:end].masked_select(x[start:end].gt(0.0)).mean(dim=0) if len(x[start:end].masked_select(x[start:end].gt(0.0))) != 0 else x.new_tensor(0.0)
-            for start, end in zip(d_cumsum[:-1], d_cumsum[1:])]
+        # unvoiced frames have a pitch of 0 and are left out of the average
+        x_avg = average_by_duration(x, d, only_positive=True)
 
         # find tokens that are not voiced and set pitch to 0
         # while this makes sense, it makes it harder for the model to learn, so we leave this out now.
@@ -114,4 +129,102 @@ class Parselmouth(torch.nn.Module):
         #        if vector[get_feature_to_index_lookup()["voiced"]] == 0:
         #            x_avg[i] = torch.tensor(0.0, device=x.device)
 
-        return torch.stack(x_avg)
+        return x_avg
+
+
+def yin(waves, wave_lengths=None, fs=16000, hop_length=256, f0min=40, f0max=600, threshold=0.15, silence_threshold=0.03):
+    """
+    Batched F0 estimation with YIN (de Cheveigné and Kawahara, 2002),
+    computed with tensor operations only, so a whole padded batch of
+    waves [B, samples] is processed at once on any device. The frames
+    are centered on multiples of the hop length, like in the STFT.
+    Returns [B, frames] with 0 for unvoiced and silent frames.
+    """
+    if wave_lengths is None:
+        wave_lengths = torch.full((waves.size(0),), waves.size(1), dtype=torch.long)
+    wave_lengths = torch.as_tensor(wave_lengths, device=waves.device).view(-1)
+    waves = waves.float()
+    max_lag = math.ceil(fs / f0min)
+    min_lag = math.floor(fs / f0max)
+    window_length = max_lag  # the difference function of a lag is summed over this many samples
+    frame_length = window_length + max_lag + 1
+
+    padded_waves = F.pad(waves, (frame_length // 2, frame_length))
+    number_of_frames = waves.size(1) // hop_length + 1
+    frames = padded_waves.unfold(1, frame_length, hop_length)[:, :number_of_frames]  # [B, frames, frame_length]
+
+    # difference function d(lag) = energy of the window + energy of the shifted window - 2 * cross correlation, cross correlation with an FFT
+    fft_size = 2 ** math.ceil(math.log2(frame_length + window_length))
+    cross_correlation = torch.fft.irfft(torch.fft.rfft(frames, n=fft_size) * torch.fft.rfft(frames[..., :window_length], n=fft_size).conj(), n=fft_size)[..., :max_lag + 2]
+    cumulative_energy = F.pad(frames.square().cumsum(dim=-1), (1, 0))
+    lags = torch.arange(max_lag + 2, device=waves.device)
+    shifted_window_energy = cumulative_energy[..., lags + window_length] - cumulative_energy[..., lags]
+    difference = (cumulative_energy[..., window_length:window_length + 1] + shifted_window_energy - 2 * cross_correlation).clamp(min=0.0)
+
+    # cumulative mean normalized difference
+    cumulative_difference = difference[..., 1:].cumsum(dim=-1)
+    normalized_difference = torch.ones_like(difference)
+    normalized_difference[..., 1:] = torch.where(cumulative_difference > 0, difference[..., 1:] * lags[1:] / cumulative_difference.clamp(min=1e-12), 1.0)
+
+    # the period is the first local minimum that is below the threshold
+    candidate_lags = torch.arange(max(min_lag, 1), max_lag + 1, device=waves.device)
+    is_candidate = (normalized_difference[..., candidate_lags] < threshold) & (normalized_difference[..., candidate_lags] <= normalized_difference[..., candidate_lags + 1])
+    voiced = is_candidate.any(dim=-1)
+    lag = candidate_lags[is_candidate.int().argmax(dim=-1)]
+
+    # parabolic interpolation around the minimum for a period with sub-sample precision
+    before = normalized_difference.gather(-1, (lag - 1).unsqueeze(-1)).squeeze(-1)
+    at = normalized_difference.gather(-1, lag.unsqueeze(-1)).squeeze(-1)
+    after = normalized_difference.gather(-1, (lag + 1).unsqueeze(-1)).squeeze(-1)
+    curvature = before - 2 * at + after
+    shift = torch.where(curvature > 0, (before - after) / (2 * curvature.clamp(min=1e-12)), 0.0).clamp(min=-1.0, max=1.0)
+    f0 = fs / (lag + shift)
+
+    # frames that are much quieter than the loudest part of their wave count as silence, frames after the end of a wave are padding
+    peak_of_wave = waves.abs().amax(dim=-1, keepdim=True)
+    peak_of_frame = frames[..., max_lag // 2:max_lag // 2 + window_length + 1].abs().amax(dim=-1)
+    not_silent = peak_of_frame >= silence_threshold * peak_of_wave
+    in_wave = torch.arange(number_of_frames, device=waves.device).unsqueeze(0) < (wave_lengths // hop_length + 1).unsqueeze(-1)
+    voiced = voiced & not_silent & in_wave & (f0 >= f0min) & (f0 <= f0max)
+    return torch.where(voiced, f0, 0.0)
+
+
+if __name__ == '__main__':
+    import scipy.signal
+
+    # yin has to agree with Parselmouth on synthetic utterances with vibrato, formants and silent gaps: where both call a frame voiced,
+    # no frame may be off by more than 20%, and the voicing decisions may differ on at most 15% of the frames (mostly at the edges of
+    # voiced regions, which the continuous F0 interpolation smooths over)
+    random_generator = np.random.default_rng(0)
+    fs = 16000
+    waves = list()
+    for _ in range(10):
+        time_axis = np.arange(int(random_generator.uniform(1, 4) * fs)) / fs
+        f0_curve = random_generator.uniform(80, 280) * (1 + 0.15 * np.sin(2 * np.pi * random_generator.uniform(0.3, 2) * time_axis))
+        wave = scipy.signal.sawtooth(2 * np.pi * np.cumsum(f0_curve) / fs)
+        for formant in random_generator.uniform([500, 1200, 2400], [900, 2000, 3200]):
+            b, a = scipy.signal.iirpeak(formant, 5, fs)
+            wave = scipy.signal.lfilter(b, a, wave) + 0.3 * wave
+        for _ in range(3):
+            gap_start = random_generator.integers(0, len(wave) - 3000)
+            wave[gap_start:gap_start + random_generator.integers(1000, 3000)] = 0.0
+        waves.append(torch.tensor(wave / np.abs(wave).max() * 0.8, dtype=torch.float32))
+
+    batched_f0 = yin(torch.nn.utils.rnn.pad_sequence(waves, batch_first=True), wave_lengths=[len(wave) for wave in waves], fs=fs)
+    largest_deviation = 0.0
+    disagreeing_frames = 0
+    total_frames = 0
+    for index, wave in enumerate(waves):
+        yin_f0 = yin(wave.unsqueeze(0), fs=fs)[0]
+        assert torch.allclose(batched_f0[index, :len(yin_f0)], yin_f0, atol=1e-2, rtol=1e-4), "batching changes the F0"
+        assert (batched_f0[index, len(yin_f0):] == 0).all(), "padding has to be unvoiced"
+        yin_f0 = yin_f0.numpy()
+        parselmouth_f0 = parselmouth.Sound(values=wave.numpy().astype(np.double), sampling_frequency=fs).to_pitch(time_step=256 / fs, pitch_floor=40, pitch_ceiling=600).selected_array['frequency']
+        parselmouth_f0 = Parselmouth._adjust_num_frames(torch.tensor(parselmouth_f0), len(yin_f0)).numpy()  # aligned the same way as for the features
+        both_voiced = (parselmouth_f0 > 0) & (yin_f0 > 0)
+        largest_deviation = max(largest_deviation, np.abs(yin_f0[both_voiced] / parselmouth_f0[both_voiced] - 1).max())
+        disagreeing_frames += np.sum((parselmouth_f0 > 0) != (yin_f0 > 0))
+        total_frames += len(yin_f0)
+    print(f"largest deviation from Parselmouth: {largest_deviation:.1%}, voicing decisions that differ: {disagreeing_frames / total_frames:.1%}")
+    assert largest_deviation <= 0.2
+    assert disagreeing_frames / total_frames <= 0.15
@@ -0,0 +1,160 @@
+import collections
+import os
+import pickle
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+
+from Modules.ToucanTTS.TTSDataset import TTSDataset
+from Modules.ToucanTTS.TTSDataset import get_chunk_of_rank
+from Utility.ShardedCache import sharded_cache_exists
+
+
+class TTSCorpusIndex:
+    """
+    One index over the TTS caches of many corpora, saved in a single
+    file. For every corpus it records the amount of datapoints, their
+    lengths, the language and the speaker of every datapoint, so a
+    training run over hundreds of corpora does not have to open each
+    of their caches to set up its datasets and samplers.
+
+    The caches themselves are only opened when a datapoint of them is
+    accessed. At most max_open_datasets of them stay open per process,
+    the one that was used the longest time ago is closed first, so the
+    memory needed for the indexes of the caches does not grow with the
+    amount of corpora.
+
+    The speaker of a datapoint is not stored in the caches, so the
+    directory that contains the audio file stands in for it, which is
+    how most corpora are organized.
+    """
+
+    def __init__(self, index_path, max_open_datasets=64):
+        self.index_path = index_path
+        self.max_open_datasets = max_open_datasets
+        self.corpora = dict()
+        if os.path.exists(index_path):
+            with open(index_path, "rb") as index_file:
+                self.corpora = pickle.load(index_file)
+        self.changed = False
+        self.opened_datasets = collections.OrderedDict()
+
+    def __getstate__(self):
+        # the workers of a data loader open the caches they need themselves
+        state = self.__dict__.copy()
+        state["opened_datasets"] = collections.OrderedDict()
+        return state
+
+    def get_dataset(self, cache_dir, lang, gpu_count=1, rank=0):
+        """
+        A dataset over the existing TTS cache in cache_dir, that only
+        opens the cache once a datapoint is accessed. If the cache is
+        new or has changed since it was indexed, only its index is read.
+        """
+        cache_dir = os.path.abspath(cache_dir)
+        if not sharded_cache_exists(os.path.join(cache_dir, "tts_train_cache")):
+            TTSDataset(None, None, cache_dir=cache_dir, lang=lang, verbose=False)  # converts a cache of an older version to the sharded format
+        fingerprint = _get_fingerprint(cache_dir)
+        if cache_dir not in self.corpora or self.corpora[cache_dir]["fingerprint"] != fingerprint:
+            self.corpora[cache_dir] = _index_corpus(cache_dir, fingerprint)
+            self.changed = True
+        if self.corpora[cache_dir]["lang"] != lang:
+            self.corpora[cache_dir]["lang"] = lang
+            self.changed = True
+        return LazyTTSDataset(self, cache_dir, lang=lang, gpu_count=gpu_count, rank=rank)
+
+    def save(self):
+        if not self.changed:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+        with open(f"{self.index_path}.{os.getpid()}.tmp", "wb") as index_file:  # multiple ranks might save at the same time
+            pickle.dump(self.corpora, index_file)
+        os.replace(f"{self.index_path}.{os.getpid()}.tmp", self.index_path)
+        self.changed = False
+
+    def print_summary(self, cache_dirs=None):
+        """
+        Prints how many corpora, datapoints and speakers there are per
+        language, for the given corpora (by default all in the index).
+        """
+        summary = dict()
+        for cache_dir in (cache_dirs if cache_dirs is not None else self.corpora):
+            corpus = self.corpora[os.path.abspath(cache_dir)]
+            corpora, datapoints, speakers = summary.get(corpus["lang"], (0, 0, 0))
+            summary[corpus["lang"]] = (corpora + 1, datapoints + len(corpus["lengths"]), speakers + len(corpus["speakers"]))
+        for lang, (corpora, datapoints, speakers) in sorted(summary.items()):
+            print(f"{lang}: {datapoints} datapoints of {speakers} speakers in {corpora} corpora")
+
+    def get_speakers(self, cache_dir):
+        """
+        The speaker of every datapoint of the corpus, as a position in
+        the list of speakers of the corpus, and that list.
+        """
+        corpus = self.corpora[os.path.abspath(cache_dir)]
+        return corpus["speaker_of_datapoint"], corpus["speakers"]
+
+    def _open(self, cache_dir, lang, gpu_count, rank):
+        key = (cache_dir, gpu_count, rank)
+        if key in self.opened_datasets:
+            self.opened_datasets.move_to_end(key)
+            return self.opened_datasets[key]
+        dataset = TTSDataset(None, None, cache_dir=cache_dir, lang=lang, gpu_count=gpu_count, rank=rank, verbose=False)
+        if len(dataset) != len(get_chunk_of_rank(self.corpora[cache_dir]["lengths"], gpu_count=gpu_count, rank=rank)):
+            raise RuntimeError(f"The TTS cache in {cache_dir} has changed since the corpus index was created. Please restart the training, so the index gets updated.")
+        self.opened_datasets[key] = dataset
+        if len(self.opened_datasets) > self.max_open_datasets:
+            self.opened_datasets.popitem(last=False)
+        return dataset
+
+
+class LazyTTSDataset(Dataset):
+    """
+    Behaves like the TTSDataset of a cache, but its length and the
+    lengths of its datapoints come from a TTSCorpusIndex, the cache is
+    only opened when a datapoint is accessed.
+    """
+
+    def __init__(self, corpus_index, cache_dir, lang, gpu_count=1, rank=0):
+        self.corpus_index = corpus_index
+        self.cache_dir = cache_dir
+        self.lang = lang
+        self.gpu_count = gpu_count
+        self.rank = rank
+        self.lengths = get_chunk_of_rank(corpus_index.corpora[cache_dir]["lengths"], gpu_count=gpu_count, rank=rank)
+
+    def get_datapoint(self, index):
+        return self._get_dataset().get_datapoint(index)
+
+    def get_lengths(self):
+        return self.lengths.tolist()
+
+    def get_precomputed_mel(self, index):
+        return self._get_dataset().get_precomputed_mel(index)
+
+    def __getitem__(self, index):
+        return self._get_dataset()[index]
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def _get_dataset(self):
+        return self.corpus_index._open(self.cache_dir, lang=self.lang, gpu_count=self.gpu_count, rank=self.rank)
+
+
+def _get_fingerprint(cache_dir):
+    # the index of a cache is rewritten whenever datapoints are added or removed
+    stats = os.stat(os.path.join(cache_dir, "tts_train_cache", "index.pt"))
+    return stats.st_size, stats.st_mtime_ns
+
+
+def _index_corpus(cache_dir, fingerprint):
+    index = torch.load(os.path.join(cache_dir, "tts_train_cache", "index.pt"), map_location="cpu")
+    item_ids = index["item_ids"] if index["item_ids"] is not None else range(sum(index["shard_sizes"]))
+    speaker_lookup = dict()
+    speaker_of_datapoint = [speaker_lookup.setdefault(os.path.dirname(index["metadata"]["filepath"][item_id]), len(speaker_lookup)) for item_id in item_ids]
+    return {"fingerprint"         : fingerprint,
+            "lang"                : None,
+            "lengths"             : np.array([index["metadata"]["feature_length"][item_id] for item_id in item_ids], dtype=np.int32),
+            "speaker_of_datapoint": np.array(speaker_of_datapoint, dtype=np.int32),
+            "speakers"            : list(speaker_lookup)}
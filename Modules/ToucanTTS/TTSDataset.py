@@ -1,19 +1,31 @@
 import os
+import pickle
+import shutil
 import statistics
+import zlib
 
 import torch
+from torch.nn.utils.rnn import pad_sequence
 from torch.utils.data import Dataset
 from tqdm import tqdm
 
 from Modules.Aligner.Aligner import Aligner
+from Modules.Aligner.Aligner import binarize_alignment
+from Modules.Aligner.Aligner import save_alignment_plot
 from Modules.Aligner.CodecAlignerDataset import CodecAlignerDataset
+from Modules.Aligner.CodecAlignerDataset import get_file_signature
 from Modules.ToucanTTS.DurationCalculator import DurationCalculator
+from Modules.ToucanTTS.DurationCalculator import insert_word_boundary_durations
 from Modules.ToucanTTS.EnergyCalculator import EnergyCalculator
 from Modules.ToucanTTS.PitchCalculator import Parselmouth
+from Modules.ToucanTTS.PitchCalculator import yin
 from Preprocessing.AudioPreprocessor import AudioPreprocessor
 from Preprocessing.EnCodecAudioPreprocessor import CodecAudioPreprocessor
 from Preprocessing.TextFrontend import get_language_id
 from Preprocessing.articulatory_features import get_feature_to_index_lookup
+from Utility.ShardedCache import ShardedCache
+from Utility.ShardedCache import ShardedCacheWriter
+from Utility.ShardedCache import sharded_cache_exists
 
 
 class TTSDataset(Dataset):
@@ -32,12 +44,16 @@ class TTSDataset(Dataset):
                  save_imgs=False,
                  gpu_count=1,
                  rank=0,
-                 annotate_silences=False):
+                 annotate_silences=False,
+                 update_cache=False,  # only process the files that are new or changed (by size and modification time) since the cache was built and drop the ones that are gone
+                 pitch_estimator="parselmouth",  # "yin" estimates the pitch of whole batches at once on the device, which is much faster for large caches
+                 precompute_mels=False,  # store the spectrograms next to the dataset cache, so training doesn't have to decode the codec indexes in every step. Needs about 32kB of disk space per second of audio.
+                 verbose=True
+                 ):
         self.cache_dir = cache_dir
         self.device = device
-        self.pttd = path_to_transcript_dict
         os.makedirs(cache_dir, exist_ok=True)
-        if not os.path.exists(os.path.join(cache_dir, "tts_train_cache.pt")) or rebuild_cache:
+        if not tts_cache_exists(cache_dir) or rebuild_cache or update_cache:
             self._build_dataset_cache(path_to_transcript_dict=path_to_transcript_dict,
                                       acoustic_checkpoint_path=acoustic_checkpoint_path,
                                       cache_dir=cache_dir,
@@ -51,19 +67,31 @@ class TTSDataset(Dataset):
                                       save_imgs=save_imgs,
                                       gpu_count=gpu_count,
                                       rank=rank,
-                                      annotate_silences=annotate_silences)
+                                      annotate_silences=annotate_silences,
+                                      update_cache=update_cache,
+                                      pitch_estimator=pitch_estimator)
         self.cache_dir = cache_dir
         self.gpu_count = gpu_count
         self.rank = rank
         self.language_id = get_language_id(lang)
-        self.datapoints = torch.load(os.path.join(self.cache_dir, "tts_train_cache.pt"), map_location='cpu')
-        if self.gpu_count > 1:
-            # we only keep a chunk of the dataset in memory to avoid redundancy. Which chunk, we figure out using the rank.
-            while len(self.datapoints) % self.gpu_count != 0:
-                self.datapoints.pop(-1)  # a bit unfortunate, but if you're using multiple GPUs, you probably have a ton of datapoints anyway.
-            chunksize = int(len(self.datapoints) / self.gpu_count)
-            self.datapoints = self.datapoints[chunksize * self.rank:chunksize * (self.rank + 1)]
-        print(f"Loaded a TTS dataset with {len(self.datapoints)} datapoints from {cache_dir}.")
+        if not sharded_cache_exists(os.path.join(self.cache_dir, "tts_train_cache")):
+            self._convert_legacy_cache()
+        # the cache stays on the disk, items are only read when they are accessed. So the workers of a data loader don't need their own copy of the dataset.
+        self.cache = ShardedCache(os.path.join(self.cache_dir, "tts_train_cache"))
+        if precompute_mels and self.gpu_count == 1:
+            self._update_mel_cache(device=device)
+        self.item_ids = get_chunk_of_rank(list(self.cache.item_ids), gpu_count=self.gpu_count, rank=self.rank)
+        self.mel_cache = None
+        self.mel_item_ids = [None] * len(self.item_ids)
+        if sharded_cache_exists(os.path.join(self.cache_dir, "tts_mel_cache")):
+            # datapoints that have no precomputed spectrogram (e.g. because the cache has been updated since) get None and are decoded during training
+            self.mel_cache = ShardedCache(os.path.join(self.cache_dir, "tts_mel_cache"))
+            item_id_lookup = {self.mel_cache.metadata["key"][item_id]: item_id for item_id in self.mel_cache.item_ids}
+            self.mel_item_ids = [item_id_lookup.get(self._get_mel_cache_key(item_id)) for item_id in self.item_ids]
+            if verbose:
+                print(f"Found precomputed spectrograms for {len(self.mel_item_ids) - self.mel_item_ids.count(None)} of the datapoints.")
+        if verbose:
+            print(f"Loaded a TTS dataset with {len(self.item_ids)} datapoints from {cache_dir}.")
 
     def _build_dataset_cache(self,
                              path_to_transcript_dict,
@@ -79,12 +107,14 @@ class TTSDataset(Dataset):
                              save_imgs=False,
                              gpu_count=1,
                              rank=0,
-                             annotate_silences=False):
+                             annotate_silences=False,
+                             update_cache=False,
+                             pitch_estimator="parselmouth"):
         if gpu_count != 1:
             import sys
             print("Please run the feature extraction using only a single GPU. Multi-GPU is only supported for training.")
             sys.exit()
-        if not os.path.exists(os.path.join(cache_dir, "aligner_train_cache.pt")) or rebuild_cache:
+        if not sharded_cache_exists(os.path.join(cache_dir, "aligner_train_cache")) or rebuild_cache or update_cache:
             CodecAlignerDataset(path_to_transcript_dict=path_to_transcript_dict,
                                 cache_dir=cache_dir,
                                 lang=lang,
@@ -92,16 +122,34 @@ class TTSDataset(Dataset):
                                 min_len_in_seconds=min_len_in_seconds,
                                 max_len_in_seconds=max_len_in_seconds,
                                 rebuild_cache=rebuild_cache,
-                                device=device)
-        datapoints = torch.load(os.path.join(cache_dir, "aligner_train_cache.pt"), map_location='cpu')
+                                device=device,
+                                update_cache=update_cache)
         # we use the aligner dataset as basis and augment it to contain the additional information we need for tts.
-        self.dataset, _, speaker_embeddings, filepaths = datapoints
+        self.dataset = ShardedCache(os.path.join(cache_dir, "aligner_train_cache"))
+
+        # an update reuses the datapoints of the existing cache whose files did not change. Datapoints that are finished during this run are
+        # written to a log right away, so an interrupted run can resume. The log is deleted once the cache is written.
+        progress_log_path = os.path.join(cache_dir, "tts_train_cache_progress.pkl")
+        if rebuild_cache and os.path.exists(progress_log_path):
+            os.remove(progress_log_path)
+        finished_datapoints = load_progress_log(progress_log_path)
+        extraction_signature = (os.path.abspath(acoustic_checkpoint_path), get_file_signature(acoustic_checkpoint_path), pitch_estimator)  # datapoints that were made with a different aligner or pitch estimator cannot be reused
+        self.previous_cache = None
+        previous_item_ids = dict()
+        if not rebuild_cache and sharded_cache_exists(os.path.join(cache_dir, "tts_train_cache")):
+            self.previous_cache = ShardedCache(os.path.join(cache_dir, "tts_train_cache"))
+            if "extraction_signature" in self.previous_cache.metadata:  # caches of older versions don't know how their datapoints were made
+                previous_item_ids = {(self.previous_cache.metadata["filepath"][item_id], self.previous_cache.metadata["file_signature"][item_id], self.previous_cache.metadata["extraction_signature"][item_id]): item_id
+                                     for item_id in self.previous_cache.item_ids}
+        if len(finished_datapoints) + len(previous_item_ids) > 0:
+            print(f"Found {len(finished_datapoints) + len(previous_item_ids)} datapoints that have already been processed, those will be reused.")
 
         print("... building dataset cache ...")
         self.codec_wrapper = CodecAudioPreprocessor(input_sr=-1, device=device)
         self.spec_extractor_for_features = AudioPreprocessor(input_sr=16000, output_sr=16000, device=device)
-        self.datapoints = list()
-        self.ctc_losses = list()
+        self.datapoints = [None] * len(self.dataset.item_ids)  # datapoints that are reused from the previous cache are only referenced by their ID in it, they are read when the new cache is written
+        self.datapoint_keys = [None] * len(self.dataset.item_ids)
+        self.ctc_losses = [None] * len(self.dataset.item_ids)
 
         self.acoustic_model = Aligner()
         self.acoustic_model.load_state_dict(torch.load(acoustic_checkpoint_path, map_location="cpu")["asr_model"])
@@ -112,53 +160,50 @@ class TTSDataset(Dataset):
         # actual creation of datapoints starts here
         # ==========================================
 
-        parsel = Parselmouth(fs=16000)
-        energy_calc = EnergyCalculator(fs=16000).to(device)
-        self.dc = DurationCalculator()
         vis_dir = os.path.join(cache_dir, "duration_vis")
         if save_imgs:
             os.makedirs(os.path.join(vis_dir, "post_clean"), exist_ok=True)
             if annotate_silences:
                 os.makedirs(os.path.join(vis_dir, "pre_clean"), exist_ok=True)
 
-        for index in tqdm(range(len(self.dataset))):
-            codes = self.dataset[index][1]
-            if codes.size()[0] != 24:  # no clue why this is sometimes the case
-                codes = codes.transpose(0, 1)
-            decoded_wave = self.codec_wrapper.indexes_to_audio(codes.int().to(device))
-            decoded_wave_length = torch.LongTensor([len(decoded_wave)])
-            features = self.spec_extractor_for_features.audio_to_mel_spec_tensor(decoded_wave, explicit_sampling_rate=16000)
-            feature_lengths = torch.LongTensor([len(features[0])])
-
-            text = self.dataset[index][0]
-
-            cached_duration, ctc_loss = self._calculate_durations(text, index, os.path.join(vis_dir, "post_clean"), features, save_imgs)
-
-            cached_energy = energy_calc(input_waves=torch.tensor(decoded_wave).unsqueeze(0).to(device),
-                                        input_waves_lengths=decoded_wave_length,
-                                        feats_lengths=feature_lengths,
-                                        text=text,
-                                        durations=cached_duration.unsqueeze(0),
-                                        durations_lengths=torch.LongTensor([len(cached_duration)]))[0].squeeze(0).cpu()
-
-            cached_pitch = parsel(input_waves=torch.tensor(decoded_wave).unsqueeze(0),
-                                  input_waves_lengths=decoded_wave_length,
-                                  feats_lengths=feature_lengths,
-                                  text=text,
-                                  durations=cached_duration.unsqueeze(0),
-                                  durations_lengths=torch.LongTensor([len(cached_duration)]))[0].squeeze(0).cpu()
-
-            self.datapoints.append([text,  # text tensor
-                                    torch.LongTensor([len(text)]),  # length of text tensor
-                                    codes,  # codec tensor (in index form)
-                                    feature_lengths,  # length of spectrogram
-                                    cached_duration.cpu(),  # duration
-                                    cached_energy.float(),  # energy
-                                    cached_pitch.float(),  # pitch
-                                    speaker_embeddings[index],  # speaker embedding,
-                                    filepaths[index]  # path to the associated original raw audio file
-                                    ])
-            self.ctc_losses.append(ctc_loss)
+        indexes_to_process = list()
+        for index, item_id in enumerate(self.dataset.item_ids):
+            datapoint_key = (self.dataset.metadata["filepath"][item_id], self.dataset.metadata["file_signature"][item_id], extraction_signature)
+            self.datapoint_keys[index] = datapoint_key
+            if datapoint_key in finished_datapoints:
+                self.datapoints[index], self.ctc_losses[index] = finished_datapoints[datapoint_key]
+            elif datapoint_key in previous_item_ids:
+                self.datapoints[index] = previous_item_ids[datapoint_key]
+                self.ctc_losses[index] = self.previous_cache.metadata["ctc_loss"][previous_item_ids[datapoint_key]]
+            else:
+                indexes_to_process.append(index)
+
+        # The neural parts (codec decoding, spectrogram, aligner) run here in chunks, while a pool of workers
+        # runs the CPU heavy parts (alignment search, energy, pitch) of the previous chunk. Every datapoint is
+        # computed by a single worker in a single thread, so the results don't depend on the amount of workers.
+        chunk_size = 8 * loading_processes
+        aligner_batch_size = 32
+        progress_log = open(progress_log_path, mode="ab")
+        with tqdm(total=len(indexes_to_process)) as progress_bar, torch.multiprocessing.get_context("spawn").Pool(processes=loading_processes, initializer=_init_prosody_worker) as pool:
+            previous_chunk = None
+            for chunk_start in range(0, len(indexes_to_process), chunk_size):
+                chunk = list()
+                for batch_start in range(chunk_start, min(chunk_start + chunk_size, len(indexes_to_process)), aligner_batch_size):
+                    chunk += self._run_neural_stages(indexes_to_process[batch_start:min(batch_start + aligner_batch_size, chunk_start + chunk_size)],
+                                                     extraction_signature,
+                                                     os.path.join(vis_dir, "post_clean") if save_imgs else None,
+                                                     device,
+                                                     pitch_estimator)
+                pending_results = pool.map_async(calculate_prosody, [prosody_job for _, prosody_job in chunk])
+                if previous_chunk is not None:
+                    self._finish_chunk(*previous_chunk, progress_log=progress_log)
+                    progress_bar.update(len(previous_chunk[0]))
+                previous_chunk = (chunk, pending_results)
+            if previous_chunk is not None:
+                self._finish_chunk(*previous_chunk, progress_log=progress_log)
+                progress_bar.update(len(previous_chunk[0]))
+        progress_log.close()
+        del finished_datapoints
 
         # =============================
         # done with datapoint creation
@@ -172,59 +217,295 @@ class TTSDataset(Dataset):
             for index in range(len(self.ctc_losses), 0, -1):
                 if self.ctc_losses[index - 1] > threshold:
                     self.datapoints.pop(index - 1)
+                    self.datapoint_keys.pop(index - 1)
                     print(f"Removing datapoint {index - 1}, because the CTC loss is 3.5 standard deviations higher than the mean. \n ctc: {round(self.ctc_losses[index - 1], 4)} vs. mean: {round(mean_ctc, 4)}")
+                    self.ctc_losses.pop(index - 1)
 
         # save to cache
         if len(self.datapoints) > 0:
-            torch.save(self.datapoints, os.path.join(cache_dir, "tts_train_cache.pt"))
+            self._write_sharded_cache((self._item_to_datapoint(self.previous_cache.get(datapoint)) if isinstance(datapoint, int) else datapoint for datapoint in self.datapoints),
+                                      datapoint_keys=self.datapoint_keys,
+                                      ctc_losses=self.ctc_losses)
+            os.remove(progress_log_path)  # everything in it is part of the cache now
         else:
             import sys
             print("No datapoints were prepared! Exiting...")
             sys.exit()
-        del self.dataset
-
-    def _calculate_durations(self, text, index, vis_dir, features, save_imgs):
-        # We deal with the word boundaries by having 2 versions of text: with and without word boundaries.
-        # We note the index of word boundaries and insert durations of 0 afterwards
-        text_without_word_boundaries = list()
-        indexes_of_word_boundaries = list()
-        for phoneme_index, vector in enumerate(text):
-            if vector[get_feature_to_index_lookup()["word-boundary"]] == 0:
-                text_without_word_boundaries.append(vector.numpy().tolist())
-            else:
-                indexes_of_word_boundaries.append(phoneme_index)
-        matrix_without_word_boundaries = torch.Tensor(text_without_word_boundaries)
+        # nothing of the cache building is kept in memory, the dataset is read from the disk and gets sent to the workers of data loaders
+        del self.dataset, self.previous_cache, self.datapoints, self.datapoint_keys, self.ctc_losses, self.acoustic_model, self.codec_wrapper, self.spec_extractor_for_features
+
+    def _run_neural_stages(self, indexes, extraction_signature, vis_dir, device, pitch_estimator):
+        aligner_datapoints = [self.dataset.get(self.dataset.item_ids[index]) for index in indexes]
+        texts_without_word_boundaries = list()
+        for aligner_datapoint in aligner_datapoints:
+            codes = aligner_datapoint["codes"]
+            if codes.size()[0] != 24:  # the codes are stored as [length, 24]
+                codes = codes.transpose(0, 1)
+            aligner_datapoint["codes"] = codes
+            # We deal with the word boundaries by having 2 versions of text: with and without word boundaries.
+            # We note the positions of word boundaries and insert durations of 0 there afterwards
+            aligner_datapoint["is_word_boundary"] = aligner_datapoint["text"][:, get_feature_to_index_lookup()["word-boundary"]] != 0
+            texts_without_word_boundaries.append(aligner_datapoint["text"][~aligner_datapoint["is_word_boundary"]].float())
+        # the codec decodes all utterances of the batch in one forward pass as well
+        decoded_waves = self.codec_wrapper.indexes_to_audios([aligner_datapoint["codes"].int() for aligner_datapoint in aligner_datapoints])
+        features = [self.spec_extractor_for_features.audio_to_mel_spec_tensor(decoded_wave, explicit_sampling_rate=16000).transpose(0, 1) for decoded_wave in decoded_waves]
+        feature_lengths = torch.LongTensor([len(feature) for feature in features])
+
+        # all utterances of the batch go through the aligner in one forward pass
+        alignment_scores, tokens, ctc_losses = self.acoustic_model.batched_alignment_scores(features=pad_sequence(features, batch_first=True).to(device),
+                                                                                            feature_lengths=feature_lengths,
+                                                                                            tokens=texts_without_word_boundaries,
+                                                                                            return_ctc=True)
+
+        wave_lengths = torch.LongTensor([len(decoded_wave) for decoded_wave in decoded_waves])
+        if pitch_estimator == "yin":
+            frame_level_f0 = yin(pad_sequence(decoded_waves, batch_first=True).to(device), wave_lengths, fs=16000).cpu()
+            frame_level_f0 = [f0[:wave_length // 256 + 1].numpy() for f0, wave_length in zip(frame_level_f0, wave_lengths)]
+        else:
+            frame_level_f0 = [None] * len(decoded_waves)  # Parselmouth runs in the workers
+
+        neural_stage_results = list()
+        for index, aligner_datapoint, decoded_wave, feature_length, scores, token_sequence, ctc_loss, f0 in zip(indexes, aligner_datapoints, decoded_waves, feature_lengths, alignment_scores, tokens, ctc_losses, frame_level_f0):
+            partial_datapoint = {"index"            : index,
+                                 "key"              : (aligner_datapoint["filepath"], aligner_datapoint["file_signature"], extraction_signature),
+                                 "text"             : aligner_datapoint["text"],
+                                 "codes"            : aligner_datapoint["codes"],
+                                 "feature_lengths"  : feature_length.view(1),
+                                 "speaker_embedding": aligner_datapoint["speaker_embedding"],
+                                 "filepath"         : aligner_datapoint["filepath"],
+                                 "ctc_loss"         : ctc_loss}
+            # everything that goes to the workers is in numpy form to avoid multiprocessing issues with tensors
+            prosody_job = (scores,
+                           decoded_wave.cpu().numpy(),
+                           feature_length.view(1).numpy(),
+                           aligner_datapoint["text"].numpy(),
+                           aligner_datapoint["is_word_boundary"].numpy(),
+                           os.path.join(vis_dir, f"{index}.png") if vis_dir is not None else None,
+                           [self.acoustic_model.tf.id_to_phone[token] for token in token_sequence] if vis_dir is not None else None,
+                           f0)
+            neural_stage_results.append((partial_datapoint, prosody_job))
+        return neural_stage_results
+
+    def _finish_chunk(self, chunk, pending_results, progress_log):
+        for (partial_datapoint, _), (cached_duration, cached_energy, cached_pitch) in zip(chunk, pending_results.get()):
+            index = partial_datapoint["index"]
+            self.datapoints[index] = [partial_datapoint["text"],  # text tensor
+                                      torch.LongTensor([len(partial_datapoint["text"])]),  # length of text tensor
+                                      partial_datapoint["codes"],  # codec tensor (in index form)
+                                      partial_datapoint["feature_lengths"],  # length of spectrogram
+                                      torch.from_numpy(cached_duration),  # duration
+                                      torch.from_numpy(cached_energy),  # energy
+                                      torch.from_numpy(cached_pitch),  # pitch
+                                      partial_datapoint["speaker_embedding"],  # speaker embedding,
+                                      partial_datapoint["filepath"]  # path to the associated original raw audio file
+                                      ]
+            self.ctc_losses[index] = partial_datapoint["ctc_loss"]
+            pickle.dump((partial_datapoint["key"], self.datapoints[index], self.ctc_losses[index]), progress_log)
+            progress_log.flush()
+
+    def _update_mel_cache(self, device, decoding_batch_size=32):
+        """
+        Decodes the codec indexes of every datapoint that is not yet
+        in the spectrogram cache and adds its spectrogram to it.
+        Spectrograms of datapoints that are no longer in the dataset
+        cache are marked as unused.
+        """
+        mel_cache_path = os.path.join(self.cache_dir, "tts_mel_cache")
+        keys = [self._get_mel_cache_key(item_id) for item_id in self.cache.item_ids]
+        known_keys = set()
+        if sharded_cache_exists(mel_cache_path):
+            mel_cache = ShardedCache(mel_cache_path)
+            known_keys = {mel_cache.metadata["key"][item_id] for item_id in mel_cache.item_ids}
+            keys_in_use = set(keys)
+            unused_item_ids = [item_id for item_id in mel_cache.item_ids if mel_cache.metadata["key"][item_id] not in keys_in_use]
+            if len(unused_item_ids) > 0:
+                mel_cache.remove(unused_item_ids)
+        item_ids_to_process = list()
+        for item_id, key in zip(self.cache.item_ids, keys):
+            if key not in known_keys:
+                known_keys.add(key)
+                item_ids_to_process.append(item_id)
+        if len(item_ids_to_process) == 0:
+            return
+        print("... precomputing spectrograms ...")
+        codec_wrapper = CodecAudioPreprocessor(input_sr=-1, device=device)
+        spec_extractor = AudioPreprocessor(input_sr=16000, output_sr=16000, device=device)
+        mel_cache_writer = ShardedCacheWriter(mel_cache_path, append=True)
+        for batch_start in tqdm(range(0, len(item_ids_to_process), decoding_batch_size)):
+            item_ids_in_batch = item_ids_to_process[batch_start:batch_start + decoding_batch_size]
+            mels = codec_wrapper.indexes_to_mel_specs([self.cache.get(item_id)["codes"].transpose(0, 1).int() for item_id in item_ids_in_batch], spec_extractor)
+            for item_id, mel in zip(item_ids_in_batch, mels):
+                mel_cache_writer.append(mel=mel.float().cpu(), key=self._get_mel_cache_key(item_id))
+        mel_cache_writer.close()
+
+    def _get_mel_cache_key(self, item_id):
+        return self.cache.metadata["filepath"][item_id], self.cache.metadata["codes_checksum"][item_id]
+
+    def _write_sharded_cache(self, datapoints, datapoint_keys=None, ctc_losses=None):
+        # the new cache is written next to the current one and only replaces it once it is complete, since an update reads from the current one
+        new_cache_path = os.path.join(self.cache_dir, "tts_train_cache_new")
+        cache_writer = ShardedCacheWriter(new_cache_path)
+        for index, datapoint in enumerate(datapoints):
+            cache_writer.append(text=datapoint[0],
+                                codes=datapoint[2].transpose(0, 1),  # the codes are stored as [length, 24]
+                                feature_length=int(datapoint[3]),
+                                durations=datapoint[4],
+                                energy=datapoint[5],
+                                pitch=datapoint[6],
+                                speaker_embedding=datapoint[7],
+                                filepath=datapoint[8],
+                                codes_checksum=get_codes_checksum(datapoint[2]),
+                                # what an update needs to decide whether the datapoint can be reused
+                                file_signature=datapoint_keys[index][1] if datapoint_keys is not None else None,
+                                extraction_signature=datapoint_keys[index][2] if datapoint_keys is not None else None,
+                                ctc_loss=float(ctc_losses[index]) if ctc_losses is not None else None)
+        cache_writer.close()
+        if os.path.exists(os.path.join(self.cache_dir, "tts_train_cache")):
+            shutil.rmtree(os.path.join(self.cache_dir, "tts_train_cache"))
+        os.replace(new_cache_path, os.path.join(self.cache_dir, "tts_train_cache"))
+
+    def _convert_legacy_cache(self):
+        print("converting the TTS cache to the sharded format...")
+        self._write_sharded_cache(torch.load(os.path.join(self.cache_dir, "tts_train_cache.pt"), map_location='cpu'))
+
+    def get_datapoint(self, index):
+        """
+        Reads a datapoint from the disk, in the form of a list of
+        text, text length, codes, spectrogram length, durations,
+        energy, pitch, speaker embedding and path to the audio.
+        """
+        return self._item_to_datapoint(self.cache.get(self.item_ids[index]))
 
-        alignment_path, ctc_loss = self.acoustic_model.inference(features=features.transpose(0, 1),
-                                                                 tokens=matrix_without_word_boundaries.to(self.device),
-                                                                 save_img_for_debug=os.path.join(vis_dir, f"{index}.png") if save_imgs else None,
-                                                                 return_ctc=True)
+    @staticmethod
+    def _item_to_datapoint(item):
+        return [item["text"],
+                torch.LongTensor([len(item["text"])]),
+                item["codes"].transpose(0, 1).contiguous(),
+                torch.LongTensor([item["feature_length"]]),
+                item["durations"],
+                item["energy"],
+                item["pitch"],
+                item["speaker_embedding"],
+                item["filepath"]]
 
-        cached_duration = self.dc(torch.LongTensor(alignment_path), vis=None).cpu()
+    def get_lengths(self):
+        # the lengths of the spectrograms are in the index of the cache, so no datapoint needs to be read for this
+        return [self.cache.metadata["feature_length"][item_id] for item_id in self.item_ids]
 
-        for index_of_word_boundary in indexes_of_word_boundaries:
-            cached_duration = torch.cat([cached_duration[:index_of_word_boundary],
-                                         torch.LongTensor([0]),  # insert a 0 duration wherever there is a word boundary
-                                         cached_duration[index_of_word_boundary:]])
-        return cached_duration, ctc_loss
+    def get_precomputed_mel(self, index):
+        if self.mel_item_ids[index] is None:
+            return None
+        return self.mel_cache.get(self.mel_item_ids[index])["mel"]
 
     def __getitem__(self, index):
-        return self.datapoints[index][0], \
-            self.datapoints[index][1], \
-            self.datapoints[index][2], \
-            self.datapoints[index][3], \
-            self.datapoints[index][4], \
-            self.datapoints[index][5], \
-            self.datapoints[index][6], \
+        datapoint = self.get_datapoint(index)
+        return datapoint[0], \
+            datapoint[1], \
+            datapoint[2], \
+            datapoint[3], \
+            datapoint[4], \
+            datapoint[5], \
+            datapoint[6], \
             None, \
             self.language_id, \
-            self.datapoints[index][7]
+            datapoint[7], \
+            self.get_precomputed_mel(index)  # None if the spectrogram has to be decoded from the codec indexes
 
     def __len__(self):
-        return len(self.datapoints)
+        return len(self.item_ids)
 
     def remove_samples(self, list_of_samples_to_remove):
+        item_ids_to_remove = [self.item_ids[remove_id] for remove_id in list_of_samples_to_remove]
         for remove_id in sorted(list_of_samples_to_remove, reverse=True):
-            self.datapoints.pop(remove_id)
-        torch.save(self.datapoints, os.path.join(self.cache_dir, "tts_train_cache.pt"))
+            self.item_ids.pop(remove_id)
+            self.mel_item_ids.pop(remove_id)
+        self.cache.remove(item_ids_to_remove)  # only the index is rewritten, the data stays where it is
         print("Dataset updated!")
+
+
+_prosody_calculators = dict()
+
+
+def _init_prosody_worker():
+    torch.set_num_threads(1)  # the parallelism comes from the amount of workers
+    _prosody_calculators["duration"] = DurationCalculator()
+    _prosody_calculators["energy"] = EnergyCalculator(fs=16000)
+    _prosody_calculators["pitch"] = Parselmouth(fs=16000)
+
+
+def calculate_prosody(prosody_job):
+    """
+    The CPU heavy part of building a TTS datapoint: alignment search,
+    durations, energy and pitch. Runs in the workers of a pool.
+    """
+    alignment_scores, decoded_wave, feature_lengths, text, is_word_boundary, vis_path, phones, frame_level_f0 = prosody_job
+    if len(_prosody_calculators) == 0:
+        _init_prosody_worker()
+
+    alignment_path = binarize_alignment(alignment_scores)
+    if vis_path is not None:
+        save_alignment_plot(alignment_path, phones=phones, path=vis_path)
+    cached_duration = _prosody_calculators["duration"](torch.LongTensor(alignment_path), vis=None)
+    cached_duration = insert_word_boundary_durations(cached_duration, torch.from_numpy(is_word_boundary))
+
+    decoded_wave = torch.from_numpy(decoded_wave)
+    feature_lengths = torch.from_numpy(feature_lengths)
+    text = torch.from_numpy(text)
+    decoded_wave_length = torch.LongTensor([len(decoded_wave)])
+    cached_energy = _prosody_calculators["energy"](input_waves=decoded_wave.unsqueeze(0),
+                                                   input_waves_lengths=decoded_wave_length,
+                                                   feats_lengths=feature_lengths,
+                                                   text=text,
+                                                   durations=cached_duration.unsqueeze(0),
+                                                   durations_lengths=torch.LongTensor([len(cached_duration)]))[0].squeeze(0)
+    cached_pitch = _prosody_calculators["pitch"](input_waves=decoded_wave.unsqueeze(0),
+                                                 input_waves_lengths=decoded_wave_length,
+                                                 feats_lengths=feature_lengths,
+                                                 text=text,
+                                                 durations=cached_duration.unsqueeze(0),
+                                                 durations_lengths=torch.LongTensor([len(cached_duration)]),
+                                                 frame_level_f0=torch.from_numpy(frame_level_f0).unsqueeze(0) if frame_level_f0 is not None else None)[0].squeeze(0)
+    return cached_duration.numpy(), cached_energy.float().numpy(), cached_pitch.float().numpy()
+
+
+def get_chunk_of_rank(item_ids, gpu_count, rank):
+    if gpu_count == 1:
+        return item_ids
+    # every rank only uses a chunk of the dataset. Which chunk, we figure out using the rank.
+    chunksize = len(item_ids) // gpu_count  # the last few datapoints are dropped, a bit unfortunate, but if you're using multiple GPUs, you probably have a ton of datapoints anyway.
+    return item_ids[chunksize * rank:chunksize * (rank + 1)]
+
+
+def tts_cache_exists(cache_dir):
+    # caches of older versions are a single file, they get converted to the sharded format when they are loaded for the first time
+    return sharded_cache_exists(os.path.join(cache_dir, "tts_train_cache")) or os.path.exists(os.path.join(cache_dir, "tts_train_cache.pt"))
+
+
+def get_codes_checksum(codes):
+    """
+    Together with the path of the audio, this identifies the spectrogram
+    of a datapoint, so a changed file does not get the spectrogram of
+    its previous version.
+    """
+    return zlib.crc32(codes.numpy().tobytes())
+
+
+def load_progress_log(progress_log_path):
+    """
+    Reads the datapoints that have been finished in a previous run.
+    If the last record was cut off by a crash, it is discarded.
+    """
+    finished_datapoints = dict()
+    if not os.path.exists(progress_log_path):
+        return finished_datapoints
+    with open(progress_log_path, mode="rb+") as progress_log:
+        end_of_last_complete_record = 0
+        while True:
+            try:
+                datapoint_key, datapoint, ctc_loss = pickle.load(progress_log)
+            except Exception:  # end of the file, or an incomplete record
+                break
+            finished_datapoints[datapoint_key] = (datapoint, ctc_loss)
+            end_of_last_complete_record = progress_log.tell()
+        progress_log.truncate(end_of_last_complete_record)  # so that new records are appended right after the last complete one
+    return finished_datapoints
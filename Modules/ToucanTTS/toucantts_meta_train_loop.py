@@ -1,12 +1,14 @@
 import torch.multiprocessing
 import wandb
 from torch.nn.utils.rnn import pad_sequence
+from torch.utils.data import ConcatDataset
 from torch.utils.data.dataloader import DataLoader
 from tqdm import tqdm
 
 from Modules.ToucanTTS.LanguageEmbeddingSpaceStructureLoss import LanguageEmbeddingSpaceStructureLoss
 from Preprocessing.AudioPreprocessor import AudioPreprocessor
 from Preprocessing.EnCodecAudioPreprocessor import CodecAudioPreprocessor
+from Utility.LanguageBalancedBatchSampler import LanguageBalancedBatchSampler
 from Utility.WarmupScheduler import ToucanWarmupScheduler as WarmupScheduler
 from Utility.path_to_transcript_dicts import *
 from Utility.utils import delete_old_checkpoints
@@ -19,7 +21,7 @@ from Utility.weight_averaging import save_model_for_use
 
 
 def collate_and_pad(batch):
-    # text, text_len, speech, speech_len, durations, energy, pitch, utterance condition, language_id
+    # text, text_len, speech, speech_len, durations, energy, pitch, utterance condition, language_id, speaker embedding, precomputed spectrogram
     return (pad_sequence([datapoint[0] for datapoint in batch], batch_first=True).float(),
             torch.stack([datapoint[1] for datapoint in batch]).squeeze(1),
             [datapoint[2] for datapoint in batch],
@@ -29,7 +31,9 @@ def collate_and_pad(batch):
             pad_sequence([datapoint[6].squeeze() for datapoint in batch], batch_first=True),
             None,
             torch.stack([datapoint[8] for datapoint in batch]),
-            torch.stack([datapoint[9] for datapoint in batch]))
+            torch.stack([datapoint[9] for datapoint in batch]),
+            # if every spectrogram of the batch has been precomputed, they are padded right here in the workers of the data loader
+            pad_sequence([datapoint[10] for datapoint in batch], batch_first=True) if all(datapoint[10] is not None for datapoint in batch) else [datapoint[10] for datapoint in batch])
 
 
 def train_loop(net,
@@ -49,7 +53,9 @@ def train_loop(net,
                train_samplers,
                gpu_count,
                use_less_loss,
-               freeze_lang_embs
+               freeze_lang_embs,
+               loading_processes=4,
+               language_weights=None
                ):
     """
     see train loop arbiter for explanations of the arguments
@@ -96,20 +102,19 @@ def train_loop(net,
         model = net
 
     torch.multiprocessing.set_sharing_strategy('file_system')
-    train_loaders = list()
-    train_iters = list()
     ap = CodecAudioPreprocessor(input_sr=-1, device=device)
     spec_extractor = AudioPreprocessor(input_sr=16000, output_sr=16000, device=device)
 
-    for dataset, sampler in zip(datasets, train_samplers):
-        batch_sampler_train = torch.utils.data.BatchSampler(sampler, 1, drop_last=True)
-        train_loaders.append(DataLoader(dataset=dataset,
-                                        batch_sampler=batch_sampler_train,
-                                        num_workers=0,  # has to be 0, otherwise copies of the dataset are created, which is not feasible for large scale trainings. This is not optimal for small trainings, but necessary for scalability.
-                                        pin_memory=True,
-                                        prefetch_factor=None,
-                                        collate_fn=lambda x: x[0]))
-        train_iters.append(iter(train_loaders[-1]))
+    # a single loader over all languages, every batch contains as many different languages as possible
+    train_dataset = ConcatDataset(datasets)
+    train_loader = DataLoader(dataset=train_dataset,
+                              batch_sampler=LanguageBalancedBatchSampler(train_dataset, samplers=train_samplers, batch_size=batch_size, language_weights=language_weights),
+                              num_workers=loading_processes,  # the datasets are memory mapped, so the workers read from the same caches on the disk rather than holding copies of them
+                              pin_memory=True,
+                              prefetch_factor=4 if loading_processes > 0 else None,
+                              persistent_workers=loading_processes > 0,
+                              collate_fn=collate_and_pad)
+    train_iter = iter(train_loader)
 
     # embedding training is not supported here
     optimizer = torch.optim.Adam(model.parameters(), lr=lr)
@@ -175,19 +180,7 @@ def train_loop(net,
     for step_counter in tqdm(range(steps_run_previously, steps)):
         run_stochastic = step_counter > warmup_steps * 2
 
-        batches = []
-        while len(batches) < batch_size:
-            for index in random.sample(list(range(len(datasets))), len(datasets)):
-                if len(batches) < batch_size:
-                    # we get one batch for each task (i.e. language in this case) in a randomized order
-                    try:
-                        batch = next(train_iters[index])
-                        batches.append(batch)
-                    except StopIteration:
-                        train_iters[index] = iter(train_loaders[index])
-                        batch = next(train_iters[index])
-                        batches.append(batch)
-        batch = collate_and_pad(batches)
+        batch = next(train_iter)  # the sampler never runs out of batches
 
         text_tensors = batch[0].to(device)
         text_lengths = batch[1].squeeze().to(device)
@@ -198,14 +191,17 @@ def train_loop(net,
         gold_energy = batch[5].unsqueeze(-1).to(device)  # mind the switched order
         lang_ids = batch[8].squeeze(1).to(device)
 
-        speech_batch = list()  # I wish this could be done in the collate function or in the getitem, but using DL models in multiprocessing on very large datasets causes just way too many issues.
-        for index, speech_sample in enumerate(speech_indexes):
+        if isinstance(batch[10], torch.Tensor):
+            gold_speech = batch[10].to(device)  # spectrograms that have been precomputed alongside the dataset cache
+        else:
+            speech_batch = list(batch[10])  # None where the spectrogram has to be decoded
+            indexes_to_decode = [index for index, mel in enumerate(speech_batch) if mel is None]
+            # I wish this could be done in the collate function or in the getitem, but using DL models in multiprocessing on very large datasets causes just way too many issues.
             with torch.inference_mode():
-                wave = ap.indexes_to_audio(speech_sample.int().to(device)).detach()
-                mel = spec_extractor.audio_to_mel_spec_tensor(wave, explicit_sampling_rate=16000).transpose(0, 1).detach().cpu()
-            gold_speech_sample = mel.clone()
-            speech_batch.append(gold_speech_sample)
-        gold_speech = pad_sequence(speech_batch, batch_first=True).to(device)
+                mels = ap.indexes_to_mel_specs([speech_indexes[index] for index in indexes_to_decode], spec_extractor)  # the whole batch is decoded in one forward pass
+            for index, mel in zip(indexes_to_decode, mels):
+                speech_batch[index] = mel.clone().cpu()
+            gold_speech = pad_sequence(speech_batch, batch_first=True).to(device)
 
         train_loss = 0.0
         # we sum the loss for each task, as we would do for the
@@ -10,6 +10,8 @@ from tqdm import tqdm
 
 from Preprocessing.AudioPreprocessor import AudioPreprocessor
 from Preprocessing.EnCodecAudioPreprocessor import CodecAudioPreprocessor
+from Utility.FrameBudgetBatchSampler import FrameBudgetBatchSampler
+from Utility.FrameBudgetBatchSampler import get_lengths
 from Utility.WarmupScheduler import ToucanWarmupScheduler as WarmupScheduler
 from Utility.utils import delete_old_checkpoints
 from Utility.utils import get_most_recent_checkpoint
@@ -21,7 +23,7 @@ from Utility.weight_averaging import save_model_for_use
 
 
 def collate_and_pad(batch):
-    # text, text_len, speech, speech_len, durations, energy, pitch, utterance condition, language_id, speaker embedding
+    # text, text_len, speech, speech_len, durations, energy, pitch, utterance condition, language_id, speaker embedding, precomputed spectrogram
     return (pad_sequence([datapoint[0] for datapoint in batch], batch_first=True).float(),
             torch.stack([datapoint[1] for datapoint in batch]).squeeze(1),
             [datapoint[2] for datapoint in batch],
@@ -31,7 +33,19 @@ def collate_and_pad(batch):
             pad_sequence([datapoint[6] for datapoint in batch], batch_first=True),
             None,
             torch.stack([datapoint[8] for datapoint in batch]),
-            torch.stack([datapoint[9] for datapoint in batch]))
+            torch.stack([datapoint[9] for datapoint in batch]),
+            # if every spectrogram of the batch has been precomputed, they are padded right here in the workers of the data loader,
+            # otherwise the workers pad the codes of the missing ones, so the training step only has to decode them
+            pad_sequence([datapoint[10] for datapoint in batch], batch_first=True) if all(datapoint[10] is not None for datapoint in batch) else _pad_codes_to_decode(batch))
+
+
+def _pad_codes_to_decode(batch):
+    # the precomputed spectrograms (None where missing), the positions of the missing ones in the batch, their padded codes [items, codebooks, frames] and the amount of frames of each
+    indexes_to_decode = [index for index, datapoint in enumerate(batch) if datapoint[10] is None]
+    return ([datapoint[10] for datapoint in batch],
+            indexes_to_decode,
+            pad_sequence([batch[index][2].transpose(0, 1) for index in indexes_to_decode], batch_first=True).transpose(1, 2),
+            torch.LongTensor([batch[index][2].shape[-1] for index in indexes_to_decode]))
 
 
 def train_loop(net,
@@ -49,7 +63,9 @@ def train_loop(net,
                use_wandb,
                train_sampler,
                gpu_count,
-               steps_per_checkpoint
+               steps_per_checkpoint,
+               loading_processes=4,
+               frames_per_batch=None
                ):
     """
     see train loop arbiter for explanations of the arguments
@@ -59,20 +75,25 @@ def train_loop(net,
         rank = int(os.environ["LOCAL_RANK"])
     else:
         rank = 0
-    if steps_per_checkpoint is None:
-        steps_per_checkpoint = len(train_dataset) // batch_size
 
     if steps < warmup_steps * 5:
         print(f"too much warmup given the amount of steps, reducing warmup to {warmup_steps} steps")
         warmup_steps = steps // 5
 
     torch.multiprocessing.set_sharing_strategy('file_system')
-    batch_sampler_train = torch.utils.data.BatchSampler(train_sampler, batch_size, drop_last=True)
+    if frames_per_batch is not None:
+        # the frame budget sampler shuffles the data itself and takes care of the chunks of the ranks, so train_sampler is not used
+        batch_sampler_train = FrameBudgetBatchSampler(get_lengths(train_dataset), frames_per_batch=frames_per_batch, gpu_count=gpu_count)
+    else:
+        batch_sampler_train = torch.utils.data.BatchSampler(train_sampler, batch_size, drop_last=True)
+    if steps_per_checkpoint is None:
+        steps_per_checkpoint = len(batch_sampler_train)
     train_loader = DataLoader(dataset=train_dataset,
                               batch_sampler=batch_sampler_train,
-                              num_workers=0,  # has to be 0, otherwise copies of the dataset are created, which is not feasible for large scale trainings. This is not optimal for small trainings, but necessary for scalability.
+                              num_workers=loading_processes,  # the dataset is memory mapped, so the workers read from the same cache on the disk rather than holding copies of it
                               pin_memory=True,
-                              prefetch_factor=None,
+                              prefetch_factor=4 if loading_processes > 0 else None,
+                              persistent_workers=loading_processes > 0,
                               collate_fn=collate_and_pad)
     ap = CodecAudioPreprocessor(input_sr=-1, device=device)
     spec_extractor = AudioPreprocessor(input_sr=16000, output_sr=16000, device=device)
@@ -110,21 +131,23 @@ def train_loop(net,
 
             text_tensors = batch[0].to(device)
             text_lengths = batch[1].squeeze().to(device)
-            speech_indexes = batch[2]
             speech_lengths = batch[3].squeeze().to(device)
             gold_durations = batch[4].to(device)
             gold_pitch = batch[6].to(device)  # mind the switched order
             gold_energy = batch[5].to(device)  # mind the switched order
             lang_ids = batch[8].squeeze(1).to(device)
 
-            speech_batch = list()  # I wish this could be done in the collate function or in the getitem, but using DL models in multiprocessing on very large datasets causes just way too many issues.
-            for speech_sample in speech_indexes:
+            if isinstance(batch[10], torch.Tensor):
+                gold_speech = batch[10].to(device)  # spectrograms that have been precomputed alongside the dataset cache
+            else:
+                speech_batch, indexes_to_decode, codes_to_decode, code_lengths = batch[10]  # the codes of the missing spectrograms have already been padded by the workers
+                speech_batch = [mel.to(device) if mel is not None else None for mel in speech_batch]
+                # I wish this could be done in the collate function or in the getitem, but using DL models in multiprocessing on very large datasets causes just way too many issues.
                 with torch.inference_mode():
-                    wave = ap.indexes_to_audio(speech_sample.int().to(device)).detach()
-                    mel = spec_extractor.audio_to_mel_spec_tensor(wave, explicit_sampling_rate=16000).transpose(0, 1).detach().cpu()
-                gold_speech_sample = mel.clone()
-                speech_batch.append(gold_speech_sample)
-            gold_speech = pad_sequence(speech_batch, batch_first=True).to(device)
+                    mels = ap.indexes_to_mel_specs(codes_to_decode, spec_extractor, lengths=code_lengths)  # the whole batch is decoded in one forward pass
+                for index, mel in zip(indexes_to_decode, mels):
+                    speech_batch[index] = mel.clone()
+                gold_speech = pad_sequence(speech_batch, batch_first=True)
 
             run_stochastic = (step_counter > warmup_steps * 2) or fine_tune
 
@@ -27,6 +27,9 @@ def train_loop(net,  # an already initialized ToucanTTS model that should be tra
                steps=200000,  # how many updates to run until training is completed
                use_less_loss=False,  # whether to use the loss that enforces a structure in the language embedding space
                freeze_lang_embs=False,  # whether to use the language embeddings from a checkpoint without modifying them, to maintain compatibility with the zero-shot method. This treats language embeddings from the given checkpoint as constants.
+               loading_processes=4,  # how many worker processes prepare the batches while the model is training.
+               frames_per_batch=None,  # if given, batches are filled with utterances of similar length up to this many spectrogram frames (including padding), instead of having batch_size utterances. The sampler given in train_samplers is then not used, the frame budget sampler shuffles the data itself. This is only relevant for the monolingual case.
+               language_weights=None,  # one weight per dataset in the multilingual case. Languages with a higher weight end up in more batches, with a weight of 0 a language is not used. By default, all languages are equally likely.
                ):
     torch.multiprocessing.set_start_method('spawn', force=True)
     if type(datasets) != list:
@@ -49,7 +52,9 @@ def train_loop(net,  # an already initialized ToucanTTS model that should be tra
                             use_wandb=use_wandb,
                             gpu_count=gpu_count,
                             use_less_loss=use_less_loss,
-                            freeze_lang_embs=freeze_lang_embs
+                            freeze_lang_embs=freeze_lang_embs,
+                            loading_processes=loading_processes,
+                            language_weights=language_weights
                             )
     else:
         mono_language_loop(net=net,
@@ -67,5 +72,7 @@ def train_loop(net,  # an already initialized ToucanTTS model that should be tra
                            steps=steps,
                            use_wandb=use_wandb,
                            gpu_count=gpu_count,
-                           steps_per_checkpoint=steps_per_checkpoint
+                           steps_per_checkpoint=steps_per_checkpoint,
+                           loading_processes=loading_processes,
+                           frames_per_batch=frames_per_batch
                            )
@@ -12,6 +12,7 @@ from torch.utils.data import Dataset
 from tqdm import tqdm
 
 from Preprocessing.AudioPreprocessor import AudioPreprocessor
+from Utility.audio_archives import read_audio
 
 
 def random_pitch_shifter(x):
@@ -64,7 +65,7 @@ class HiFiGANDataset(Dataset):
     def cache_builder_process(self, path_split):
         for path in tqdm(path_split):
             try:
-                wave, sr = sf.read(path)
+                wave, sr = read_audio(path)
                 if len(wave.shape) == 2:
                     wave = librosa.to_mono(numpy.transpose(wave))
                 if sr != self.desired_samplingrate:
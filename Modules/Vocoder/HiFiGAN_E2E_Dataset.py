@@ -4,12 +4,12 @@ from multiprocessing import Process
 import librosa
 import numpy
 import numpy as np
-import soundfile as sf
 import torch
 from torch.utils.data import Dataset
 from tqdm import tqdm
 
 from Preprocessing.AudioPreprocessor import AudioPreprocessor
+from Utility.audio_archives import read_audio
 
 
 class HiFiGANDataset(Dataset):
@@ -52,7 +52,7 @@ class HiFiGANDataset(Dataset):
             try:
                 path1, path2 = path
 
-                wave, sr = sf.read(path1)
+                wave, sr = read_audio(path1)
                 if len(wave.shape) == 2:
                     wave = librosa.to_mono(numpy.transpose(wave))
                 if sr != self.desired_samplingrate:
@@ -4,6 +4,8 @@ import torch
 from torchaudio.transforms import MelSpectrogram
 from torchaudio.transforms import Resample
 
+from Preprocessing.VoiceActivityDetector import get_voice_activity_detector
+
 
 class AudioPreprocessor:
 
@@ -24,21 +26,7 @@ class AudioPreprocessor:
         self.final_sr = input_sr
         self.wave_to_spectrogram = LogMelSpec(output_sr if output_sr is not None else input_sr).to(device)
         if cut_silence:
-            torch.hub._validate_not_a_forked_repo = lambda a, b, c: True  # torch 1.9 has a bug in the hub loading, this is a workaround
-            # careful: assumes 16kHz or 8kHz audio
-            self.silero_model, utils = torch.hub.load(repo_or_dir='snakers4/silero-vad',
-                                                      model='silero_vad',
-                                                      force_reload=False,
-                                                      onnx=False,
-                                                      verbose=False)
-            (self.get_speech_timestamps,
-             self.save_audio,
-             self.read_audio,
-             self.VADIterator,
-             self.collect_chunks) = utils
-            torch.set_grad_enabled(True)  # finding this issue was very infuriating: silero sets
-            # this to false globally during model loading rather than using inference mode or no_grad
-            self.silero_model = self.silero_model.to(self.device)
+            self.vad = get_voice_activity_detector(device=self.device)
         if output_sr is not None and output_sr != input_sr:
             self.resample = Resample(orig_freq=input_sr, new_freq=output_sr).to(self.device)
             self.final_sr = output_sr
@@ -49,8 +37,7 @@ class AudioPreprocessor:
         """
         https://github.com/snakers4/silero-vad
         """
-        with torch.inference_mode():
-            speech_timestamps = self.get_speech_timestamps(audio, self.silero_model, sampling_rate=self.final_sr)
+        speech_timestamps = self.vad.speech_timestamps([audio], sampling_rate=self.final_sr)[0]
         try:
             result = audio[speech_timestamps[0]['start']:speech_timestamps[-1]['end']]
             return result
@@ -46,10 +46,121 @@ class CodecAudioPreprocessor:
             audio = torch.tensor(audio, device=self.device, dtype=torch.float32)
         return self.model.encode(audio.float().unsqueeze(0).unsqueeze(0).to(self.device)).squeeze()
 
+    @torch.inference_mode()
+    def audios_to_codebook_indexes(self, audios, current_sampling_rate, max_samples_per_batch=16000 * 30):
+        """
+        Encodes a list of waves in padded batches of at most
+        max_samples_per_batch samples (including the padding).
+        Every convolution pads each wave on its own, just like
+        when it is encoded alone, so the result for each wave is
+        the same as with audio_to_codebook_indexes. Returns a
+        list of [codebooks, frames] index tensors.
+        """
+        audios = [self.resample_audio(audio, current_sampling_rate) if current_sampling_rate != self.output_sr else torch.as_tensor(audio, dtype=torch.float32, device=self.device) for audio in audios]
+        codebook_indexes = [None] * len(audios)
+        # similar lengths go into the same batch, so there is little padding
+        order = sorted(range(len(audios)), key=lambda index: len(audios[index]))
+        batch = list()
+        for index in order + [None]:
+            if index is not None and (len(batch) == 0 or (len(batch) + 1) * len(audios[index]) <= max_samples_per_batch):
+                batch.append(index)
+                continue
+            if len(batch) > 0:
+                lengths = [len(audios[index_in_batch]) for index_in_batch in batch]
+                padded_audios = torch.stack([torch.nn.functional.pad(audios[index_in_batch].float(), (0, max(lengths) - length)) for index_in_batch, length in zip(batch, lengths)])
+                for index_in_batch, indexes in zip(batch, self._encode_padded_batch(padded_audios.unsqueeze(1), lengths)):
+                    codebook_indexes[index_in_batch] = indexes
+            batch = [index]
+        return codebook_indexes
+
+    def _encode_padded_batch(self, x, lengths):
+        for layer in self.model.encoder.model:
+            x, lengths = _run_seanet_layer_on_padded_batch(layer, x, lengths)
+        codes = self.model.quantizer.encode(x, self.model.frame_rate, self.model.target_bandwidths[-1], 0)  # [codebooks, batch, frames]
+        return [codes[:, index, :length] for index, length in enumerate(lengths)]
+
     @torch.inference_mode()
     def indexes_to_audio(self, codebook_indexes):
         return self.model.decode(codebook_indexes).squeeze()
 
+    @torch.inference_mode()
+    def indexes_to_audios(self, codebook_indexes, lengths=None):
+        """
+        Decodes a whole batch in one forward pass. Takes either a
+        list of [codebooks, frames] index tensors or a padded
+        [batch, codebooks, frames] tensor together with the number
+        of valid frames of every item. Every convolution only sees
+        the valid part of each item, so the list of waves that is
+        returned is the same as with indexes_to_audio on each item.
+        """
+        if len(codebook_indexes) == 0:
+            return list()
+        if lengths is None:
+            lengths = [indexes.shape[-1] for indexes in codebook_indexes]
+            codebook_indexes = torch.nn.utils.rnn.pad_sequence([indexes.transpose(0, 1) for indexes in codebook_indexes], batch_first=True).transpose(1, 2)
+        lengths = [int(length) for length in lengths]
+        codebook_indexes = codebook_indexes[:, :, :max(lengths)].long().to(self.device)
+        x = self.model.quantizer.decode(codebook_indexes.transpose(0, 1))  # [batch, dimensions, frames]
+        for layer in self.model.decoder.model:
+            x, lengths = _run_seanet_layer_on_padded_batch(layer, x, lengths)
+        return [x[index, 0, :length] for index, length in enumerate(lengths)]
+
+    @torch.inference_mode()
+    def indexes_to_mel_specs(self, codebook_indexes, spec_extractor, lengths=None):
+        """
+        Decodes a batch like indexes_to_audios and returns the list
+        of [frames, mel bins] spectrograms of the decoded waves,
+        computed by the AudioPreprocessor spec_extractor.
+        """
+        return [spec_extractor.audio_to_mel_spec_tensor(wave, explicit_sampling_rate=self.output_sr).transpose(0, 1) for wave in self.indexes_to_audios(codebook_indexes, lengths=lengths)]
+
+
+def _run_seanet_layer_on_padded_batch(layer, x, lengths):
+    """
+    Runs a layer of the SEANet encoder or decoder on a padded
+    batch, where only the first lengths[i] steps of item i are
+    valid. Returns the output and the valid lengths of the output.
+    """
+    from Preprocessing.Codec.seanet import SConv1d
+    from Preprocessing.Codec.seanet import SConvTranspose1d
+    from Preprocessing.Codec.seanet import SEANetResnetBlock
+    from Preprocessing.Codec.seanet import get_extra_padding_for_conv1d
+    from Preprocessing.Codec.seanet import pad1d
+
+    if isinstance(layer, SEANetResnetBlock):
+        shortcut, _ = _run_seanet_layer_on_padded_batch(layer.shortcut, x, lengths)
+        for block_layer in layer.block:
+            x, lengths = _run_seanet_layer_on_padded_batch(block_layer, x, lengths)
+        return shortcut + x, lengths
+    if isinstance(layer, SConv1d):
+        # the padding (which reflects the signal at its end) has to be done for every item separately, like SConv1d.forward does it
+        kernel_size = layer.conv.conv.kernel_size[0]
+        stride = layer.conv.conv.stride[0]
+        dilation = layer.conv.conv.dilation[0]
+        padding_total = (kernel_size - 1) * dilation - (stride - 1)
+        if layer.causal:
+            paddings = [(padding_total, get_extra_padding_for_conv1d(x[..., :length], kernel_size, stride, padding_total)) for length in lengths]
+        else:
+            paddings = [(padding_total - padding_total // 2, padding_total // 2 + get_extra_padding_for_conv1d(x[..., :length], kernel_size, stride, padding_total)) for length in lengths]
+        padded_lengths = [padding_left + length + padding_right for (padding_left, padding_right), length in zip(paddings, lengths)]
+        padded_x = x.new_zeros([x.shape[0], x.shape[1], max(padded_lengths)])
+        padded_x[:, :, paddings[0][0]:paddings[0][0] + x.shape[-1]] = x[:, :, :max(padded_lengths) - paddings[0][0]]  # all items get the same padding on the left
+        for index, ((padding_left, padding_right), length) in enumerate(zip(paddings, lengths)):
+            if layer.pad_mode == "reflect" and length > max(padding_left, padding_right):
+                padded_x[index, :, :padding_left] = x[index, :, 1:padding_left + 1].flip(-1)
+                padded_x[index, :, padding_left + length:padding_left + length + padding_right] = x[index, :, length - padding_right - 1:length - 1].flip(-1)
+            else:
+                padded_x[index, :, :padded_lengths[index]] = pad1d(x[index:index + 1, :, :length], (padding_left, padding_right), mode=layer.pad_mode)[0]
+        x = padded_x
+        return layer.conv(x), [(padded_length - (kernel_size - 1) * dilation - 1) // stride + 1 for padded_length in padded_lengths]
+    if isinstance(layer, SConvTranspose1d):
+        # the steps after the end of an item would spill into its last valid outputs, so they are set to 0, as if the item ended there
+        stride = layer.convtr.convtr.stride[0]
+        is_valid = torch.arange(x.shape[-1], device=x.device).unsqueeze(0) < torch.tensor(lengths, device=x.device).unsqueeze(1)
+        return layer(x * is_valid.unsqueeze(1)), [length * stride for length in lengths]
+    # activations work on every step separately and the LSTM only looks back, so the padding at the end does not influence the valid steps
+    return layer(x), lengths
+
 
 def remove_encodec_weight_norm(model):
     from Preprocessing.Codec.seanet import SConv1d
@@ -83,10 +194,27 @@ def remove_encodec_weight_norm(model):
 
 
 if __name__ == '__main__':
+    import os
     import soundfile
+    import tempfile
 
     import time
 
+    # checks that need no audio files come first: decoding a batch has to give the same waves as decoding one item at a time.
+    # Randomly initialized weights are enough for that, they are saved in the format of a checkpoint so they can be loaded normally.
+    random_model = EnCodec(n_filters=32, D=512)
+    for name, buffer in random_model.named_buffers():
+        if name.endswith("embed"):
+            buffer.copy_(torch.randn_like(buffer))  # the codebooks are not initialized before training
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        torch.save({f"module.{name}": value for name, value in random_model.state_dict().items()}, os.path.join(tmp_dir, "random_encodec.pt"))
+        random_ap = CodecAudioPreprocessor(input_sr=16000, path_to_model=os.path.join(tmp_dir, "random_encodec.pt"))
+    random_indexes = [torch.randint(0, 1024, (24, length)) for length in [3, 50, 120, 400, 401]]
+    assert random_ap.indexes_to_audios([]) == [], "decoding an empty batch should give an empty list"
+    for single_wave, batched_wave in zip([random_ap.indexes_to_audio(indexes) for indexes in random_indexes], random_ap.indexes_to_audios(random_indexes)):
+        assert single_wave.shape == batched_wave.shape and torch.allclose(single_wave, batched_wave, atol=1e-5), "batched decoding differs from decoding one item at a time"
+    print("batched and single decoding are identical")
+
     with torch.inference_mode():
         test_audio1 = "../audios/ad01_0000.wav"
         test_audio2 = "../audios/angry.wav"
@@ -0,0 +1,154 @@
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from Utility.storage_config import PREPROCESSING_DIR
+
+DEFAULT_G2P_CACHE_PATH = os.path.join(PREPROCESSING_DIR, "g2p_cache.db")
+
+_caches_in_this_process = dict()
+
+
+def get_g2p_cache(path=DEFAULT_G2P_CACHE_PATH):
+    """
+    There is only one cache per file in each process, so
+    that all frontends share the in-memory part of it.
+    """
+    if path not in _caches_in_this_process:
+        _caches_in_this_process[path] = G2PCache(path=path)
+    return _caches_in_this_process[path]
+
+
+@atexit.register
+def _flush_caches_in_this_process():
+    for cache in _caches_in_this_process.values():
+        cache.flush()
+
+
+class G2PCache:
+    """
+    Two level cache for grapheme to phoneme conversion results:
+    an LRU cache in memory, backed by an sqlite database on disk,
+    which persists across runs and is shared by all processes.
+
+    Keys are tuples of strings (granularity, language, phonemizer
+    settings, text), values are the raw phoneme strings that the
+    phonemizer produced, before any of our postprocessing.
+    """
+
+    def __init__(self, path=DEFAULT_G2P_CACHE_PATH, max_items_in_memory=2 ** 16, commit_every_n_writes=64, commit_every_n_seconds=10, retries_when_locked=5):
+        self.path = path
+        self.max_items_in_memory = max_items_in_memory
+        self.commit_every_n_writes = commit_every_n_writes
+        self.commit_every_n_seconds = commit_every_n_seconds
+        self.retries_when_locked = retries_when_locked  # many processes building caches at once can keep the database busy for longer than the timeout
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.connection = None
+        self.connection_pid = None
+        self.disk_available = path is not None
+        self.uncommitted_writes = 0
+        self.last_commit = time.time()
+
+    def __reduce__(self):
+        # connections and locks cannot be sent to other processes, so every process gets its own cache for the same file
+        return get_g2p_cache, (self.path,)
+
+    def get(self, key):
+        key = "\t".join(key)
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                return self.memory[key]
+            connection = self._get_connection()
+            if connection is None:
+                return None
+            try:
+                row = self._retry_when_locked(lambda: connection.execute("SELECT phones FROM g2p WHERE key = ?", (key,)).fetchone())
+            except sqlite3.Error as e:
+                self._disable_disk(e)
+                return None
+            if row is None:
+                return None
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, key, phones):
+        key = "\t".join(key)
+        with self.lock:
+            self._remember(key, phones)
+            connection = self._get_connection()
+            if connection is None:
+                return
+            try:
+                self._retry_when_locked(lambda: connection.execute("INSERT OR REPLACE INTO g2p (key, phones) VALUES (?, ?)", (key, phones)))
+                self.uncommitted_writes += 1
+                if self.uncommitted_writes >= self.commit_every_n_writes or time.time() - self.last_commit > self.commit_every_n_seconds:
+                    self._commit()
+            except sqlite3.Error as e:
+                self._disable_disk(e)
+
+    def flush(self):
+        """
+        Makes sure everything that was written so far ends up on the disk.
+        Call this at the end of worker processes, they don't run exit handlers.
+        """
+        with self.lock:
+            if self.connection is not None and self.connection_pid == os.getpid() and self.uncommitted_writes > 0:
+                try:
+                    self._commit()
+                except sqlite3.Error as e:
+                    self._disable_disk(e)
+
+    def _remember(self, key, phones):
+        self.memory[key] = phones
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.max_items_in_memory:
+            self.memory.popitem(last=False)
+
+    def _commit(self):
+        self._retry_when_locked(self.connection.commit)
+        self.uncommitted_writes = 0
+        self.last_commit = time.time()
+
+    def _get_connection(self):
+        if not self.disk_available:
+            return None
+        if self.connection is not None and self.connection_pid == os.getpid():
+            return self.connection
+        # either we never connected, or we have been forked and must not reuse the connection of the parent
+        try:
+            if os.path.dirname(self.path) != "":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+            connection.execute("PRAGMA busy_timeout=60000")
+            self._retry_when_locked(lambda: connection.execute("PRAGMA journal_mode=WAL"))  # lets many processes read while one of them writes
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._retry_when_locked(lambda: connection.execute("CREATE TABLE IF NOT EXISTS g2p (key TEXT PRIMARY KEY, phones TEXT NOT NULL)"))
+            self._retry_when_locked(connection.commit)
+        except (sqlite3.Error, OSError) as e:
+            self._disable_disk(e)
+            return None
+        self.connection = connection
+        self.connection_pid = os.getpid()
+        self.uncommitted_writes = 0
+        return connection
+
+    def _retry_when_locked(self, operation):
+        for attempt in range(self.retries_when_locked + 1):
+            try:
+                return operation()
+            except sqlite3.OperationalError as e:
+                if attempt == self.retries_when_locked or ("locked" not in str(e) and "busy" not in str(e)):
+                    raise
+                print(f"The G2P cache at {self.path} is busy ({e}), trying again in {2 ** attempt} seconds.")
+                time.sleep(2 ** attempt)
+
+    def _disable_disk(self, error):
+        print(f"WARNING: The G2P cache at {self.path} cannot be used ({error}). For the rest of this run in process {os.getpid()}, "
+              f"phonemizer results are only remembered in memory and nothing new is written to the disk.")
+        self.disk_available = False
+        self.connection = None
@@ -4,13 +4,16 @@
 import json
 import logging
 import re
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 
 import torch
 from dragonmapper.transcriptions import pinyin_to_ipa
 from phonemizer.backend import EspeakBackend
 from pypinyin import pinyin
 
+from Preprocessing.G2PCache import get_g2p_cache
 from Preprocessing.articulatory_features import generate_feature_table
 from Preprocessing.articulatory_features import get_feature_to_index_lookup
 from Preprocessing.articulatory_features import get_phone_to_id
@@ -23,6 +26,105 @@ def load_json_from_path(path):  # redundant to the one in utils, but necessary t
     return obj
 
 
+class SequentialReplacements:
+    """
+    Applies an ordered list of (old, new) replacements with the exact same
+    result as calling str.replace for each of them in order, but in one pass.
+
+    Characters that can never take part in a replacement of more than one
+    character go through a translation table that maps them to the result
+    of the entire list of replacements. Only runs of characters that can
+    interact get the sequential treatment, and those results are cached.
+    """
+
+    def __init__(self, replacements):
+        self.replacements = list(replacements)
+        multi_char_indexes = [index for index, (old, _) in enumerate(self.replacements) if len(old) != 1]
+        self.interacting_characters = set("".join(self.replacements[index][0] for index in multi_char_indexes))
+        if len(multi_char_indexes) > 0:
+            # a character also interacts, if before the last multi-character replacement it becomes one that interacts, or if it vanishes and thereby joins its neighbours
+            replacements_that_matter = self.replacements[:max(multi_char_indexes)]
+            found_new_interacting_character = True
+            while found_new_interacting_character:
+                found_new_interacting_character = False
+                for old, _ in self.replacements:
+                    if len(old) == 1 and old not in self.interacting_characters:
+                        intermediate = old
+                        for replacement in replacements_that_matter:
+                            intermediate = intermediate.replace(replacement[0], replacement[1])
+                            if intermediate == "" or not self.interacting_characters.isdisjoint(intermediate):
+                                self.interacting_characters.add(old)
+                                found_new_interacting_character = True
+                                break
+        self.translation_table = {ord(old): self.apply_sequentially(old) for old, _ in self.replacements if len(old) == 1 and old not in self.interacting_characters}
+        self.interacting_run_pattern = None
+        if len(self.interacting_characters) > 0:
+            self.interacting_run_pattern = re.compile("([" + "".join(re.escape(char) for char in sorted(self.interacting_characters)) + "]+)")
+        self.run_cache = dict()
+
+    def apply_sequentially(self, text):
+        for replacement in self.replacements:
+            text = text.replace(replacement[0], replacement[1])
+        return text
+
+    def __call__(self, text):
+        if self.interacting_run_pattern is None:
+            return text.translate(self.translation_table)
+        parts = self.interacting_run_pattern.split(text)
+        # because of the capturing group, the parts alternate between not interacting and interacting runs
+        for index in range(0, len(parts), 2):
+            parts[index] = parts[index].translate(self.translation_table)
+        for index in range(1, len(parts), 2):
+            run = parts[index]
+            if run not in self.run_cache:
+                if len(self.run_cache) > 100000:
+                    self.run_cache = dict()
+                self.run_cache[run] = self.apply_sequentially(run)
+            parts[index] = self.run_cache[run]
+        return "".join(parts)
+
+
+TONE_RUN_PATTERN = re.compile("[˥˦˧˨˩]{2,}")
+
+# symbols that modify the phone before them, mapped to the features they set and the value they set them to.
+# A value of 2 marks a secondary articulation, which is only added if the phone doesn't already have it as primary articulation.
+PHONE_MODIFIERS = {
+    '\u02D0': (["lengthened"], 1),
+    '\u02D1': (["half-length"], 1),
+    '\u0306': (["shortened"], 1),
+    '̃'     : (["nasal"], 2),  # nasalized (vowel)
+    "̧"     : (["palatal"], 2),  # palatalized
+    "ʷ"     : (["labial-velar"], 2),  # labialized
+    "ʰ"     : (["aspirated"], 2),  # aspirated
+    "ˠ"     : (["velar"], 2),  # velarized
+    "ˁ"     : (["pharyngal"], 2),  # pharyngealized
+    "ˀ"     : (["glottal"], 2),  # glottalized
+    "ʼ"     : (["ejective"], 2),  # ejective
+    "̹"     : (["rounded"], 2),  # rounding
+    "̞"     : (["open"], 2),  # open
+    "̪"     : (["dental"], 2),  # dental
+    "̬"     : (["voiced"], 2),  # voiced
+    "̝"     : (["close"], 2),  # closed
+    "̰"     : (["glottal", "epiglottal"], 2),  # laryngalization
+    "̈"     : (["central"], 2),  # centralization
+    "̜"     : (["unrounded"], 2),  # unrounded
+    "̥"     : (["unvoiced"], 2),  # voiceless
+    "˥"     : (["very-high-tone"], 1),
+    "˦"     : (["high-tone"], 1),
+    "˧"     : (["mid-tone"], 1),
+    "˨"     : (["low-tone"], 1),
+    "˩"     : (["very-low-tone"], 1),
+    "⭧"     : (["rising-tone"], 1),
+    "⭨"     : (["falling-tone"], 1),
+    "⮁"     : (["peaking-tone"], 1),
+    "⮃"     : (["dipping-tone"], 1),
+}
+
+# splits a phoneme string into groups of (primary stress marks, phone, modifiers of that phone)
+_modifier_class = "".join(re.escape(modifier) for modifier in PHONE_MODIFIERS)
+PHONE_GROUP_PATTERN = re.compile(f"(\u02C8*)([^\u02C8{_modifier_class}]?)([{_modifier_class}]*)", re.DOTALL)
+
+
 class ArticulatoryCombinedTextFrontend:
 
     def __init__(self,
@@ -32,9 +134,16 @@ class ArticulatoryCombinedTextFrontend:
                  silent=True,
                  add_silence_to_end=True,
                  use_word_boundaries=True,
-                 device="cpu"):
+                 device="cpu",
+                 use_g2p_cache=False):
         """
         Mostly preparing ID lookups
+
+        use_g2p_cache: remember the results of the phonemizer in memory and on
+                       the disk, so the same text is never phonemized twice.
+                       Meant for building dataset caches, where the same texts
+                       come up again and again. Off by default, so inference
+                       does not write to the shared database.
         """
 
         # this locks the device, so it has to happen here and not at the top
@@ -45,6 +154,8 @@ class ArticulatoryCombinedTextFrontend:
         self.use_stress = use_lexical_stress
         self.add_silence_to_end = add_silence_to_end
         self.use_word_boundaries = use_word_boundaries
+        self.g2p_cache = get_g2p_cache() if use_g2p_cache else None
+        self.espeak_version = None
 
         register_to_height = {
             "˥": 5,
@@ -69,6 +180,7 @@ class ArticulatoryCombinedTextFrontend:
                         self.dipping_perms.append(first_tone + second_tone + third_tone)
                     elif register_to_height[first_tone] < register_to_height[second_tone] > register_to_height[third_tone]:
                         self.peaking_perms.append(first_tone + second_tone + third_tone)
+        self.contour_tone_cache = dict()
 
         if language == "eng" or language == "en-us":
             self.g2p_lang = "en-us"  # English as spoken in USA
@@ -597,6 +709,7 @@ class ArticulatoryCombinedTextFrontend:
                                                         language_switch='remove-flags',
                                                         with_stress=self.use_stress,
                                                         logger=logging.getLogger(__file__))
+                self.espeak_version = ".".join(str(v) for v in EspeakBackend.version())  # different versions of espeak produce different outputs, so this is part of the cache key
             except RuntimeError:
                 print("Error in loading espeak! \n"
                       "Maybe espeak is not installed on your system? \n"
@@ -607,9 +720,21 @@ class ArticulatoryCombinedTextFrontend:
                 self.expand_abbreviations = lambda x: x
                 self.transphone = read_g2p()
         self.phone_to_vector = generate_feature_table()
+        self.feature_to_index = get_feature_to_index_lookup()
+        self.phone_to_row = {phone: row for row, phone in enumerate(self.phone_to_vector)}
+        self.phone_feature_rows = list(self.phone_to_vector.values())
+        self.phone_feature_matrix = torch.Tensor(self.phone_feature_rows)
+        self.modifier_to_feature_indexes = {modifier: ([self.feature_to_index[feature] for feature in features], value) for modifier, (features, value) in PHONE_MODIFIERS.items()}
         self.phone_to_id = get_phone_to_id()
         self.id_to_phone = {v: k for k, v in self.phone_to_id.items()}
-        self.text_vector_to_phone_cache = dict()
+        # inverse lookup from articulatory features to IDs: the features of a phone that don't stem from modifiers are binary, so they can be read as an integer code
+        self.phone_code_weights = 2 ** torch.arange(self.phone_feature_matrix.shape[1] - 13)
+        phone_code_to_id = dict()
+        for phone, code in zip(self.phone_to_vector, (self.phone_feature_matrix[:, 13:].long() * self.phone_code_weights).sum(-1).tolist()):
+            if phone in self.phone_to_id and code not in phone_code_to_id:
+                phone_code_to_id[code] = self.phone_to_id[phone]
+        self.sorted_phone_codes = torch.LongTensor(sorted(phone_code_to_id))
+        self.ids_of_sorted_phone_codes = torch.LongTensor([phone_code_to_id[code] for code in sorted(phone_code_to_id)])
 
     @staticmethod
     def get_example_sentence(lang):
@@ -659,123 +784,59 @@ class ArticulatoryCombinedTextFrontend:
         phones = phones.replace("ɚ", "ə").replace("ᵻ", "ɨ")
         if view:
             print("Phonemes: \n{}\n".format(phones))
-        phones_vector = list()
-        # turn into numeric vectors
+        rows = list()  # one row of the phone feature matrix per phone
+        modifications = list()  # (position in the sequence, feature index, value) for every modifier encountered
         stressed_flag = False
 
-        for char in phones:
+        for stress_marks, phone, modifiers in PHONE_GROUP_PATTERN.findall(phones):
             # affects following phoneme -----------------
-            if char.strip() == '\u02C8':
+            if stress_marks != "":
                 # primary stress
                 stressed_flag = True
+            if phone != "":
+                stressed_flag = self._append_phone(phone, rows, modifications, stressed_flag, handle_missing)
             # affects previous phoneme -----------------
-            elif char.strip() == '\u02D0':
-                # lengthened
-                phones_vector[-1][get_feature_to_index_lookup()["lengthened"]] = 1
-            elif char.strip() == '\u02D1':
-                # half length
-                phones_vector[-1][get_feature_to_index_lookup()["half-length"]] = 1
-            elif char.strip() == '\u0306':
-                # shortened
-                phones_vector[-1][get_feature_to_index_lookup()["shortened"]] = 1
-            elif char.strip() == '̃' and phones_vector[-1][get_feature_to_index_lookup()["nasal"]] != 1:
-                # nasalized (vowel)
-                phones_vector[-1][get_feature_to_index_lookup()["nasal"]] = 2
-            elif char.strip() == "̧" != phones_vector[-1][get_feature_to_index_lookup()["palatal"]] != 1:
-                # palatalized
-                phones_vector[-1][get_feature_to_index_lookup()["palatal"]] = 2
-            elif char.strip() == "ʷ" and phones_vector[-1][get_feature_to_index_lookup()["labial-velar"]] != 1:
-                # labialized
-                phones_vector[-1][get_feature_to_index_lookup()["labial-velar"]] = 2
-            elif char.strip() == "ʰ" and phones_vector[-1][get_feature_to_index_lookup()["aspirated"]] != 1:
-                # aspirated
-                phones_vector[-1][get_feature_to_index_lookup()["aspirated"]] = 2
-            elif char.strip() == "ˠ" and phones_vector[-1][get_feature_to_index_lookup()["velar"]] != 1:
-                # velarized
-                phones_vector[-1][get_feature_to_index_lookup()["velar"]] = 2
-            elif char.strip() == "ˁ" and phones_vector[-1][get_feature_to_index_lookup()["pharyngal"]] != 1:
-                # pharyngealized
-                phones_vector[-1][get_feature_to_index_lookup()["pharyngal"]] = 2
-            elif char.strip() == "ˀ" and phones_vector[-1][get_feature_to_index_lookup()["glottal"]] != 1:
-                # glottalized
-                phones_vector[-1][get_feature_to_index_lookup()["glottal"]] = 2
-            elif char.strip() == "ʼ" and phones_vector[-1][get_feature_to_index_lookup()["ejective"]] != 1:
-                # ejective
-                phones_vector[-1][get_feature_to_index_lookup()["ejective"]] = 2
-            elif char.strip() == "̹" and phones_vector[-1][get_feature_to_index_lookup()["rounded"]] != 1:
-                # rounding
-                phones_vector[-1][get_feature_to_index_lookup()["rounded"]] = 2
-            elif char.strip() == "̞" and phones_vector[-1][get_feature_to_index_lookup()["open"]] != 1:
-                # open
-                phones_vector[-1][get_feature_to_index_lookup()["open"]] = 2
-            elif char.strip() == "̪" and phones_vector[-1][get_feature_to_index_lookup()["dental"]] != 1:
-                # dental
-                phones_vector[-1][get_feature_to_index_lookup()["dental"]] = 2
-            elif char.strip() == "̬" and phones_vector[-1][get_feature_to_index_lookup()["voiced"]] != 1:
-                # voiced
-                phones_vector[-1][get_feature_to_index_lookup()["voiced"]] = 2
-            elif char.strip() == "̝" and phones_vector[-1][get_feature_to_index_lookup()["close"]] != 1:
-                # closed
-                phones_vector[-1][get_feature_to_index_lookup()["close"]] = 2
-            elif char.strip() == "̰" and phones_vector[-1][get_feature_to_index_lookup()["glottal"]] != 1 and phones_vector[-1][get_feature_to_index_lookup()["epiglottal"]] != 1:
-                # laryngalization
-                phones_vector[-1][get_feature_to_index_lookup()["glottal"]] = 2
-                phones_vector[-1][get_feature_to_index_lookup()["epiglottal"]] = 2
-            elif char.strip() == "̈" and phones_vector[-1][get_feature_to_index_lookup()["central"]] != 1:
-                # centralization
-                phones_vector[-1][get_feature_to_index_lookup()["central"]] = 2
-            elif char.strip() == "̜" and phones_vector[-1][get_feature_to_index_lookup()["unrounded"]] != 1:
-                # unrounded
-                phones_vector[-1][get_feature_to_index_lookup()["unrounded"]] = 2
-            elif char.strip() == "̥" and phones_vector[-1][get_feature_to_index_lookup()["unvoiced"]] != 1:
-                # voiceless
-                phones_vector[-1][get_feature_to_index_lookup()["unvoiced"]] = 2
-            elif char.strip() == "˥":
-                # very high tone
-                phones_vector[-1][get_feature_to_index_lookup()["very-high-tone"]] = 1
-            elif char.strip() == "˦":
-                # high tone
-                phones_vector[-1][get_feature_to_index_lookup()["high-tone"]] = 1
-            elif char.strip() == "˧":
-                # mid tone
-                phones_vector[-1][get_feature_to_index_lookup()["mid-tone"]] = 1
-            elif char.strip() == "˨":
-                # low tone
-                phones_vector[-1][get_feature_to_index_lookup()["low-tone"]] = 1
-            elif char.strip() == "˩":
-                # very low tone
-                phones_vector[-1][get_feature_to_index_lookup()["very-low-tone"]] = 1
-            elif char.strip() == "⭧":
-                # rising tone
-                phones_vector[-1][get_feature_to_index_lookup()["rising-tone"]] = 1
-            elif char.strip() == "⭨":
-                # falling tone
-                phones_vector[-1][get_feature_to_index_lookup()["falling-tone"]] = 1
-            elif char.strip() == "⮁":
-                # peaking tone
-                phones_vector[-1][get_feature_to_index_lookup()["peaking-tone"]] = 1
-            elif char.strip() == "⮃":
-                # dipping tone
-                phones_vector[-1][get_feature_to_index_lookup()["dipping-tone"]] = 1
-            else:
-                if handle_missing:
-                    try:
-                        phones_vector.append(self.phone_to_vector[char].copy())
-                    except KeyError:
-                        print("unknown phoneme: {}".format(char))
-                else:
-                    phones_vector.append(self.phone_to_vector[char].copy())  # leave error handling to elsewhere
-                # the following lines try to emulate whispering by removing all voiced features
-                # phones_vector[-1][get_feature_to_index_lookup()["voiced"]] = 0
-                # phones_vector[-1][get_feature_to_index_lookup()["unvoiced"]] = 1
-                # the following lines explore what would happen, if the system is told to produce sounds a human cannot
-                # for dim, _ in enumerate(phones_vector[-1]):
-                #     phones_vector[-1][dim] = 1
-                if stressed_flag:
-                    stressed_flag = False
-                    phones_vector[-1][get_feature_to_index_lookup()["stressed"]] = 1
-
-        return torch.Tensor(phones_vector, device=device)
+            for modifier in modifiers:
+                if len(rows) == 0:
+                    continue  # there is no phone that could be modified
+                feature_indexes, value = self.modifier_to_feature_indexes[modifier]
+                if value == 2 and any(self.phone_feature_rows[rows[-1]][feature_index] == 1 for feature_index in feature_indexes):
+                    # the phone already has this as its primary articulation, so the modifier is treated like any other symbol
+                    stressed_flag = self._append_phone(modifier, rows, modifications, stressed_flag, handle_missing)
+                    continue
+                for feature_index in feature_indexes:
+                    modifications.append((len(rows) - 1, feature_index, value))
+
+        if len(rows) == 0:
+            return torch.Tensor(list(), device=device)  # same 1D empty tensor as for an empty list of feature vectors
+        phones_vector = self.phone_feature_matrix[rows]  # advanced indexing gives us a fresh copy that we can modify
+        if len(modifications) > 0:
+            positions, feature_indexes, values = zip(*modifications)
+            phones_vector[list(positions), list(feature_indexes)] = torch.Tensor(values)
+        # the following lines try to emulate whispering by removing all voiced features
+        # phones_vector[:, get_feature_to_index_lookup()["voiced"]] = 0
+        # phones_vector[:, get_feature_to_index_lookup()["unvoiced"]] = 1
+        # the following line explores what would happen, if the system is told to produce sounds a human cannot
+        # phones_vector[:, :] = 1
+
+        return phones_vector.to(device)
+
+    def _append_phone(self, phone, rows, modifications, stressed_flag, handle_missing):
+        """
+        Looks up the row of a phone in the feature matrix and
+        resolves a pending stress mark. Returns the new state
+        of the stress flag.
+        """
+        if handle_missing:
+            try:
+                rows.append(self.phone_to_row[phone])
+            except KeyError:
+                print("unknown phoneme: {}".format(phone))
+        else:
+            rows.append(self.phone_to_row[phone])  # leave error handling to elsewhere
+        if stressed_flag and len(rows) > 0:
+            modifications.append((len(rows) - 1, self.feature_to_index["stressed"], 1))
+        return False
 
     def get_phone_string(self, text, include_eos_symbol=True, for_feature_extraction=False, for_plot_labels=False):
         if text == "":
@@ -784,9 +845,13 @@ class ArticulatoryCombinedTextFrontend:
         utt = self.expand_abbreviations(text)
 
         # convert the graphemes to phonemes here
-        if self.phonemizer == "espeak":
+        phones = self._lookup_g2p_cache("utterance", utt)
+        if phones is not None:
+            pass  # we have seen this utterance before
+        elif self.phonemizer == "espeak":
             try:
                 phones = self.phonemizer_backend.phonemize([utt], strip=True)[0]  # To use a different phonemizer, this is the only line that needs to be exchanged
+                self._store_in_g2p_cache("utterance", utt, phones)
             except:
                 print(f"There was an error with espeak. \nFalling back to transphone.\nSentence: {utt} \nLanguage {self.g2p_lang}")
                 from transphone.g2p import read_g2p
@@ -796,40 +861,8 @@ class ArticulatoryCombinedTextFrontend:
                 self.transphone = read_g2p()
                 return self.get_phone_string(text, include_eos_symbol, for_feature_extraction, for_plot_labels)
         elif self.phonemizer == "transphone":
-            replacements = [
-                # punctuation in languages with non-latin script
-                ("。", "~"),
-                ("，", "~"),
-                ("【", '~'),
-                ("】", '~'),
-                ("、", "~"),
-                ("‥", "~"),
-                ("؟", "~"),
-                ("،", "~"),
-                ("“", '~'),
-                ("”", '~'),
-                ("؛", "~"),
-                ("《", '~'),
-                ("》", '~'),
-                ("？", "~"),
-                ("！", "~"),
-                (" ：", "~"),
-                (" ；", "~"),
-                ("－", "~"),
-                ("·", " "),
-                ("`", ""),
-                # symbols that indicate a pause or silence
-                ('"', "~"),
-                (" - ", "~ "),
-                ("- ", "~ "),
-                ("-", ""),
-                ("…", "~"),
-                (":", "~"),
-                (";", "~"),
-                (",", "~")  # make sure this remains the final one when adding new ones
-            ]
-            for replacement in replacements:
-                utt = utt.replace(replacement[0], replacement[1])
+            text_before_replacements = utt
+            utt = get_transphone_punctuation_handling()(utt)
             utt = re.sub("~+", "~", utt)
             utt = re.sub(r"\s+", " ", utt)
             utt = re.sub(r"\.+", ".", utt)
@@ -839,12 +872,79 @@ class ArticulatoryCombinedTextFrontend:
                 # this is not much better, but maybe a little.
                 word_list = list()
                 for word_by_whitespace in chunk.split():
-                    word_list.append(self.transphone.inference(word_by_whitespace, self.g2p_lang))
-                chunk_list.append(" ".join(["".join(word) for word in word_list]))
+                    word_phones = self._lookup_g2p_cache("word", word_by_whitespace)
+                    if word_phones is None:
+                        word_phones = "".join(self.transphone.inference(word_by_whitespace, self.g2p_lang))
+                        self._store_in_g2p_cache("word", word_by_whitespace, word_phones)
+                    word_list.append(word_phones)
+                chunk_list.append(" ".join(word_list))
             phones = "~ ".join(chunk_list)
+            self._store_in_g2p_cache("utterance", text_before_replacements, phones)
         elif self.phonemizer == "dragonmapper":
             phones = pinyin_to_ipa(utt)
+        return self._finalize_phone_string(phones, include_eos_symbol, for_feature_extraction, for_plot_labels)
 
+    def get_phone_strings(self, texts, include_eos_symbol=True, for_feature_extraction=False, for_plot_labels=False):
+        """
+        Same as get_phone_string, but for a list of texts. With espeak,
+        all texts that have not been phonemized before are handled in a
+        single call to the backend, which is much faster for large corpora.
+        The result at each position is identical to what get_phone_string
+        returns for the text at that position.
+        """
+        text_to_phones = self._phonemize_batch_with_espeak(texts)
+        phone_strings = list()
+        for text in texts:
+            if text in text_to_phones:
+                phone_strings.append(self._finalize_phone_string(text_to_phones[text], include_eos_symbol, for_feature_extraction, for_plot_labels))
+            else:
+                phone_strings.append(self.get_phone_string(text, include_eos_symbol, for_feature_extraction, for_plot_labels))
+        return phone_strings
+
+    def strings_to_tensors(self, texts, view=False, device="cpu", handle_missing=True, input_phonemes=False):
+        """
+        Same as string_to_tensor, but for a list of texts, with a single call to the phonemizer backend.
+        """
+        if not input_phonemes:
+            texts = self.get_phone_strings(texts, include_eos_symbol=True, for_feature_extraction=True)
+        return [self.string_to_tensor(phones, view=view, device=device, handle_missing=handle_missing, input_phonemes=True) for phones in texts]
+
+    def _phonemize_batch_with_espeak(self, texts):
+        """
+        returns a dict from the texts that could be phonemized in one go to their raw phonemes.
+        Everything that is missing is left for the regular one-by-one procedure.
+        """
+        if self.phonemizer != "espeak":
+            return dict()
+        text_to_phones = dict()
+        utt_to_texts = dict()
+        for text in texts:
+            if text == "" or text in text_to_phones:
+                continue
+            utt = self.expand_abbreviations(text)
+            phones = self._lookup_g2p_cache("utterance", utt)
+            if phones is not None:
+                text_to_phones[text] = phones
+            elif "\n" not in utt and "\r" not in utt and re.search(r"\w", utt) is not None:
+                # the backend treats every string as one line and drops empty ones, so only those
+                # are safe to batch where we know that there will be exactly one output line.
+                utt_to_texts.setdefault(utt, list()).append(text)
+        if len(utt_to_texts) == 0:
+            return text_to_phones
+        utts = list(utt_to_texts.keys())
+        try:
+            batch_phones = self.phonemizer_backend.phonemize(utts, strip=True)
+        except:
+            return text_to_phones  # the regular procedure will deal with the error and fall back to transphone if necessary
+        if len(batch_phones) != len(utts):
+            return text_to_phones  # we cannot tell which output belongs to which input, so we go one by one instead
+        for utt, phones in zip(utts, batch_phones):
+            self._store_in_g2p_cache("utterance", utt, phones)
+            for text in utt_to_texts[utt]:
+                text_to_phones[text] = phones
+        return text_to_phones
+
+    def _finalize_phone_string(self, phones, include_eos_symbol, for_feature_extraction, for_plot_labels):
         # Unfortunately tonal languages don't agree on the tone, most tonal
         # languages use different tones denoted by different numbering
         # systems. At this point in the script, it is attempted to unify
@@ -868,142 +968,31 @@ class ArticulatoryCombinedTextFrontend:
         # more of this handling for more tonal languages can be added here, simply make an elif statement and check for the language.
         return self.postprocess_phoneme_string(phones, for_feature_extraction, include_eos_symbol, for_plot_labels)
 
+    def _g2p_cache_key(self, granularity, text):
+        backend = f"espeak-{self.espeak_version}" if self.phonemizer == "espeak" else self.phonemizer
+        return granularity, self.language, backend, self.g2p_lang, str(self.use_stress), text
+
+    def _lookup_g2p_cache(self, granularity, text):
+        if self.g2p_cache is None or self.phonemizer == "dragonmapper":  # dragonmapper is a simple lookup, not worth caching
+            return None
+        return self.g2p_cache.get(self._g2p_cache_key(granularity, text))
+
+    def _store_in_g2p_cache(self, granularity, text, phones):
+        if self.g2p_cache is not None:
+            self.g2p_cache.put(self._g2p_cache_key(granularity, text), phones)
+
     def postprocess_phoneme_string(self, phoneme_string, for_feature_extraction, include_eos_symbol, for_plot_labels):
         """
         Takes as input a phoneme string and processes it to work best with the way we represent phonemes as featurevectors
         """
-        replacements = [
-            # punctuation in languages with non-latin script
-            ("。", "."),
-            ("，", ","),
-            ("【", '"'),
-            ("】", '"'),
-            ("、", ","),
-            ("‥", "…"),
-            ("؟", "?"),
-            ("،", ","),
-            ("“", '"'),
-            ("”", '"'),
-            ("؛", ","),
-            ("《", '"'),
-            ("》", '"'),
-            ("？", "?"),
-            ("！", "!"),
-            (" ：", ":"),
-            (" ；", ";"),
-            ("－", "-"),
-            ("·", " "),
-            # latin script punctuation
-            ("/", " "),
-            ("—", ""),
-            ("(", "~"),
-            (")", "~"),
-            ("...", "…"),
-            ("\n", ", "),
-            ("\t", " "),
-            ("¡", ""),
-            ("¿", ""),
-            ("«", '"'),
-            ("»", '"'),
-            # unifying some phoneme representations
-            ("N", "ŋ"),  # somehow transphone doesn't transform this to IPA
-            ("ɫ", "l"),  # alveolopalatal
-            ("ɚ", "ə"),
-            ("g", "ɡ"),
-            ("ε", "e"),
-            ("ʦ", "ts"),
-            ("ˤ", "ˁ"),
-            ('ᵻ', 'ɨ'),
-            ("ɧ", "ç"),  # velopalatal
-            ("ɥ", "j"),  # labiopalatal
-            ("ɬ", "s"),  # lateral
-            ("ɮ", "z"),  # lateral
-            ('ɺ', 'ɾ'),  # lateral
-            ('ʲ', 'j'),  # decomposed palatalization
-            ('\u02CC', ""),  # secondary stress
-            ('\u030B', "˥"),
-            ('\u0301', "˦"),
-            ('\u0304', "˧"),
-            ('\u0300', "˨"),
-            ('\u030F', "˩"),
-            ('\u0302', "⭨"),
-            ('\u030C', "⭧"),
-            ("꜖", "˩"),
-            ("꜕", "˨"),
-            ("꜔", "˧"),
-            ("꜓", "˦"),
-            ("꜒", "˥"),
-            # symbols that indicate a pause or silence
-            ('"', "~"),
-            (" - ", "~ "),
-            ("- ", "~ "),
-            ("-", ""),
-            ("…", "."),
-            (":", "~"),
-            (";", "~"),
-            (",", "~")  # make sure this remains the final one when adding new ones
-        ]
-        unsupported_ipa_characters = {'̙', '̯', '̤', '̩', '̠', '̟', 'ꜜ', '̽', '|', '•', '↘',
-                                      '‖', '‿', 'ᷝ', 'ᷠ', '̚', '↗', 'ꜛ', '̻', '̘', '͡', '̺'}
-        #  https://en.wikipedia.org/wiki/IPA_number
-        for char in unsupported_ipa_characters:
-            replacements.append((char, ""))
-
-        if not for_feature_extraction:
-            # in case we want to plot etc., we only need the segmental units, so we remove everything else.
-            replacements = replacements + [
-                ('\u02C8', ""),  # primary stress
-                ('\u02D0', ""),  # lengthened
-                ('\u02D1', ""),  # half-length
-                ('\u0306', ""),  # shortened
-                ("˥", ""),  # very high tone
-                ("˦", ""),  # high tone
-                ("˧", ""),  # mid tone
-                ("˨", ""),  # low tone
-                ("˩", ""),  # very low tone
-                ('\u030C', ""),  # rising tone
-                ('\u0302', ""),  # falling tone
-                ('⭧', ""),  # rising
-                ('⭨', ""),  # falling
-                ('⮃', ""),  # dipping
-                ('⮁', ""),  # peaking
-                ('̃', ""),  # nasalizing
-                ("̧", ""),  # palatalized
-                ("ʷ", ""),  # labialized
-                ("ʰ", ""),  # aspirated
-                ("ˠ", ""),  # velarized
-                ("ˁ", ""),  # pharyngealized
-                ("ˀ", ""),  # glottalized
-                ("ʼ", ""),  # ejective
-                ("̹", ""),  # rounding
-                ("̞", ""),  # open
-                ("̪", ""),  # dental
-                ("̬", ""),  # voiced
-                ("̝", ""),  # closed
-                ("̰", ""),  # laryngalization
-                ("̈", ""),  # centralization
-                ("̜", ""),  # unrounded
-                ("̥", ""),  # voiceless
-            ]
-        for replacement in replacements:
-            phoneme_string = phoneme_string.replace(replacement[0], replacement[1])
+        phoneme_string = get_phoneme_postprocessing(for_feature_extraction)(phoneme_string)
         phones = re.sub("~+", "~", phoneme_string)
         phones = re.sub(r"\s+", " ", phones)
         phones = re.sub(r"\.+", ".", phones)
         phones = phones.lstrip("~").rstrip("~")
 
-        # peaking tones
-        for peaking_perm in self.peaking_perms:
-            phones = phones.replace(peaking_perm, "⮁".join(peaking_perm))
-        # dipping tones
-        for dipping_perm in self.dipping_perms:
-            phones = phones.replace(dipping_perm, "⮃".join(dipping_perm))
-        # rising tones
-        for rising_perm in self.rising_perms:
-            phones = phones.replace(rising_perm, "⭧".join(rising_perm))
-        # falling tones
-        for falling_perm in self.falling_perms:
-            phones = phones.replace(falling_perm, "⭨".join(falling_perm))
+        # contour tones are marked within each run of consecutive tone letters
+        phones = TONE_RUN_PATTERN.sub(self._mark_contour_tones, phones)
 
         if self.add_silence_to_end:
             phones += "~"  # adding a silence in the end during inference produces more natural sounding prosody
@@ -1019,29 +1008,224 @@ class ArticulatoryCombinedTextFrontend:
 
         return phones
 
+    def _mark_contour_tones(self, tone_run_match):
+        tone_run = tone_run_match.group()
+        if tone_run not in self.contour_tone_cache:
+            # peaking tones
+            for peaking_perm in self.peaking_perms:
+                tone_run = tone_run.replace(peaking_perm, "⮁".join(peaking_perm))
+            # dipping tones
+            for dipping_perm in self.dipping_perms:
+                tone_run = tone_run.replace(dipping_perm, "⮃".join(dipping_perm))
+            # rising tones
+            for rising_perm in self.rising_perms:
+                tone_run = tone_run.replace(rising_perm, "⭧".join(rising_perm))
+            # falling tones
+            for falling_perm in self.falling_perms:
+                tone_run = tone_run.replace(falling_perm, "⭨".join(falling_perm))
+            self.contour_tone_cache[tone_run_match.group()] = tone_run
+        return self.contour_tone_cache[tone_run_match.group()]
+
+    def text_vectors_to_ids(self, text_vectors):
+        """
+        Maps articulatory feature vectors back to phone IDs in one vectorised
+        operation. Works for a [T, F] sequence as well as for a padded batch
+        of shape [B, T, F] and returns the IDs in the same leading shape.
+        Word boundaries and vectors that don't belong to any phone (such as
+        padding) get the ID -1.
+        """
+        text_vectors = text_vectors.cpu()
+        # the first 12 dimensions are for modifiers, so we ignore those when trying to find the phoneme in the ID lookup
+        features = text_vectors[..., 13:]
+        # we remove all features that stem from a modifier, so we can map back to the unmodified sound
+        features = torch.where(features == 2, torch.zeros_like(features), features)
+        is_binary = torch.logical_or(features == 0, features == 1).all(-1)
+        codes = (features.long().clamp(0, 1) * self.phone_code_weights).sum(-1)
+        positions = torch.searchsorted(self.sorted_phone_codes, codes).clamp(max=len(self.sorted_phone_codes) - 1)
+        # we don't include word boundaries when performing alignment, since they are not always present in audio.
+        is_phone = (self.sorted_phone_codes[positions] == codes) & is_binary & (text_vectors[..., self.feature_to_index["word-boundary"]] == 0)
+        return torch.where(is_phone, self.ids_of_sorted_phone_codes[positions], torch.full_like(codes, -1))
+
     def text_vectors_to_id_sequence(self, text_vector):
-        tokens = list()
-        for vector in text_vector:
-            if vector[get_feature_to_index_lookup()["word-boundary"]] == 0:
-                # we don't include word boundaries when performing alignment, since they are not always present in audio.
-                features = vector.cpu().numpy().tolist()
-                immutable_vector = tuple(features)
-                if immutable_vector in self.text_vector_to_phone_cache:
-                    tokens.append(self.phone_to_id[self.text_vector_to_phone_cache[immutable_vector]])
-                    continue
-                features = features[13:]
-                # the first 12 dimensions are for modifiers, so we ignore those when trying to find the phoneme in the ID lookup
-                for index in range(len(features)):
-                    if features[index] == 2:
-                        # we remove all features that stem from a modifier, so we can map back to the unmodified sound
-                        features[index] = 0
-                for phone in self.phone_to_vector:
-                    if features == self.phone_to_vector[phone][13:]:
-                        tokens.append(self.phone_to_id[phone])
-                        self.text_vector_to_phone_cache[immutable_vector] = phone
-                        # this is terribly inefficient, but it's fine, since we're building a cache over time that makes this instant
-                        break
-        return tokens
+        ids = self.text_vectors_to_ids(text_vector)
+        return ids[ids != -1].tolist()
+
+    def text_vectors_to_id_sequences(self, text_vectors):
+        """
+        Converts a list of [T, F] sequences of different lengths to a list
+        of LongTensors of phone IDs, using a single lookup for all of them.
+        """
+        if len(text_vectors) == 0:
+            return list()
+        ids = self.text_vectors_to_ids(torch.cat([text_vector.view(-1, text_vector.shape[-1]) for text_vector in text_vectors], dim=0))
+        return [sequence[sequence != -1] for sequence in torch.split(ids, [len(text_vector.view(-1, text_vector.shape[-1])) for text_vector in text_vectors])]
+
+
+@lru_cache(maxsize=None)
+def get_phoneme_postprocessing(for_feature_extraction):
+    """
+    The replacements that postprocess_phoneme_string applies, compiled once per process.
+    """
+    replacements = [
+        # punctuation in languages with non-latin script
+        ("。", "."),
+        ("，", ","),
+        ("【", '"'),
+        ("】", '"'),
+        ("、", ","),
+        ("‥", "…"),
+        ("؟", "?"),
+        ("،", ","),
+        ("“", '"'),
+        ("”", '"'),
+        ("؛", ","),
+        ("《", '"'),
+        ("》", '"'),
+        ("？", "?"),
+        ("！", "!"),
+        (" ：", ":"),
+        (" ；", ";"),
+        ("－", "-"),
+        ("·", " "),
+        # latin script punctuation
+        ("/", " "),
+        ("—", ""),
+        ("(", "~"),
+        (")", "~"),
+        ("...", "…"),
+        ("\n", ", "),
+        ("\t", " "),
+        ("¡", ""),
+        ("¿", ""),
+        ("«", '"'),
+        ("»", '"'),
+        # unifying some phoneme representations
+        ("N", "ŋ"),  # somehow transphone doesn't transform this to IPA
+        ("ɫ", "l"),  # alveolopalatal
+        ("ɚ", "ə"),
+        ("g", "ɡ"),
+        ("ε", "e"),
+        ("ʦ", "ts"),
+        ("ˤ", "ˁ"),
+        ('ᵻ', 'ɨ'),
+        ("ɧ", "ç"),  # velopalatal
+        ("ɥ", "j"),  # labiopalatal
+        ("ɬ", "s"),  # lateral
+        ("ɮ", "z"),  # lateral
+        ('ɺ', 'ɾ'),  # lateral
+        ('ʲ', 'j'),  # decomposed palatalization
+        ('\u02CC', ""),  # secondary stress
+        ('\u030B', "˥"),
+        ('\u0301', "˦"),
+        ('\u0304', "˧"),
+        ('\u0300', "˨"),
+        ('\u030F', "˩"),
+        ('\u0302', "⭨"),
+        ('\u030C', "⭧"),
+        ("꜖", "˩"),
+        ("꜕", "˨"),
+        ("꜔", "˧"),
+        ("꜓", "˦"),
+        ("꜒", "˥"),
+        # symbols that indicate a pause or silence
+        ('"', "~"),
+        (" - ", "~ "),
+        ("- ", "~ "),
+        ("-", ""),
+        ("…", "."),
+        (":", "~"),
+        (";", "~"),
+        (",", "~")  # make sure this remains the final one when adding new ones
+    ]
+    unsupported_ipa_characters = {'̙', '̯', '̤', '̩', '̠', '̟', 'ꜜ', '̽', '|', '•', '↘',
+                                  '‖', '‿', 'ᷝ', 'ᷠ', '̚', '↗', 'ꜛ', '̻', '̘', '͡', '̺'}
+    #  https://en.wikipedia.org/wiki/IPA_number
+    for char in unsupported_ipa_characters:
+        replacements.append((char, ""))
+
+    if not for_feature_extraction:
+        # in case we want to plot etc., we only need the segmental units, so we remove everything else.
+        replacements = replacements + [
+            ('\u02C8', ""),  # primary stress
+            ('\u02D0', ""),  # lengthened
+            ('\u02D1', ""),  # half-length
+            ('\u0306', ""),  # shortened
+            ("˥", ""),  # very high tone
+            ("˦", ""),  # high tone
+            ("˧", ""),  # mid tone
+            ("˨", ""),  # low tone
+            ("˩", ""),  # very low tone
+            ('\u030C', ""),  # rising tone
+            ('\u0302', ""),  # falling tone
+            ('⭧', ""),  # rising
+            ('⭨', ""),  # falling
+            ('⮃', ""),  # dipping
+            ('⮁', ""),  # peaking
+            ('̃', ""),  # nasalizing
+            ("̧", ""),  # palatalized
+            ("ʷ", ""),  # labialized
+            ("ʰ", ""),  # aspirated
+            ("ˠ", ""),  # velarized
+            ("ˁ", ""),  # pharyngealized
+            ("ˀ", ""),  # glottalized
+            ("ʼ", ""),  # ejective
+            ("̹", ""),  # rounding
+            ("̞", ""),  # open
+            ("̪", ""),  # dental
+            ("̬", ""),  # voiced
+            ("̝", ""),  # closed
+            ("̰", ""),  # laryngalization
+            ("̈", ""),  # centralization
+            ("̜", ""),  # unrounded
+            ("̥", ""),  # voiceless
+        ]
+    return SequentialReplacements(replacements)
+
+
+@lru_cache(maxsize=None)
+def get_transphone_punctuation_handling():
+    """
+    The replacements that are applied before handing text to transphone, compiled once per process.
+    """
+    replacements = [
+        # punctuation in languages with non-latin script
+        ("。", "~"),
+        ("，", "~"),
+        ("【", '~'),
+        ("】", '~'),
+        ("、", "~"),
+        ("‥", "~"),
+        ("؟", "~"),
+        ("،", "~"),
+        ("“", '~'),
+        ("”", '~'),
+        ("؛", "~"),
+        ("《", '~'),
+        ("》", '~'),
+        ("？", "~"),
+        ("！", "~"),
+        (" ：", "~"),
+        (" ；", "~"),
+        ("－", "~"),
+        ("·", " "),
+        ("`", ""),
+        # symbols that indicate a pause or silence
+        ('"', "~"),
+        (" - ", "~ "),
+        ("- ", "~ "),
+        ("-", ""),
+        ("…", "~"),
+        (":", "~"),
+        (";", "~"),
+        (",", "~")  # make sure this remains the final one when adding new ones
+    ]
+    return SequentialReplacements(replacements)
+
+
+_english_abbreviations = [(re.compile('\\b%s\\.' % x[0], re.IGNORECASE), x[1]) for x in
+                          [('Mrs.', 'misess'), ('Mr.', 'mister'), ('Dr.', 'doctor'), ('St.', 'saint'), ('Co.', 'company'), ('Jr.', 'junior'), ('Maj.', 'major'),
+                           ('Gen.', 'general'), ('Drs.', 'doctors'), ('Rev.', 'reverend'), ('Lt.', 'lieutenant'), ('Hon.', 'honorable'), ('Sgt.', 'sergeant'),
+                           ('Capt.', 'captain'), ('Esq.', 'esquire'), ('Ltd.', 'limited'), ('Col.', 'colonel'), ('Ft.', 'fort'), ('e.g.', ', for example, '), ('TTS', 'text to speech')]]
 
 
 def english_text_expansion(text):
@@ -1050,12 +1234,10 @@ def english_text_expansion(text):
     See https://github.com/keithito/tacotron/
     Careful: Only apply to english datasets. Different languages need different cleaners.
     """
-    _abbreviations = [(re.compile('\\b%s\\.' % x[0], re.IGNORECASE), x[1]) for x in
-                      [('Mrs.', 'misess'), ('Mr.', 'mister'), ('Dr.', 'doctor'), ('St.', 'saint'), ('Co.', 'company'), ('Jr.', 'junior'), ('Maj.', 'major'),
-                       ('Gen.', 'general'), ('Drs.', 'doctors'), ('Rev.', 'reverend'), ('Lt.', 'lieutenant'), ('Hon.', 'honorable'), ('Sgt.', 'sergeant'),
-                       ('Capt.', 'captain'), ('Esq.', 'esquire'), ('Ltd.', 'limited'), ('Col.', 'colonel'), ('Ft.', 'fort'), ('e.g.', ', for example, '), ('TTS', 'text to speech')]]
-    for regex, replacement in _abbreviations:
-        text = re.sub(regex, replacement, text)
+    if "." not in text:
+        return text  # every one of the abbreviations ends with a period
+    for regex, replacement in _english_abbreviations:
+        text = regex.sub(replacement, text)
     return text
 
 
@@ -1109,7 +1291,13 @@ def convert_kanji_to_pinyin_mandarin(text):
     return " ".join([x[0] for x in pinyin(text)])
 
 
-def get_language_id(language):
+@lru_cache(maxsize=None)
+def get_iso_codes_to_ids():
+    """
+    The mapping from ISO 639-3 codes to language IDs. It is read
+    only once per process and cannot be modified, so every frontend,
+    dataset and worker in a process can share the same one.
+    """
     try:
         iso_codes_to_ids = load_json_from_path("Preprocessing/multilinguality/iso_lookup.json")[-1]
     except FileNotFoundError:
@@ -1117,6 +1305,11 @@ def get_language_id(language):
             iso_codes_to_ids = load_json_from_path(str(Path(__file__).parent / "multilinguality/iso_lookup.json"))[-1]
         except FileNotFoundError:
             iso_codes_to_ids = load_json_from_path("iso_lookup.json")[-1]
+    return MappingProxyType(iso_codes_to_ids)
+
+
+def get_language_id(language):
+    iso_codes_to_ids = get_iso_codes_to_ids()
     if language not in iso_codes_to_ids:
         print("Please specify the language as ISO 639-3 code (https://en.wikipedia.org/wiki/List_of_ISO_639-3_codes)")
         return None
@@ -1124,6 +1317,15 @@ def get_language_id(language):
 
 
 if __name__ == '__main__':
+    # checks that need no visual inspection come first, so a mismatch stops the run before the plots
+    print("\n\nBatch Test")
+    tf = ArticulatoryCombinedTextFrontend(language="eng")
+    batch = ["This is a complex sentence, it even has a pause!", "But can it do this?", "", "Mr. Smith is home.", "But can it do this?"]
+    assert tf.get_phone_strings(batch) == [tf.get_phone_string(sentence) for sentence in batch], "batched phonemization differs from the single one"
+    assert all(torch.equal(x, y) for x, y in zip(tf.strings_to_tensors(batch[:2]), [tf.string_to_tensor(sentence) for sentence in batch[:2]])), "batched text tensors differ from the single ones"
+    assert tf.string_to_tensor("", input_phonemes=True).shape == torch.Size([0]), "empty input should give an empty 1D tensor"
+    print("batched and single phonemization are identical")
+
     print("\n\nEnglish Test")
     tf = ArticulatoryCombinedTextFrontend(language="eng")
     tf.string_to_tensor("This is a complex sentence, it even has a pause! But can it do this? Nice.", view=True)
@@ -0,0 +1,154 @@
+import importlib.util
+import os
+
+import torch
+
+from Utility.storage_config import MODEL_DIR
+
+DEFAULT_VAD_PATH = os.path.join(MODEL_DIR, "Silero", "silero_vad.jit")
+
+_vads_in_this_process = dict()
+
+
+def get_voice_activity_detector(device="cpu"):
+    """
+    The VAD is only loaded once per device in each process,
+    everything that cuts silences in that process shares it.
+    """
+    if str(device) not in _vads_in_this_process:
+        _vads_in_this_process[str(device)] = VoiceActivityDetector(device=device)
+    return _vads_in_this_process[str(device)]
+
+
+class VoiceActivityDetector:
+    """
+    Silero VAD that scores a whole batch of waves at once. The model
+    runs over all waves chunk by chunk in parallel, then silero's own
+    postprocessing turns the probabilities of every wave into speech
+    timestamps. The batched matrix products round slightly differently
+    than silero's call on a single wave, so the probabilities can differ
+    by a few 1e-6. A chunk whose probability is that close to a
+    threshold can therefore flip between speech and silence, which
+    moves a cut point by one chunk (32ms at 16kHz). Apart from that,
+    the speech timestamps are the same as with get_speech_timestamps
+    on each wave separately.
+
+    The weights are taken from a local file if there is one (by
+    default Models/Silero/silero_vad.jit), otherwise from the
+    silero-vad package, which ships them. Only if that is not
+    installed, the torch hub is used, which needs the network the
+    first time.
+    """
+
+    def __init__(self, device="cpu", path_to_model=DEFAULT_VAD_PATH):
+        self.device = device
+        silero_model, self.get_speech_timestamps_of_single_wave = load_silero_vad(path_to_model)
+        self.silero_model = silero_model.to(device)
+
+    @torch.inference_mode()
+    def speech_probabilities(self, waves, sampling_rate=16000):
+        """
+        Returns a list with the speech probability of every chunk
+        of every wave in the list of 1D tensors, equal to silero's
+        per chunk output up to a few 1e-6.
+        """
+        if len(waves) == 0:
+            return list()
+        if sampling_rate > 16000 and sampling_rate % 16000 == 0:
+            # silero looks at multiples of 16kHz at 16kHz by only taking every n-th sample
+            waves = [wave[::sampling_rate // 16000] for wave in waves]
+            sampling_rate = 16000
+        if sampling_rate not in [8000, 16000]:
+            raise ValueError("Silero VAD only supports 8000 and 16000 (or multiples of 16000) sample rates")
+        chunk_size = 512 if sampling_rate == 16000 else 256
+        lengths = [len(wave) for wave in waves]
+        padded_length = max(max(lengths), 1)
+        padded_length = padded_length + (-padded_length) % chunk_size  # the last chunk of each wave is padded with zeros, just like silero does it
+        batch = torch.zeros([len(waves), padded_length], device=self.device)
+        for index, wave in enumerate(waves):
+            batch[index, :len(wave)] = wave.to(self.device)
+        self.silero_model.reset_states()
+        probabilities = torch.cat([self.silero_model(batch[:, chunk_start:chunk_start + chunk_size], sampling_rate) for chunk_start in range(0, padded_length, chunk_size)], dim=1).cpu()
+        return [probabilities[index, :(length + chunk_size - 1) // chunk_size].tolist() for index, length in enumerate(lengths)]
+
+    @torch.inference_mode()
+    def speech_timestamps(self, waves, sampling_rate=16000):
+        """
+        Returns the speech segments of every wave in the list of 1D
+        tensors as lists of dicts with start and end in samples.
+        """
+        return [self.get_speech_timestamps_of_single_wave(wave, _PrecomputedSpeechProbabilities(probabilities), sampling_rate=sampling_rate)
+                for wave, probabilities in zip(waves, self.speech_probabilities(waves, sampling_rate=sampling_rate))]
+
+
+def load_silero_vad(path_to_model=DEFAULT_VAD_PATH):
+    """
+    Returns the silero model and silero's get_speech_timestamps,
+    without network access whenever possible.
+    """
+    if importlib.util.find_spec("silero_vad") is not None:
+        number_of_threads = torch.get_num_threads()
+        from silero_vad.utils_vad import get_speech_timestamps
+        torch.set_num_threads(number_of_threads)  # importing the package sets the number of threads to 1 globally
+        if path_to_model is None or not os.path.exists(path_to_model):
+            path_to_model = os.path.join(os.path.dirname(importlib.util.find_spec("silero_vad").origin), "data", "silero_vad.jit")
+        silero_model = torch.jit.load(path_to_model, map_location="cpu")
+        silero_model.eval()
+        return silero_model, get_speech_timestamps
+
+    torch.hub._validate_not_a_forked_repo = lambda a, b, c: True  # torch 1.9 has a bug in the hub loading, this is a workaround
+    local_hub_dir = os.path.join(torch.hub.get_dir(), "snakers4_silero-vad_master")
+    if os.path.exists(local_hub_dir):
+        # it has been downloaded before, so there is no need to ask github for updates
+        silero_model, utils = torch.hub.load(repo_or_dir=local_hub_dir,
+                                             source="local",
+                                             model='silero_vad',
+                                             onnx=False,
+                                             verbose=False)
+    else:
+        # careful: assumes 16kHz or 8kHz audio
+        silero_model, utils = torch.hub.load(repo_or_dir='snakers4/silero-vad',
+                                             model='silero_vad',
+                                             force_reload=False,
+                                             onnx=False,
+                                             verbose=False)
+    torch.set_grad_enabled(True)  # finding this issue was very infuriating: silero sets
+    # this to false globally during model loading rather than using inference mode or no_grad
+    if path_to_model is not None and os.path.exists(path_to_model):
+        silero_model = torch.jit.load(path_to_model, map_location="cpu")
+        silero_model.eval()
+    return silero_model, utils[0]
+
+
+class _PrecomputedSpeechProbabilities:
+    """
+    Stands in for the model in silero's get_speech_timestamps and
+    hands out probabilities that were computed beforehand.
+    """
+
+    def __init__(self, probabilities):
+        self.probabilities = probabilities
+        self.position = 0
+
+    def reset_states(self):
+        self.position = 0
+
+    def __call__(self, chunk, sampling_rate):
+        probability = self.probabilities[self.position]
+        self.position += 1
+        return torch.tensor(probability)
+
+
+def remove_silences(wave, speech_timestamps):
+    """
+    Sets everything outside of the speech segments to 0 and cuts
+    away the silence before the first and after the last segment,
+    using a single mask for all segments.
+    """
+    starts = torch.tensor([segment['start'] for segment in speech_timestamps], dtype=torch.long, device=wave.device)
+    ends = torch.tensor([segment['end'] for segment in speech_timestamps], dtype=torch.long, device=wave.device)
+    boundaries = torch.zeros([len(wave) + 1], dtype=torch.long, device=wave.device)
+    boundaries.index_add_(0, starts.clamp(max=len(wave)), torch.ones_like(starts))
+    boundaries.index_add_(0, ends.clamp(max=len(wave)), -torch.ones_like(ends))
+    is_speech = boundaries.cumsum(dim=0)[:-1] > 0
+    return torch.where(is_speech, wave, torch.zeros_like(wave))[speech_timestamps[0]['start']:speech_timestamps[-1]['end']]
@@ -3,6 +3,7 @@
 STAGE 3: Training on as much data as possible
 
 """
+import functools
 import time
 
 import torch
@@ -15,6 +16,8 @@ from Utility.path_to_transcript_dicts import *
 def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb_resume_id, gpu_count):
     from torch.utils.data import ConcatDataset
 
+    from Modules.ToucanTTS.TTSCorpusIndex import TTSCorpusIndex
+    from Modules.ToucanTTS.TTSDataset import tts_cache_exists
     from Modules.ToucanTTS.ToucanTTS import ToucanTTS
     from Modules.ToucanTTS.toucantts_train_loop_arbiter import train_loop
     from Utility.corpus_preparation import prepare_tts_corpus
@@ -43,6 +46,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
     else:
         rank = 0
 
+    # the caches of all corpora are described in one index, they are only opened once their datapoints are needed
+    corpus_index = TTSCorpusIndex(os.path.join(PREPROCESSING_DIR, "tts_corpus_index.pkl"))
     lang_to_datasets = dict()
 
     # ENGLISH
@@ -53,87 +58,104 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "Nancy"),
                                                       lang="eng",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
     chunk_count = 100
-    chunks = split_dictionary_into_chunks(build_path_to_transcript_mls_english(), split_n=chunk_count)
+    if all(tts_cache_exists(os.path.join(PREPROCESSING_DIR, f"mls_english_chunk_{index}")) for index in range(chunk_count)):
+        chunks = [None] * chunk_count  # the transcripts are only needed to build the caches
+    else:
+        chunks = split_dictionary_into_chunks(build_path_to_transcript_mls_english(), split_n=chunk_count)
     for index in range(chunk_count):
         lang_to_datasets["eng"].append(prepare_tts_corpus(transcript_dict=chunks[index],
                                                           corpus_dir=os.path.join(PREPROCESSING_DIR, f"mls_english_chunk_{index}"),
                                                           lang="eng",
                                                           gpu_count=gpu_count,
-                                                          rank=rank))
+                                                          rank=rank,
+                                                          corpus_index=corpus_index))
 
     lang_to_datasets["eng"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_ryanspeech,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "Ryan"),
                                                       lang="eng",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["eng"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_ljspeech,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "LJSpeech"),
                                                       lang="eng",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["eng"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_libritts_all_clean,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "libri_all_clean"),
                                                       lang="eng",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["eng"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_vctk,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "vctk"),
                                                       lang="eng",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["eng"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_nvidia_hifitts,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "hifi"),
                                                       lang="eng",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["eng"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_CREMA_D,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "cremad"),
                                                       lang="eng",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["eng"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_EmoV_DB,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "emovdb"),
                                                       lang="eng",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["eng"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_RAVDESS,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "ravdess"),
                                                       lang="eng",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["eng"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_ESDS,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "esds"),
                                                       lang="eng",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["eng"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_blizzard_2013,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "blizzard2013"),
                                                       lang="eng",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["eng"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_jenny,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "jenny"),
                                                       lang="eng",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["eng"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_ears,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "ears"),
                                                       lang="eng",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     # GERMAN
     lang_to_datasets["deu"] = list()
@@ -142,64 +164,77 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "Karlsson"),
                                                       lang="deu",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["deu"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_eva,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "Eva"),
                                                       lang="deu",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["deu"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_hokus,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "Hokus"),
                                                       lang="deu",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["deu"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_bernd,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "Bernd"),
                                                       lang="deu",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["deu"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_friedrich,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "Friedrich"),
                                                       lang="deu",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["deu"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_hui_others,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "hui_others"),
                                                       lang="deu",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
-    lang_to_datasets["deu"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_thorsten_emotional(),
+    lang_to_datasets["deu"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_thorsten_emotional,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "thorsten_emotional"),
                                                       lang="deu",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
-    lang_to_datasets["deu"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_thorsten_neutral(),
+    lang_to_datasets["deu"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_thorsten_neutral,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "thorsten_neutral"),
                                                       lang="deu",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
-    lang_to_datasets["deu"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_thorsten_2022_10(),
+    lang_to_datasets["deu"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_thorsten_2022_10,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "thorsten_2022"),
                                                       lang="deu",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     chunk_count = 20
-    chunks = split_dictionary_into_chunks(build_path_to_transcript_mls_german(), split_n=chunk_count)
+    if all(tts_cache_exists(os.path.join(PREPROCESSING_DIR, f"mls_german_chunk_{index}")) for index in range(chunk_count)):
+        chunks = [None] * chunk_count  # the transcripts are only needed to build the caches
+    else:
+        chunks = split_dictionary_into_chunks(build_path_to_transcript_mls_german(), split_n=chunk_count)
     for index in range(chunk_count):
         lang_to_datasets["deu"].append(prepare_tts_corpus(transcript_dict=chunks[index],
                                                           corpus_dir=os.path.join(PREPROCESSING_DIR, f"mls_german_chunk_{index}"),
                                                           lang="deu",
                                                           gpu_count=gpu_count,
-                                                          rank=rank))
+                                                          rank=rank,
+                                                          corpus_index=corpus_index))
 
     # FRENCH
 
@@ -209,43 +244,50 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "css10_French"),
                                                       lang="fra",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["fra"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_mls_french,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "mls_french"),
                                                       lang="fra",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["fra"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_blizzard2023_ad_silence_removed,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "ad_e"),
                                                       lang="fra",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["fra"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_blizzard2023_neb_silence_removed,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "neb"),
                                                       lang="fra",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["fra"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_blizzard2023_neb_e_silence_removed,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "neb_e"),
                                                       lang="fra",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["fra"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_synpaflex_norm_subset,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "synpaflex"),
                                                       lang="fra",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["fra"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_siwis_subset,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "siwis"),
                                                       lang="fra",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     # SPANISH
 
@@ -255,19 +297,22 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "mls_spanish"),
                                                       lang="spa",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["spa"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_css10es,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "css10_Spanish"),
                                                       lang="spa",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["spa"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_spanish_blizzard_train,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "spanish_blizzard"),
                                                       lang="spa",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     # CHINESE
 
@@ -277,13 +322,15 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "css10_chinese"),
                                                       lang="cmn",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["cmn"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_aishell3,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "aishell3"),
                                                       lang="cmn",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     # PORTUGUESE
 
@@ -293,7 +340,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "mls_porto"),
                                                       lang="por",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     # POLISH
 
@@ -303,7 +351,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "mls_polish"),
                                                       lang="pol",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     # ITALIAN
 
@@ -313,7 +362,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "mls_italian"),
                                                       lang="ita",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     # DUTCH
 
@@ -323,13 +373,15 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "mls_dutch"),
                                                       lang="nld",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["nld"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_css10nl,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "css10_Dutch"),
                                                       lang="nld",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     # GREEK
 
@@ -339,7 +391,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "css10_Greek"),
                                                       lang="ell",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     # FINNISH
 
@@ -349,7 +402,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "css10_Finnish"),
                                                       lang="fin",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     # VIETNAMESE
 
@@ -359,7 +413,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "VIVOS_viet"),
                                                       lang="vie",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     # Japanese
 
@@ -369,13 +424,15 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "captain_japanese"),
                                                       lang="jpn",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["jpn"].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_jvs,
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "jvs"),
                                                       lang="jpn",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     # RUSSIAN
 
@@ -385,7 +442,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "css10_Russian"),
                                                       lang="rus",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     # HUNGARIAN
 
@@ -395,7 +453,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "css10_Hungarian"),
                                                       lang="hun",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     # DIVERSE INDIC LANGUAGES
 
@@ -405,7 +464,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_assamese"),
                                                       lang="asm",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["ben"] = list()
 
@@ -413,7 +473,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_bengali"),
                                                       lang="ben",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["brx"] = list()
 
@@ -421,7 +482,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_bodo"),
                                                       lang="brx",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["dgo"] = list()
 
@@ -429,7 +491,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_dogri"),
                                                       lang="dgo",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["guj"] = list()
 
@@ -437,7 +500,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_gujarati"),
                                                       lang="guj",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["hin"] = list()
 
@@ -445,7 +509,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_hindi"),
                                                       lang="hin",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["kan"] = list()
 
@@ -453,7 +518,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_kannada"),
                                                       lang="kan",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["kas"] = list()
 
@@ -461,7 +527,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_kashmiri"),
                                                       lang="kas",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["knn"] = list()
 
@@ -469,7 +536,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_konkani"),
                                                       lang="knn",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["mai"] = list()
 
@@ -477,7 +545,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_maithili"),
                                                       lang="mai",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["mal"] = list()
 
@@ -485,7 +554,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_malayalam"),
                                                       lang="mal",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["mni"] = list()
 
@@ -493,7 +563,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_manipuri"),
                                                       lang="mni",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["mar"] = list()
 
@@ -501,7 +572,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_marathi"),
                                                       lang="mar",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["nep"] = list()
 
@@ -509,7 +581,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_nepali"),
                                                       lang="nep",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["ory"] = list()
 
@@ -517,7 +590,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_odia"),
                                                       lang="ory",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["pan"] = list()
 
@@ -525,7 +599,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_punjabi"),
                                                       lang="pan",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["san"] = list()
 
@@ -533,7 +608,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_sanskrit"),
                                                       lang="san",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["sat"] = list()
 
@@ -541,7 +617,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_santali"),
                                                       lang="sat",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["snd"] = list()
 
@@ -549,7 +626,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_sindhi"),
                                                       lang="snd",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["tam"] = list()
 
@@ -557,7 +635,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_tamil"),
                                                       lang="tam",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["tel"] = list()
 
@@ -565,7 +644,8 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_telugu"),
                                                       lang="tel",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     lang_to_datasets["urd"] = list()
 
@@ -573,1107 +653,1245 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
                                                       corpus_dir=os.path.join(PREPROCESSING_DIR, "indic_urdu"),
                                                       lang="urd",
                                                       gpu_count=gpu_count,
-                                                      rank=rank))
+                                                      rank=rank,
+                                                      corpus_index=corpus_index))
 
     # DIVERSE
 
     lang_id = "bem"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_bembaspeech(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_bembaspeech,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "bembaspeech"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "swh"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_alffa_sw(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_alffa_sw,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "alffa_sw"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "amh"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_alffa_am(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_alffa_am,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "alffa_am"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "wol"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_alffa_wo(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_alffa_wo,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "alffa_wo"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "mal"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_malayalam(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_malayalam,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "malayalam"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "mal"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_msc(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_msc,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "msc"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "chv"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_chuvash(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_chuvash,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "chuvash"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "iba"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_iban(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_iban,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "iban"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
 
     lang_id = "jav"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_javanese_speech(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_javanese_speech,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "javanese_speech"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "fon"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_fon_alf(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_fon_alf,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "african_voices_fon_alf"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "hau"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_hausa_cmv(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_hausa_cmv,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "african_voices_hausa_cmv"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "lbb"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_ibibio_lst(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_ibibio_lst,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "african_voices_ibibio_lst"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "kik"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_kikuyu_opb(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_kikuyu_opb,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "african_voices_kikuyu_opb"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "lin"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_lingala_opb(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_lingala_opb,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "african_voices_lingala_opb"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "lug"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_ganda_cmv(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_ganda_cmv,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "african_voices_ganda_cmv"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "luo"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_luo_afv(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_luo_afv,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "african_voices_luo_afv"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "luo"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_luo_opb(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_luo_opb,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "african_voices_luo_opb"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "swh"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_swahili_llsti(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_swahili_llsti,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "african_voices_swahili_llsti"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "sxb"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_suba_afv(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_suba_afv,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "african_voices_suba_afv"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "wol"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_wolof_alf(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_wolof_alf,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "african_voices_wolof_alf"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "yor"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_yoruba_opb(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_african_voices_yoruba_opb,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "african_voices_yoruba_opb"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "nya"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_zambezi_voice_nyanja(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_zambezi_voice_nyanja,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "zambezi_voice_nyanja"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "loz"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_zambezi_voice_lozi(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_zambezi_voice_lozi,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "zambezi_voice_lozi"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "toi"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_zambezi_voice_tonga(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_zambezi_voice_tonga,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "zambezi_voice_tonga"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "afr"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_afrikaans(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_afrikaans,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_afrikaans"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "amh"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_amharic(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_amharic,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_amharic"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "arb"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_arabic(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_arabic,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_arabic"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "asm"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_assamese(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_assamese,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_assamese"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "ast"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_asturian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_asturian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_asturian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "azj"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_azerbaijani(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_azerbaijani,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_azerbaijani"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "bel"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_belarusian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_belarusian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_belarusian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "bul"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_bulgarian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_bulgarian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_bulgarian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "ben"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_bengali(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_bengali,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_bengali"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "bos"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_bosnian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_bosnian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_bosnian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "cat"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_catalan(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_catalan,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_catalan"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "ceb"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_cebuano(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_cebuano,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_cebuano"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "sdh"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_sorani_kurdish(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_sorani_kurdish,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_sorani_kurdish"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "cmn"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_mandarin(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_mandarin,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_mandarin"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "ces"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_czech(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_czech,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_czech"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "cym"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_welsh(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_welsh,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_welsh"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "dan"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_danish(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_danish,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_danish"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "deu"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_german(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_german,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_german"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "ell"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_greek(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_greek,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_greek"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "eng"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_english(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_english,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_english"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "spa"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_spanish(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_spanish,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_spanish"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "ekk"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_estonian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_estonian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_estonian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "pes"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_persian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_persian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_persian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "fin"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_finnish(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_finnish,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_finnish"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "fil"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_filipino(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_filipino,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_filipino"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "fra"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_french(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_french,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_french"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "gle"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_irish(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_irish,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_irish"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "glg"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_galician(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_galician,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_galician"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "guj"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_gujarati(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_gujarati,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_gujarati"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "hau"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_hausa(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_hausa,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_hausa"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "heb"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_hebrew(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_hebrew,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_hebrew"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "hin"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_hindi(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_hindi,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_hindi"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "hrv"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_croatian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_croatian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_croatian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "hun"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_hungarian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_hungarian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_hungarian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "hye"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_armenian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_armenian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_armenian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "ind"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_indonesian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_indonesian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_indonesian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "ibo"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_igbo(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_igbo,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_igbo"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "isl"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_icelandic(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_icelandic,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_icelandic"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "ita"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_italian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_italian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_italian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "jav"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_javanese(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_javanese,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_javanese"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "kat"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_georgian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_georgian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_georgian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "kam"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_kamba(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_kamba,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_kamba"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "kea"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_kabuverdianu(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_kabuverdianu,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_kabuverdianu"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "kaz"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_kazakh(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_kazakh,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_kazakh"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "khm"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_khmer(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_khmer,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_khmer"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "kan"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_kannada(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_kannada,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_kannada"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "kor"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_korean(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_korean,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_korean"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "ltz"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_luxembourgish(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_luxembourgish,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_luxembourgish"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "lug"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_ganda(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_ganda,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_ganda"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "lin"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_lingala(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_lingala,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_lingala"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "lao"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_lao(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_lao,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_lao"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "lit"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_lithuanian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_lithuanian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_lithuanian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "luo"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_luo(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_luo,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_luo"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "lvs"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_latvian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_latvian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_latvian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "mri"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_maori(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_maori,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_maori"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "mkd"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_macedonian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_macedonian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_macedonian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "mal"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_malayalam(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_malayalam,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_malayalam"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "xng"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_mongolian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_mongolian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_mongolian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "mar"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_marathi(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_marathi,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_marathi"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "zsm"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_malay(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_malay,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_malay"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "mlt"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_maltese(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_maltese,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_maltese"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "nld"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_dutch(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_dutch,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_dutch"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "nya"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_nyanja(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_nyanja,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_nyanja"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "oci"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_occitan(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_occitan,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_occitan"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "ory"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_oriya(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_oriya,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_oriya"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "pan"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_punjabi(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_punjabi,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_punjabi"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "pol"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_polish(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_polish,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_polish"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "pst"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_pashto(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_pashto,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_pashto"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "por"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_portuguese(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_portuguese,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_portuguese"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "ron"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_romanian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_romanian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_romanian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "rus"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_russian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_russian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_russian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "snd"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_sindhi(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_sindhi,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_sindhi"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "slk"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_slovak(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_slovak,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_slovak"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "slv"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_slovenian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_slovenian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_slovenian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "sna"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_shona(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_shona,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_shona"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "som"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_somali(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_somali,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_somali"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "srp"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_serbian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_serbian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_serbian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "swe"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_swedish(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_swedish,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_swedish"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "swh"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_swahili(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_swahili,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_swahili"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "tam"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_tamil(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_tamil,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_tamil"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "tel"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_telugu(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_telugu,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_telugu"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "tgk"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_tajik(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_tajik,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_tajik"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "tur"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_turkish(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_turkish,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_turkish"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "ukr"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_ukrainian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_ukrainian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_ukrainian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "umb"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_umbundu(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_umbundu,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_umbundu"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "urd"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_urdu(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_urdu,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_urdu"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "uzn"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_uzbek(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_uzbek,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_uzbek"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "vie"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_vietnamese(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_vietnamese,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_vietnamese"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "wol"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_wolof(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_wolof,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_wolof"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "yor"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_yoruba(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_fleurs_yoruba,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "fleurs_yoruba"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "gle"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_living_audio_dataset_irish(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_living_audio_dataset_irish,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "living_audio_dataset_irish"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "nld"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_living_audio_dataset_dutch(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_living_audio_dataset_dutch,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "living_audio_dataset_dutch"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "rus"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_living_audio_dataset_russian(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_living_audio_dataset_russian,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "living_audio_dataset_russian"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "ron"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_romanian_db(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_romanian_db,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "romanian_db"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "pes"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_shemo(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_shemo,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "shemo"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "eng"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_cmu_arctic(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_cmu_arctic,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "cmu_arctic"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "arb"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_clartts(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_clartts,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "clartts"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "bhd"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_bhadrawahi(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_bhadrawahi,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "snow_mountain_bhadrawahi"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "kfs"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_bilaspuri(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_bilaspuri,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "snow_mountain_bilaspuri"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "dgo"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_dogri(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_dogri,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "snow_mountain_dogri"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "gbk"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_gaddi(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_gaddi,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "snow_mountain_gaddi"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "bgc"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_haryanvi(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_haryanvi,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "snow_mountain_haryanvi"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "hin"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_hindi(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_hindi,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "snow_mountain_hindi"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "xnr"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_kangri(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_kangri,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "snow_mountain_kangri"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "kan"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_kannada(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_kannada,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "snow_mountain_kannada"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "kfx"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_kulvi(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_kulvi,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "snow_mountain_kulvi"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "kfx"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_kulvi_outer_seraji(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_kulvi_outer_seraji,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "snow_mountain_kulvi_outer_seraji"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "mal"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_malayalam(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_malayalam,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "snow_mountain_malayalam"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "mjl"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_mandeali(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_mandeali,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "snow_mountain_mandeali"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "bfz"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_pahari_mahasui(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_pahari_mahasui,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "snow_mountain_pahari_mahasui"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "tam"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_tamil(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_tamil,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "snow_mountain_tamil"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "tel"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_telugu(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_snow_mountain_telugu,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "snow_mountain_telugu"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
     lang_id = "ukr"
     if lang_id not in lang_to_datasets:
         lang_to_datasets[lang_id] = list()
-    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_ukrainian_lada(),
+    lang_to_datasets[lang_id].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_ukrainian_lada,
                                                         corpus_dir=os.path.join(PREPROCESSING_DIR, "ukrainian_lada"),
                                                         lang=lang_id,
                                                         gpu_count=gpu_count,
-                                                        rank=rank))
+                                                        rank=rank,
+                                                        corpus_index=corpus_index))
 
     for lang in ["acf", "bss", "deu", "inb", "nca", "quh", "wap", "acr", "bus", "dgr", "ind", "maz", "nch", "qul", "tav", "wmw", "acu", "byr", "dik", "iou", "mbb", "ncj", "qvc", "tbc", "xed", "agd", "bzh", "djk", "ipi", "mbc", "ncl", "qve", "tbg", "xon", "agg", "bzj", "dop", "jac", "mbh", "ncu", "qvh", "tbl", "xtd", "agn",
                  "caa", "jic", "mbj", "ndj", "qvm", "tbz", "xtm", "agr", "cab", "emp", "jiv", "mbt", "nfa", "qvn", "tca", "yaa", "agu", "cap", "eng", "jvn", "mca", "ngp", "qvs", "tcs", "yad", "aia", "car", "ese", "mcb", "ngu", "qvw", "yal", "cax", "kaq", "mcd", "nhe", "qvz", "tee", "ycn", "ake", "cbc",
@@ -1688,11 +1906,15 @@ def run(gpu_id, resume_checkpoint, finetune, model_dir, resume, use_wandb, wandb
         if lang not in lang_to_datasets:
             lang_to_datasets[lang] = list()
 
-        lang_to_datasets[lang].append(prepare_tts_corpus(transcript_dict=build_path_to_transcript_mms_template(lang=lang),
+        lang_to_datasets[lang].append(prepare_tts_corpus(transcript_dict=functools.partial(build_path_to_transcript_mms_template, lang=lang),
                                                          corpus_dir=os.path.join(PREPROCESSING_DIR, f"mms_{lang}"),
                                                          lang=f"{lang}",
                                                          gpu_count=gpu_count,
-                                                         rank=rank))
+                                                         rank=rank,
+                                                         corpus_index=corpus_index))
+
+    corpus_index.save()
+    corpus_index.print_summary([dataset.cache_dir for lang in lang_to_datasets for dataset in lang_to_datasets[lang]])
 
     for lang in lang_to_datasets:
         datasets.append(ConcatDataset(lang_to_datasets[lang]))
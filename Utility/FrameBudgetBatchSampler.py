@@ -0,0 +1,106 @@
+import torch
+from torch.utils.data import ConcatDataset
+from torch.utils.data import Sampler
+
+
+def get_lengths(dataset):
+    """
+    The lengths of all items of a dataset (or a concat dataset of
+    several), in the unit of the dataset's get_lengths.
+    """
+    if isinstance(dataset, ConcatDataset):
+        return [length for sub_dataset in dataset.datasets for length in get_lengths(sub_dataset)]
+    return dataset.get_lengths()
+
+
+class FrameBudgetBatchSampler(Sampler):
+    """
+    Batch sampler that puts items of similar length together and fills
+    every batch up to a budget of frames, counted including the padding
+    (so the amount of items times the length of the longest one). Short
+    items thus end up in large batches and long items in small ones,
+    instead of every batch having the same amount of items.
+
+    The items are sorted into buckets of similar length. Every epoch,
+    the items within each bucket are shuffled before they are grouped
+    into batches, and the order of all batches is shuffled as well.
+    Items that are longer than the budget get a batch of their own.
+
+    In multi-GPU runs, every rank holds its own chunk of the dataset and
+    makes its own batches, but all ranks have to run the same amount of
+    steps. So with gpu_count > 1, the ranks agree on the smallest number
+    of batches of the epoch and the remaining ones are left out (which
+    are left out changes from epoch to epoch because of the shuffling).
+    Agreeing on that number is a collective operation, so it happens
+    on every rank at the same time: when the sampler is created, when
+    set_epoch is called and when a further iteration over the sampler
+    starts (which moves on to the next epoch, like calling set_epoch
+    would). __len__ only returns the stored number.
+    """
+
+    def __init__(self,
+                 lengths,  # the length of every item of the dataset, e.g. get_lengths(dataset)
+                 frames_per_batch,  # how many frames a batch may have, including the padding
+                 max_items_per_batch=None,  # optionally also limits the amount of items in a batch
+                 number_of_buckets=20,
+                 shuffle=True,
+                 drop_last=False,  # whether to leave out the last batch of each bucket, which is usually not full
+                 seed=0,
+                 gpu_count=1):
+        self.lengths = [int(length) for length in lengths]
+        self.frames_per_batch = frames_per_batch
+        self.max_items_per_batch = max_items_per_batch
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = seed
+        self.gpu_count = gpu_count
+
+        order = sorted(range(len(self.lengths)), key=lambda index: self.lengths[index])
+        number_of_buckets = max(min(number_of_buckets, len(order)), 1)
+        self.buckets = [order[len(order) * bucket // number_of_buckets:len(order) * (bucket + 1) // number_of_buckets] for bucket in range(number_of_buckets)]
+        self.set_epoch(0)
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+        self.batches = self._make_batches()
+        self.batches_were_used = False
+
+    def __iter__(self):
+        if self.batches_were_used:
+            self.set_epoch(self.epoch + 1)  # every iteration over the sampler gets a different order
+        self.batches_were_used = True
+        return iter(self.batches)
+
+    def __len__(self):
+        return len(self.batches)
+
+    def _make_batches(self):
+        random_generator = torch.Generator()
+        random_generator.manual_seed(self.seed + self.epoch)
+        batches = list()
+        for bucket in self.buckets:
+            if self.shuffle:
+                bucket = [bucket[position] for position in torch.randperm(len(bucket), generator=random_generator).tolist()]
+            batch = list()
+            longest_in_batch = 0
+            for index in bucket:
+                longest_with_item = max(longest_in_batch, self.lengths[index])
+                if len(batch) > 0 and (longest_with_item * (len(batch) + 1) > self.frames_per_batch or (self.max_items_per_batch is not None and len(batch) == self.max_items_per_batch)):
+                    batches.append(batch)
+                    batch = list()
+                    longest_with_item = self.lengths[index]
+                batch.append(index)
+                longest_in_batch = longest_with_item
+            if len(batch) > 0 and not self.drop_last:
+                batches.append(batch)
+        if self.shuffle:
+            batches = [batches[position] for position in torch.randperm(len(batches), generator=random_generator).tolist()]
+        if self.gpu_count > 1:
+            batches = batches[:self._get_smallest_number_of_batches_across_ranks(len(batches))]
+        return batches
+
+    @staticmethod
+    def _get_smallest_number_of_batches_across_ranks(number_of_batches):
+        number_of_batches = torch.tensor([number_of_batches], device=torch.device("cuda", torch.cuda.current_device()) if torch.distributed.get_backend() == "nccl" else torch.device("cpu"))
+        torch.distributed.all_reduce(number_of_batches, op=torch.distributed.ReduceOp.MIN)
+        return int(number_of_batches.item())
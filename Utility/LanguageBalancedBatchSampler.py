@@ -0,0 +1,69 @@
+import math
+import random
+
+from torch.utils.data import Sampler
+
+
+class LanguageBalancedBatchSampler(Sampler):
+    """
+    Batch sampler for a ConcatDataset that consists of one dataset per
+    language. Every language gets a share of each batch according to
+    its weight (all the same by default). Shares that are not whole
+    items are settled randomly with systematic sampling, so a language
+    ends up in the batch exactly as often as its share says on average,
+    and a batch contains as many different languages as possible. If
+    there are more languages than items in a batch, every batch gets a
+    different random selection of them, with equal weights each one
+    appears at most once.
+
+    Which item of a language is next is decided by the sampler of that
+    language, once it is exhausted, it starts over. The batches never
+    run out, the amount of steps is up to the train loop.
+    """
+
+    def __init__(self,
+                 concat_dataset,  # a ConcatDataset of the datasets of all languages
+                 samplers,  # one sampler per language, over the dataset of that language, in the same order as in concat_dataset
+                 batch_size,
+                 language_weights=None):  # one weight per language, by default every language has the same chance
+        if language_weights is None:
+            language_weights = [1.0] * len(samplers)
+        if len(samplers) != len(concat_dataset.datasets) or len(language_weights) != len(samplers):
+            raise ValueError("There needs to be exactly one sampler and one weight for every dataset in the concat dataset.")
+        self.samplers = samplers
+        self.batch_size = batch_size
+        self.starts = [0] + concat_dataset.cumulative_sizes[:-1]  # where the items of each language begin in the concat dataset
+        self.languages = [language for language, weight in enumerate(language_weights) if weight > 0]
+        self.language_weights = language_weights
+        if len(self.languages) == 0:
+            raise ValueError("At least one language needs a weight that is larger than 0.")
+
+    def __iter__(self):
+        iterators = [iter(sampler) for sampler in self.samplers]
+        while True:
+            batch = list()
+            for language, amount in self._get_amount_of_items_per_language():
+                for _ in range(amount):
+                    try:
+                        index = next(iterators[language])
+                    except StopIteration:
+                        iterators[language] = iter(self.samplers[language])
+                        index = next(iterators[language])
+                    batch.append(self.starts[language] + index)
+            yield batch
+
+    def _get_amount_of_items_per_language(self):
+        # the languages cover the interval [0, batch_size) in a random order, each with a part as long as its share.
+        # A language gets one item for every one of the points offset, offset + 1, ..., offset + batch_size - 1 in its part.
+        order = random.sample(self.languages, len(self.languages))
+        total_weight = sum(self.language_weights[language] for language in order)
+        offset = random.random()
+        amounts = list()
+        start_of_part = 0.0
+        weight_so_far = 0.0
+        for language in order:
+            weight_so_far += self.language_weights[language]
+            end_of_part = self.batch_size * weight_so_far / total_weight
+            amounts.append((language, math.ceil(end_of_part - offset) - math.ceil(start_of_part - offset)))
+            start_of_part = end_of_part
+        return amounts
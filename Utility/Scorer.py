@@ -44,7 +44,7 @@ class TTSScorer:
         self.ap = CodecAudioPreprocessor(input_sr=-1, device=device)
         self.spec_extractor = AudioPreprocessor(input_sr=16000, output_sr=16000, device=device)
 
-    def score(self, path_to_toucantts_dataset, lang_id):
+    def score(self, path_to_toucantts_dataset, lang_id, decoding_batch_size=16):
         """
         call this to update the path_to_score dict with scores for this dataset
         """
@@ -55,21 +55,22 @@ class TTSScorer:
         self.path_to_score = dict()
         self.path_to_id = dict()
         _ = dataset[0]
-        for index in tqdm(range(len(dataset.datapoints))):
-            datapoint = dataset.datapoints[index]
+        mels_of_batch = list()
+        for index in tqdm(range(len(dataset))):
+            datapoint = dataset.get_datapoint(index)
+            if index % decoding_batch_size == 0:
+                # the codec decodes the datapoints of a batch together, the scoring is done one datapoint at a time
+                with torch.inference_mode():
+                    mels_of_batch = self.ap.indexes_to_mel_specs([dataset.get_datapoint(index_in_batch)[2].int() for index_in_batch in range(index, min(index + decoding_batch_size, len(dataset)))], self.spec_extractor)
             text_tensors = datapoint[0].to(self.device).unsqueeze(0).float()
             text_lengths = datapoint[1].squeeze().to(self.device).unsqueeze(0)
-            speech_indexes = datapoint[2]
             speech_lengths = datapoint[3].squeeze().to(self.device).unsqueeze(0)
             gold_durations = datapoint[4].to(self.device).unsqueeze(0)
             gold_pitch = datapoint[6].to(self.device).unsqueeze(0)  # mind the switched order
             gold_energy = datapoint[5].to(self.device).unsqueeze(0)  # mind the switched order
             lang_ids = dataset.language_id.to(self.device)
             filepath = datapoint[8]
-            with torch.inference_mode():
-                wave = self.ap.indexes_to_audio(speech_indexes.int().to(self.device)).detach()
-                mel = self.spec_extractor.audio_to_mel_spec_tensor(wave, explicit_sampling_rate=16000).transpose(0, 1).detach().cpu()
-            gold_speech_sample = mel.clone().to(self.device).unsqueeze(0)
+            gold_speech_sample = mels_of_batch[index % decoding_batch_size].clone().to(self.device).unsqueeze(0)
 
             utterance_embedding = datapoint[7].unsqueeze(0).to(self.device)
             try:
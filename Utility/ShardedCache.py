@@ -0,0 +1,212 @@
+import bisect
+import os
+import shutil
+
+import numpy as np
+import torch
+
+
+def sharded_cache_exists(path):
+    return os.path.exists(os.path.join(path, "index.pt"))
+
+
+def merge_sharded_caches(path, part_paths, append=False):
+    """
+    Combines caches that were written separately (e.g. one per worker
+    process) into a single cache. The shards of the parts are moved
+    over and only their indexes are merged, so no data is copied. The
+    items end up in the order of the parts, after the items that are
+    already in the cache at path if append is True. The parts are
+    deleted afterwards. Returns the amount of items that were added.
+    """
+    index = {"array_fields": dict(), "metadata": dict(), "shard_sizes": list(), "item_ids": None}
+    if append and sharded_cache_exists(path):
+        index = torch.load(os.path.join(path, "index.pt"), map_location="cpu")
+    else:
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.makedirs(path)
+    number_of_items_before = sum(index["shard_sizes"])
+    for part_path in part_paths:
+        if not sharded_cache_exists(part_path):
+            continue  # the part was never closed, e.g. because its process did not get any items
+        part_index = torch.load(os.path.join(part_path, "index.pt"), map_location="cpu")
+        if len(part_index["shard_sizes"]) == 0:
+            continue
+        if len(index["shard_sizes"]) == 0:
+            index["array_fields"] = part_index["array_fields"]
+            index["metadata"] = {name: list() for name in part_index["metadata"]}
+        if part_index["array_fields"] != index["array_fields"] or part_index["metadata"].keys() != index["metadata"].keys():
+            raise ValueError(f"The cache in {part_path} has different fields than the cache it should be merged into.")
+        number_of_previous_items = sum(index["shard_sizes"])
+        if index["item_ids"] is not None or part_index["item_ids"] is not None:
+            # some items are not in use, so the used ones have to be listed explicitly
+            previous_item_ids = index["item_ids"] if index["item_ids"] is not None else list(range(number_of_previous_items))
+            part_item_ids = part_index["item_ids"] if part_index["item_ids"] is not None else range(sum(part_index["shard_sizes"]))
+            index["item_ids"] = previous_item_ids + [number_of_previous_items + item_id for item_id in part_item_ids]
+        for name, values in part_index["metadata"].items():
+            index["metadata"][name].extend(values)
+        for shard, shard_size in enumerate(part_index["shard_sizes"]):
+            os.replace(os.path.join(part_path, f"shard_{shard:05d}"), os.path.join(path, f"shard_{len(index['shard_sizes']):05d}"))
+            index["shard_sizes"].append(shard_size)
+    torch.save(index, os.path.join(path, "index.pt.tmp"))
+    os.replace(os.path.join(path, "index.pt.tmp"), os.path.join(path, "index.pt"))
+    for part_path in part_paths:
+        if os.path.exists(part_path):
+            shutil.rmtree(part_path)
+    return sum(index["shard_sizes"]) - number_of_items_before
+
+
+class ShardedCacheWriter:
+    """
+    Writes items (dicts of field names to tensors or plain python
+    values such as file paths) into a cache on the disk, that can
+    later be opened with ShardedCache without loading it into RAM.
+
+    Every shard stores each tensor field as one contiguous .npy
+    array, in which the items are concatenated along their first
+    dimension, plus the offsets at which each item starts. Plain
+    python values end up in the index, together with the sizes of
+    the shards. The index is written last, so a cache that was not
+    closed properly does not count as existing.
+
+    With append=True, the items are added to an existing cache in
+    new shards, the items that are already in it are not touched.
+    """
+
+    def __init__(self, path, items_per_shard=2048, append=False):
+        self.path = path
+        self.items_per_shard = items_per_shard
+        self.array_fields = None
+        self.metadata = None
+        self.shard_sizes = list()
+        self.item_ids = None
+        if append and sharded_cache_exists(path):
+            index = torch.load(os.path.join(path, "index.pt"), map_location="cpu")
+            if len(index["shard_sizes"]) > 0:
+                self.array_fields = index["array_fields"]
+                self.metadata = index["metadata"]
+                self.shard_sizes = index["shard_sizes"]
+                self.item_ids = index["item_ids"]
+        else:
+            if os.path.exists(path):
+                shutil.rmtree(path)
+            os.makedirs(path)
+        self.number_of_previous_items = sum(self.shard_sizes)
+        self.items_in_current_shard = list()
+
+    def append(self, **fields):
+        if self.array_fields is None:
+            self.array_fields = dict()
+            self.metadata = dict()
+            for name, value in fields.items():
+                if isinstance(value, (torch.Tensor, np.ndarray)):
+                    value = np.asarray(value)
+                    self.array_fields[name] = {"dtype": value.dtype.str, "trailing_shape": tuple(value.shape[1:])}
+                else:
+                    self.metadata[name] = list()
+        item = dict()
+        for name, specification in self.array_fields.items():
+            value = fields[name].cpu().numpy() if isinstance(fields[name], torch.Tensor) else np.asarray(fields[name])
+            if value.ndim == 0 or tuple(value.shape[1:]) != specification["trailing_shape"]:
+                raise ValueError(f"The field {name} has the shape {tuple(value.shape)}, but it needs to be [length, {', '.join(str(x) for x in specification['trailing_shape'])}].")
+            item[name] = value.astype(specification["dtype"], copy=False)
+        for name in self.metadata:
+            self.metadata[name].append(fields[name])
+        self.items_in_current_shard.append(item)
+        if len(self.items_in_current_shard) >= self.items_per_shard:
+            self._write_shard()
+
+    def close(self):
+        if len(self.items_in_current_shard) > 0:
+            self._write_shard()
+        if self.item_ids is not None:
+            # some of the previous items have been removed, so the used items are listed explicitly and the new ones need to be added to the list
+            self.item_ids = self.item_ids + list(range(self.number_of_previous_items, sum(self.shard_sizes)))
+        index = {"array_fields": self.array_fields if self.array_fields is not None else dict(),
+                 "metadata"    : self.metadata if self.metadata is not None else dict(),
+                 "shard_sizes" : self.shard_sizes,
+                 "item_ids"    : self.item_ids}  # None means that every item that was written is used
+        torch.save(index, os.path.join(self.path, "index.pt.tmp"))
+        os.replace(os.path.join(self.path, "index.pt.tmp"), os.path.join(self.path, "index.pt"))
+
+    def _write_shard(self):
+        shard_dir = os.path.join(self.path, f"shard_{len(self.shard_sizes):05d}")
+        os.makedirs(shard_dir, exist_ok=True)
+        for name, specification in self.array_fields.items():
+            values = [item[name] for item in self.items_in_current_shard]
+            offsets = np.cumsum([0] + [len(value) for value in values], dtype=np.int64)
+            np.save(os.path.join(shard_dir, f"{name}.npy"), np.concatenate(values, axis=0) if offsets[-1] > 0 else np.zeros((0,) + specification["trailing_shape"], dtype=specification["dtype"]))
+            np.save(os.path.join(shard_dir, f"{name}_offsets.npy"), offsets)
+        self.shard_sizes.append(len(self.items_in_current_shard))
+        self.items_in_current_shard = list()
+
+
+class ShardedCache:
+    """
+    Read access to a cache written by ShardedCacheWriter. Opening it
+    only reads the index, the arrays of a shard are memory mapped
+    the first time an item from that shard is requested, so only
+    the parts of the cache that are actually used end up in RAM.
+
+    Items are addressed by their ID, which is their position in the
+    order in which they were written. Removing items only marks them
+    as unused in the index, the shards are never rewritten.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        index = torch.load(os.path.join(path, "index.pt"), map_location="cpu")
+        self.array_fields = index["array_fields"]
+        self.metadata = index["metadata"]
+        self.shard_sizes = index["shard_sizes"]
+        self.shard_starts = np.cumsum([0] + self.shard_sizes).tolist()
+        self.item_ids = index["item_ids"] if index["item_ids"] is not None else list(range(self.shard_starts[-1]))
+        self.opened_arrays = dict()
+
+    def __getstate__(self):
+        # memory maps should not be sent to other processes, every process opens them again for itself
+        state = self.__dict__.copy()
+        state["opened_arrays"] = dict()
+        return state
+
+    def __len__(self):
+        return len(self.item_ids)
+
+    def get(self, item_id):
+        shard = bisect.bisect_right(self.shard_starts, item_id) - 1
+        position_in_shard = item_id - self.shard_starts[shard]
+        item = dict()
+        for name in self.array_fields:
+            data, offsets = self._get_arrays(shard, name)
+            item[name] = torch.from_numpy(np.array(data[offsets[position_in_shard]:offsets[position_in_shard + 1]]))
+        for name, values in self.metadata.items():
+            item[name] = values[item_id]
+        return item
+
+    def get_lengths(self, name, item_ids=None):
+        """
+        The length of the field name of the given items (by default all
+        that are in use), taken from the offsets, so no data is read.
+        """
+        lengths = list()
+        for shard in range(len(self.shard_sizes)):
+            offsets = np.load(os.path.join(self.path, f"shard_{shard:05d}", f"{name}_offsets.npy"))
+            lengths.extend(np.diff(offsets).tolist())
+        return [lengths[item_id] for item_id in (item_ids if item_ids is not None else self.item_ids)]
+
+    def remove(self, item_ids_to_remove):
+        item_ids_to_remove = set(item_ids_to_remove)
+        self.item_ids = [item_id for item_id in self.item_ids if item_id not in item_ids_to_remove]
+        index = torch.load(os.path.join(self.path, "index.pt"), map_location="cpu")
+        index["item_ids"] = self.item_ids
+        torch.save(index, os.path.join(self.path, "index.pt.tmp"))
+        os.replace(os.path.join(self.path, "index.pt.tmp"), os.path.join(self.path, "index.pt"))
+
+    def _get_arrays(self, shard, name):
+        if (shard, name) not in self.opened_arrays:
+            shard_dir = os.path.join(self.path, f"shard_{shard:05d}")
+            offsets = np.load(os.path.join(shard_dir, f"{name}_offsets.npy"))
+            data = np.load(os.path.join(shard_dir, f"{name}.npy"), mmap_mode="r" if offsets[-1] > 0 else None)  # empty files cannot be memory mapped
+            self.opened_arrays[(shard, name)] = (data, offsets)
+        return self.opened_arrays[(shard, name)]
@@ -0,0 +1,174 @@
+import atexit
+import io
+import os
+import tarfile
+import zipfile
+
+import soundfile as sf
+
+from Utility.manifest_cache import cached_manifest
+
+ARCHIVE_EXTENSIONS = (".tar", ".zip")  # compressed tars (.tar.gz etc.) can't be read at random positions, they need to be decompressed to a .tar first
+
+_archive_of_directory = dict()
+_opened_archives = dict()
+_members_of_archive = dict()
+
+
+def read_audio(path):
+    """
+    Like soundfile.read, but the path can also point into a tar or zip
+    archive, e.g. /corpora/corpus.tar/speaker_1/0001.wav is the member
+    speaker_1/0001.wav of the archive /corpora/corpus.tar. This way,
+    corpora don't need to be extracted to millions of small files.
+    """
+    if split_archive_path(path) is None:
+        return sf.read(path)
+    return sf.read(io.BytesIO(read_bytes(path)))
+
+
+def read_bytes(path):
+    """
+    The content of a file, which can also be a member of an archive
+    (see read_audio), e.g. the transcripts of a corpus.
+    """
+    archive_path_and_member = split_archive_path(path)
+    if archive_path_and_member is None:
+        with open(path, "rb") as file:
+            return file.read()
+    archive_path, member = archive_path_and_member
+    archive = _get_opened_archive(archive_path)
+    if isinstance(archive, zipfile.ZipFile):
+        return archive.read(member)
+    file_descriptor, members = archive
+    offset, size = members[member]
+    return os.pread(file_descriptor, size, offset)  # doesn't move the file position, so threads reading from the same archive don't get in each other's way
+
+
+def list_archive(archive_path):
+    """
+    The paths of all files in an archive, in the form that read_audio
+    and read_bytes understand.
+    """
+    return [os.path.join(archive_path, member) for member in _get_members(archive_path)]
+
+
+def index_archives(paths):
+    """
+    Makes sure the archives that the paths point into are indexed on
+    the disk, e.g. before worker processes that read from them are
+    started, so they don't all index the same archives at once.
+    """
+    for archive_path in {archive_path_and_member[0] for archive_path_and_member in map(split_archive_path, paths) if archive_path_and_member is not None}:
+        _get_members(archive_path)
+
+
+def split_archive_path(path):
+    """
+    The path of the archive and the name of the member, if the path
+    points into an archive, otherwise None.
+    """
+    directory = os.path.dirname(path)
+    if directory not in _archive_of_directory:
+        _archive_of_directory[directory] = None
+        parent = directory
+        while parent not in ("", os.path.dirname(parent)) and not os.path.isdir(parent):
+            if parent.endswith(ARCHIVE_EXTENSIONS) and os.path.isfile(parent):
+                _archive_of_directory[directory] = parent
+                break
+            parent = os.path.dirname(parent)
+    archive_path = _archive_of_directory[directory]
+    if archive_path is None:
+        return None
+    return archive_path, os.path.relpath(path, archive_path).replace(os.sep, "/")
+
+
+def get_archive_member_signature(path):
+    """
+    Size and modification time of the archive, together with the size
+    of the member, if the path points into an archive, otherwise None.
+    """
+    archive_path_and_member = split_archive_path(path)
+    if archive_path_and_member is None:
+        return None
+    archive_path, member = archive_path_and_member
+    archive_stats = os.stat(archive_path)
+    return archive_stats.st_size, archive_stats.st_mtime_ns, _get_members(archive_path).get(member, (None, None))[1]
+
+
+def _get_opened_archive(archive_path):
+    # every process opens the archives for itself, a zip file object must not be shared between processes
+    if _opened_archives.get(archive_path, (None, None))[0] != os.getpid():
+        if archive_path.endswith(".zip"):
+            archive = zipfile.ZipFile(archive_path)
+        else:
+            archive = (os.open(archive_path, os.O_RDONLY), _get_members(archive_path))
+            atexit.register(os.close, archive[0])
+        _opened_archives[archive_path] = (os.getpid(), archive)
+    return _opened_archives[archive_path][1]
+
+
+def _get_members(archive_path):
+    if archive_path not in _members_of_archive:
+        _members_of_archive[archive_path] = _index_archive(os.path.abspath(archive_path))
+    return _members_of_archive[archive_path]
+
+
+@cached_manifest(sources=lambda archive_path: [archive_path])
+def _index_archive(archive_path):
+    """
+    Where the data of every file in the archive starts (only for tars)
+    and how large it is. Going through the headers of a large tar
+    takes a while, so this is remembered on the disk until the archive
+    changes.
+    """
+    members = dict()
+    with open(archive_path, "rb") as archive_file:
+        if archive_path.endswith(".zip"):
+            with zipfile.ZipFile(archive_file) as archive:
+                for member in archive.infolist():
+                    if not member.is_dir():
+                        members[member.filename] = (None, member.file_size)  # members of a zip are read through zipfile, which finds their data itself
+        else:
+            with tarfile.open(fileobj=archive_file, mode="r:") as archive:
+                for member in archive:
+                    if member.isfile():
+                        members[os.path.normpath(member.name)] = (member.offset_data, member.size)
+    return members
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    import numpy
+
+    import Utility.manifest_cache
+
+    # a tiny corpus, once as a directory and once in a tar and a zip, has to be read the same way from all of them
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        Utility.manifest_cache.MANIFEST_CACHE_DIR = os.path.join(temporary_directory, "manifest_cache")  # the indexes of the test archives should not stay around
+        corpus_dir = os.path.join(temporary_directory, "corpus")
+        os.makedirs(os.path.join(corpus_dir, "speaker_1"))
+        test_wave = numpy.sin(numpy.arange(16000) / 10)
+        sf.write(os.path.join(corpus_dir, "speaker_1", "0001.wav"), test_wave, 16000, subtype="PCM_16")
+        with open(os.path.join(corpus_dir, "transcripts.txt"), "w", encoding="utf8") as transcript_file:
+            transcript_file.write("0001|hello world")
+        with tarfile.open(os.path.join(temporary_directory, "corpus.tar"), "w") as tar_archive:
+            tar_archive.add(os.path.join(corpus_dir, "speaker_1"), arcname="speaker_1")
+            tar_archive.add(os.path.join(corpus_dir, "transcripts.txt"), arcname="transcripts.txt")
+        with zipfile.ZipFile(os.path.join(temporary_directory, "corpus.zip"), "w") as zip_archive:
+            zip_archive.write(os.path.join(corpus_dir, "speaker_1", "0001.wav"), arcname="speaker_1/0001.wav")
+            zip_archive.write(os.path.join(corpus_dir, "transcripts.txt"), arcname="transcripts.txt")
+        reference_wave, reference_sr = read_audio(os.path.join(corpus_dir, "speaker_1", "0001.wav"))
+        assert split_archive_path(os.path.join(corpus_dir, "speaker_1", "0001.wav")) is None
+        assert get_archive_member_signature(os.path.join(corpus_dir, "speaker_1", "0001.wav")) is None
+        for archive_path in [os.path.join(temporary_directory, "corpus.tar"), os.path.join(temporary_directory, "corpus.zip")]:
+            index_archives(list_archive(archive_path))
+            assert sorted(list_archive(archive_path)) == [os.path.join(archive_path, "speaker_1", "0001.wav"), os.path.join(archive_path, "transcripts.txt")]
+            assert split_archive_path(os.path.join(archive_path, "speaker_1", "0001.wav")) == (archive_path, "speaker_1/0001.wav")
+            wave, sr = read_audio(os.path.join(archive_path, "speaker_1", "0001.wav"))
+            assert sr == reference_sr and numpy.array_equal(wave, reference_wave)
+            assert read_bytes(os.path.join(archive_path, "transcripts.txt")).decode("utf8") == "0001|hello world"
+            archive_stats = os.stat(archive_path)
+            assert get_archive_member_signature(os.path.join(archive_path, "transcripts.txt")) == (archive_stats.st_size, archive_stats.st_mtime_ns, len("0001|hello world"))
+        print("reading from archives works")
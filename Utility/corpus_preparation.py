@@ -2,8 +2,10 @@ import torch.multiprocessing
 from huggingface_hub import hf_hub_download
 
 from Modules.Aligner.CodecAlignerDataset import CodecAlignerDataset
+from Modules.Aligner.CodecAlignerDataset import aligner_cache_exists
 from Modules.Aligner.autoaligner_train_loop import train_loop as train_aligner
 from Modules.ToucanTTS.TTSDataset import TTSDataset
+from Modules.ToucanTTS.TTSDataset import tts_cache_exists
 from Utility.path_to_transcript_dicts import *
 from Utility.storage_config import MODEL_DIR
 
@@ -30,7 +32,9 @@ def prepare_tts_corpus(transcript_dict,
                        phone_input=False,
                        save_imgs=False,
                        gpu_count=1,
-                       rank=0):
+                       rank=0,
+                       precompute_mels=False,  # trades disk space for not having to decode the codec indexes in every training step
+                       corpus_index=None):  # a TTSCorpusIndex, with it the dataset is only opened once its datapoints are accessed, which speeds up runs with hundreds of corpora
     """
     create an aligner dataset,
     fine-tune an aligner,
@@ -39,12 +43,14 @@ def prepare_tts_corpus(transcript_dict,
 
     Automatically skips parts that have been done before.
     """
-    if not os.path.exists(os.path.join(corpus_dir, "tts_train_cache.pt")):
+    if corpus_index is not None and tts_cache_exists(corpus_dir) and not precompute_mels:
+        return corpus_index.get_dataset(corpus_dir, lang=lang, gpu_count=gpu_count, rank=rank)
+    if not tts_cache_exists(corpus_dir):
         if fine_tune_aligner:
             aligner_dir = os.path.join(corpus_dir, "Aligner")
             aligner_loc = os.path.join(corpus_dir, "Aligner", "aligner.pt")
 
-            if not os.path.exists(os.path.join(corpus_dir, "aligner_train_cache.pt")):
+            if not aligner_cache_exists(corpus_dir):
                 prepare_aligner_corpus(transcript_dict, corpus_dir=corpus_dir, lang=lang, phone_input=phone_input, device=torch.device("cuda"))
 
             if not os.path.exists(os.path.join(aligner_dir, "aligner.pt")):
@@ -63,11 +69,15 @@ def prepare_tts_corpus(transcript_dict,
             aligner_loc = hf_hub_download(cache_dir=MODEL_DIR, repo_id="Flux9665/ToucanTTS", filename="Aligner.pt")
     else:
         aligner_loc = None
-    return TTSDataset(transcript_dict,
-                      acoustic_checkpoint_path=aligner_loc,
-                      cache_dir=corpus_dir,
-                      device=torch.device("cuda"),
-                      lang=lang,
-                      save_imgs=save_imgs,
-                      gpu_count=gpu_count,
-                      rank=rank)
+    dataset = TTSDataset(transcript_dict,
+                         acoustic_checkpoint_path=aligner_loc,
+                         cache_dir=corpus_dir,
+                         device=torch.device("cuda"),
+                         lang=lang,
+                         save_imgs=save_imgs,
+                         gpu_count=gpu_count,
+                         rank=rank,
+                         precompute_mels=precompute_mels)
+    if corpus_index is not None:
+        return corpus_index.get_dataset(corpus_dir, lang=lang, gpu_count=gpu_count, rank=rank)
+    return dataset
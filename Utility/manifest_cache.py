@@ -0,0 +1,92 @@
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+
+from Utility.storage_config import PREPROCESSING_DIR
+
+MANIFEST_CACHE_DIR = os.path.join(PREPROCESSING_DIR, "manifest_cache")
+AUDIO_EXTENSIONS = (".wav", ".flac", ".mp3", ".ogg", ".opus", ".m4a", ".3gp", ".pcm")
+MANIFEST_CACHE_VERSION = 1  # increase this to rebuild all manifests, e.g. after changing code that builders import from other modules
+
+
+def cached_manifest(sources):
+    """
+    Decorator that remembers the result of a function that builds a
+    path to transcript dict on the disk. sources gets the arguments
+    of the builder by name and returns the files and directories
+    that the result is built from, i.e. the metadata files it reads
+    and the directories it lists or looks up audio files in. The next
+    time the builder is called with the same arguments, the result is
+    loaded from the disk, unless one of the sources has been modified
+    since (see get_fingerprint), or the code of the module that the
+    builder is defined in has changed. If sources returns None, the
+    builder just runs every time, without storing its result.
+    """
+
+    def decorator(builder):
+        module_hash = hashlib.sha256(inspect.getsource(inspect.getmodule(builder)).encode("utf8")).hexdigest()  # also covers the helpers and templates that the builder calls
+        signature = inspect.signature(builder)
+
+        @functools.wraps(builder)
+        def cached_builder(*args, **kwargs):
+            arguments = signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            paths = sources(**arguments.arguments)
+            if paths is None:
+                return builder(*args, **kwargs)
+            paths = sorted({os.path.abspath(path) for path in paths})
+            call_signature = hashlib.sha256(repr((MANIFEST_CACHE_VERSION, module_hash, builder.__qualname__, sorted(arguments.arguments.items()), paths)).encode("utf8")).hexdigest()[:16]
+            manifest_path = os.path.join(MANIFEST_CACHE_DIR, f"{builder.__name__}_{call_signature}.pkl")
+            if os.path.exists(manifest_path):
+                try:
+                    with open(manifest_path, "rb") as manifest_file:
+                        fingerprint, path_to_transcript = pickle.load(manifest_file)
+                except Exception:  # e.g. a manifest that was cut off, it just gets built again
+                    fingerprint = None
+                if fingerprint is not None and get_fingerprint(paths) == fingerprint:
+                    return path_to_transcript
+
+            fingerprint = get_fingerprint(paths)  # taken before building, so changes while the builder runs are noticed next time
+            path_to_transcript = builder(*args, **kwargs)
+            os.makedirs(MANIFEST_CACHE_DIR, exist_ok=True)
+            with open(f"{manifest_path}.{os.getpid()}.tmp", "wb") as manifest_file:  # several processes might build the same manifest at the same time
+                pickle.dump((fingerprint, path_to_transcript), manifest_file)
+            os.replace(f"{manifest_path}.{os.getpid()}.tmp", manifest_path)
+            return path_to_transcript
+
+        return cached_builder
+
+    return decorator
+
+
+def get_fingerprint(paths):
+    """
+    A hash of the size and modification time of every path. Directories
+    are gone through recursively, with the modification time of every
+    directory in them (which changes when files are added or removed)
+    and the size and modification time of every file in them that is
+    not audio, so edited metadata is noticed anywhere in the corpus.
+    Audio files are not looked at one by one, since a changed recording
+    does not change the path to transcript dict.
+    """
+    fingerprint = list()
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, files in os.walk(path):
+                fingerprint.append((directory, _get_stats(directory)))
+                for file in files:
+                    if not file.lower().endswith(AUDIO_EXTENSIONS):
+                        fingerprint.append((os.path.join(directory, file), _get_stats(os.path.join(directory, file))))
+        else:
+            fingerprint.append((path, _get_stats(path)))
+    return hashlib.sha256(repr(sorted(fingerprint)).encode("utf8")).hexdigest()
+
+
+def _get_stats(path):
+    try:
+        stats = os.stat(path)
+        return stats.st_size, stats.st_mtime_ns
+    except OSError:  # e.g. a source that doesn't exist (yet)
+        return None
@@ -6,6 +6,8 @@ import xml.etree.ElementTree as ET
 from csv import DictReader
 from pathlib import Path
 
+from Utility.manifest_cache import cached_manifest
+
 
 # HELPER FUNCTIONS
 
@@ -34,6 +36,7 @@ def limit_to_n(path_to_transcript, n=40000):
         return path_to_transcript
 
 
+@cached_manifest(sources=lambda root: [os.path.join(root, "transcripts.txt")])
 def build_path_to_transcript_multi_ling_librispeech_template(root):
     """
     https://arxiv.org/abs/2012.03411
@@ -50,6 +53,7 @@ def build_path_to_transcript_multi_ling_librispeech_template(root):
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda root: [root])
 def build_path_to_transcript_hui_template(root):
     """
     https://arxiv.org/abs/2106.06309
@@ -68,6 +72,7 @@ def build_path_to_transcript_hui_template(root):
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda root, lang: [f"{root}/{lang}/metadata_test.json", f"{root}/{lang}/metadata_train.json"])
 def indic_voices_template(root, lang):
     path_to_transcript = dict()
     transcripts = list()
@@ -87,6 +92,7 @@ def indic_voices_template(root, lang):
 
 # ENGLISH
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/EARS/"])
 def build_path_to_transcript_ears():
     transcript_for_ears = {
         "emo_adoration_sentences"     : "You're just the sweetest person I know and I am so happy to call you my friend. I had the best time with you, I just adore you. I love this gift, thank you!",
@@ -222,6 +228,7 @@ def build_path_to_transcript_mls_english():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/GigaSpeech/transcripts_only_clean_samples.txt"])
 def build_path_to_transcript_gigaspeech():
     root = "/mount/resources/speech/corpora/GigaSpeech/"
     path_to_transcript = dict()
@@ -236,6 +243,7 @@ def build_path_to_transcript_gigaspeech():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/MAILabs_british_single_speaker_elizabeth"])
 def build_path_to_transcript_elizabeth():
     root = "/mount/resources/speech/corpora/MAILabs_british_single_speaker_elizabeth"
     path_to_transcript = dict()
@@ -252,6 +260,7 @@ def build_path_to_transcript_elizabeth():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/NancyKrebs/metadata.csv", "/mount/resources/speech/corpora/NancyKrebs/wav"])
 def build_path_to_transcript_nancy():
     root = "/mount/resources/speech/corpora/NancyKrebs"
     path_to_transcript = dict()
@@ -266,6 +275,7 @@ def build_path_to_transcript_nancy():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda re_cache: ["/mount/resources/speech/corpora/NancyKrebs/metadata.csv", "/mount/resources/speech/corpora/NancyKrebs/wav"])
 def build_path_to_transcript_integration_test(re_cache=True):
     root = "/mount/resources/speech/corpora/NancyKrebs"
     path_to_transcript = dict()
@@ -280,6 +290,7 @@ def build_path_to_transcript_integration_test(re_cache=True):
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/CREMA_D/"])
 def build_path_to_transcript_CREMA_D():
     root = "/mount/resources/speech/corpora/CREMA_D/"
 
@@ -302,6 +313,7 @@ def build_path_to_transcript_CREMA_D():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/EmoV_DB/"])
 def build_path_to_transcript_EmoV_DB():
     root = "/mount/resources/speech/corpora/EmoV_DB/"
     path_to_transcript = dict()
@@ -317,6 +329,7 @@ def build_path_to_transcript_EmoV_DB():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/RyanSpeech/metadata.csv"])
 def build_path_to_transcript_ryanspeech():
     root = "/mount/resources/speech/corpora/RyanSpeech"
     path_to_transcript = dict()
@@ -330,6 +343,7 @@ def build_path_to_transcript_ryanspeech():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/RAVDESS"])
 def build_path_to_transcript_RAVDESS():
     root = "/mount/resources/speech/corpora/RAVDESS"
 
@@ -343,6 +357,7 @@ def build_path_to_transcript_RAVDESS():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/Emotional_Speech_Dataset_Singapore"])
 def build_path_to_transcript_ESDS():
     root = "/mount/resources/speech/corpora/Emotional_Speech_Dataset_Singapore"
 
@@ -360,6 +375,7 @@ def build_path_to_transcript_ESDS():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: [f"/mount/resources/speech/corpora/hi_fi_tts_v0/{speaker}_manifest_clean_{split}.json" for speaker in ["6097", "9017", "92"] for split in ["dev", "test", "train"]])
 def build_path_to_transcript_nvidia_hifitts():
     root = "/mount/resources/speech/corpora/hi_fi_tts_v0"
 
@@ -386,6 +402,7 @@ def build_path_to_transcript_nvidia_hifitts():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/Blizzard2013/train/segmented/prompts.gui"])
 def build_path_to_transcript_blizzard_2013():
     root = "/mount/resources/speech/corpora/Blizzard2013/train/segmented/"
     path_to_transcript = dict()
@@ -403,6 +420,7 @@ def build_path_to_transcript_blizzard_2013():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/VCTK/txt", "/mount/resources/speech/corpora/VCTK/wav48_silence_trimmed"])
 def build_path_to_transcript_vctk():
     root = "/mount/resources/speech/corpora/VCTK"
     path_to_transcript = dict()
@@ -419,6 +437,7 @@ def build_path_to_transcript_vctk():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/LibriTTS_R/"])
 def build_path_to_transcript_libritts_all_clean():
     root = "/mount/resources/speech/corpora/LibriTTS_R/"
     path_train = "/mount/resources/speech/corpora/LibriTTS_R/"  # using all files from the "clean" subsets from LibriTTS-R https://arxiv.org/abs/2305.18802
@@ -434,6 +453,7 @@ def build_path_to_transcript_libritts_all_clean():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/asr-data/LibriTTS/train-other-500"])
 def build_path_to_transcript_libritts_other500():
     root = "/mount/resources/asr-data/LibriTTS/train-other-500"
     path_train = "/mount/resources/asr-data/LibriTTS/train-other-500"
@@ -449,6 +469,7 @@ def build_path_to_transcript_libritts_other500():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/LJSpeech/16kHz/txt"])
 def build_path_to_transcript_ljspeech():
     root = "/mount/resources/speech/corpora/LJSpeech/"
     path_to_transcript = dict()
@@ -460,6 +481,7 @@ def build_path_to_transcript_ljspeech():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/Jenny/metadata.csv"])
 def build_path_to_transcript_jenny():
     """
     https://www.kaggle.com/datasets/noml4u/jenny-tts-dataset
@@ -525,6 +547,7 @@ def build_path_to_transcript_hui_others():
     return pttd
 
 
+@cached_manifest(sources=lambda: [f"/mount/resources/speech/corpora/ThorstenDatasets/thorsten-de_v03/metadata_{split}.csv" for split in ["train", "val"]])
 def build_path_to_transcript_thorsten_neutral():
     root = "/mount/resources/speech/corpora/ThorstenDatasets/thorsten-de_v03"
     path_to_transcript = dict()
@@ -540,6 +563,7 @@ def build_path_to_transcript_thorsten_neutral():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: [f"/mount/resources/speech/corpora/ThorstenDatasets/ThorstenVoice-Dataset_2022.10/metadata_{split}.csv" for split in ["train", "dev", "test"]])
 def build_path_to_transcript_thorsten_2022_10():
     root = "/mount/resources/speech/corpora/ThorstenDatasets/ThorstenVoice-Dataset_2022.10"
     path_to_transcript = dict()
@@ -557,6 +581,7 @@ def build_path_to_transcript_thorsten_2022_10():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/ThorstenDatasets/thorsten-emotional_v02/thorsten-emotional-metadata.csv"])
 def build_path_to_transcript_thorsten_emotional():
     root = "/mount/resources/speech/corpora/ThorstenDatasets/thorsten-emotional_v02"
     path_to_transcript = dict()
@@ -583,6 +608,7 @@ def build_path_to_transcript_mls_french():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/Blizzard2023/AD_silence_removed"])
 def build_path_to_transcript_blizzard2023_ad_silence_removed():
     root = "/mount/resources/speech/corpora/Blizzard2023/AD_silence_removed"
     path_to_transcript = dict()
@@ -597,6 +623,7 @@ def build_path_to_transcript_blizzard2023_ad_silence_removed():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/Blizzard2023/NEB_silence_removed"])
 def build_path_to_transcript_blizzard2023_neb_silence_removed():
     root = "/mount/resources/speech/corpora/Blizzard2023/NEB_silence_removed"
     path_to_transcript = dict()
@@ -611,6 +638,7 @@ def build_path_to_transcript_blizzard2023_neb_silence_removed():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/Blizzard2023/enhanced_NEB_subset_silence_removed"])
 def build_path_to_transcript_blizzard2023_neb_e_silence_removed():
     root = "/mount/resources/speech/corpora/Blizzard2023/enhanced_NEB_subset_silence_removed"
     path_to_transcript = dict()
@@ -625,6 +653,7 @@ def build_path_to_transcript_blizzard2023_neb_e_silence_removed():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/synpaflex-corpus/5/v0.1/"])
 def build_path_to_transcript_synpaflex_norm_subset():
     """
     Contributed by https://github.com/tomschelsen
@@ -641,6 +670,7 @@ def build_path_to_transcript_synpaflex_norm_subset():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/SiwisFrenchSpeechSynthesisDatabase/"])
 def build_path_to_transcript_siwis_subset():
     """
     Contributed by https://github.com/tomschelsen
@@ -660,6 +690,7 @@ def build_path_to_transcript_siwis_subset():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/CSS10/french/transcript.txt"])
 def build_path_to_transcript_css10fr():
     language = "french"
     root = f"/mount/resources/speech/corpora/CSS10/{language}"
@@ -683,6 +714,7 @@ def build_path_to_transcript_mls_spanish():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/CSS10/spanish/transcript.txt"])
 def build_path_to_transcript_css10es():
     language = "spanish"
     root = f"/mount/resources/speech/corpora/CSS10/{language}"
@@ -697,6 +729,7 @@ def build_path_to_transcript_css10es():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/Blizzard2021/spanish_blizzard_release_2021_v2/hub/train_text.txt", "/mount/resources/speech/corpora/Blizzard2021/spanish_blizzard_release_2021_v2/hub/train_wav"])
 def build_path_to_transcript_spanish_blizzard_train():
     root = "/mount/resources/speech/corpora/Blizzard2021/spanish_blizzard_release_2021_v2/hub"
     path_to_transcript = dict()
@@ -747,6 +780,7 @@ def build_path_to_transcript_mls_dutch():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/CSS10/dutch/transcript.txt"])
 def build_path_to_transcript_css10nl():
     language = "dutch"
     root = f"/mount/resources/speech/corpora/CSS10/{language}"
@@ -763,6 +797,7 @@ def build_path_to_transcript_css10nl():
 
 # GREEK
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/CSS10/greek/transcript.txt"])
 def build_path_to_transcript_css10el():
     language = "greek"
     root = f"/mount/resources/speech/corpora/CSS10/{language}"
@@ -779,6 +814,7 @@ def build_path_to_transcript_css10el():
 
 # FINNISH
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/CSS10/finnish/transcript.txt"])
 def build_path_to_transcript_css10fi():
     language = "finnish"
     root = f"/mount/resources/speech/corpora/CSS10/{language}"
@@ -796,6 +832,7 @@ def build_path_to_transcript_css10fi():
 # VIETNAMESE
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/VIVOS_vietnamese/train/prompts.txt"])
 def build_path_to_transcript_VIVOS_viet():
     root = "/mount/resources/speech/corpora/VIVOS_vietnamese/train"
     path_to_transcript = dict()
@@ -809,6 +846,7 @@ def build_path_to_transcript_VIVOS_viet():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/VietTTS/meta_data.tsv"])
 def build_path_to_transcript_vietTTS():
     root = "/mount/resources/speech/corpora/VietTTS"
     path_to_transcript = dict()
@@ -825,6 +863,7 @@ def build_path_to_transcript_vietTTS():
 
 # CHINESE
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/aishell3/train/label_train-set.txt"])
 def build_path_to_transcript_aishell3():
     root = "/mount/resources/speech/corpora/aishell3/train"
     path_to_transcript = dict()
@@ -839,6 +878,7 @@ def build_path_to_transcript_aishell3():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/CSS10/chinese/transcript.txt"])
 def build_path_to_transcript_css10cmn():
     language = "chinese"
     root = f"/mount/resources/speech/corpora/CSS10/{language}"
@@ -854,6 +894,7 @@ def build_path_to_transcript_css10cmn():
 
 # RUSSIAN
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/CSS10/russian/transcript.txt"])
 def build_path_to_transcript_css10ru():
     language = "russian"
     root = f"/mount/resources/speech/corpora/CSS10/{language}"
@@ -870,6 +911,7 @@ def build_path_to_transcript_css10ru():
 
 # HUNGARIAN
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/CSS10/hungarian/transcript.txt"])
 def build_path_to_transcript_css10hu():
     language = "hungarian"
     root = f"/mount/resources/speech/corpora/CSS10/{language}"
@@ -887,6 +929,7 @@ def build_path_to_transcript_css10hu():
 
 # JAPANESE
 
+@cached_manifest(sources=lambda: [f"/mount/resources/speech/corpora/HiFiCaptainJapanese/{gender}/{kind}/train_parallel{extension}" for gender in ["male", "female"] for kind, extension in [("text", ".txt"), ("wav", "")]])
 def build_path_to_transcript_captain_japanese():
     root = "/mount/resources/speech/corpora/HiFiCaptainJapanese"
     path_to_transcript = dict()
@@ -917,6 +960,7 @@ def build_path_to_transcript_captain_japanese():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ["/mount/resources/speech/corpora/JVS/jvs_ver1"])
 def build_path_to_transcript_jvs():
     root = "/mount/resources/speech/corpora/JVS/jvs_ver1"
     path_to_transcript = dict()
@@ -1105,6 +1149,7 @@ def build_file_list_singing_voice_audio_database():
     return file_list
 
 
+@cached_manifest(sources=lambda: ['/resources/speech/corpora/NST_norwegian/pcm/cs'])
 def build_path_to_transcript_nst_norwegian():
     root = '/resources/speech/corpora/NST_norwegian/pcm/cs'
     path_to_transcript = dict()
@@ -1119,6 +1164,7 @@ def build_path_to_transcript_nst_norwegian():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ['/resources/speech/corpora/NST_swedish/sw_pcms/mf', '/resources/speech/corpora/NST_swedish/sw_pcms/scripts/mf/sw_all'])
 def build_path_to_transcript_nst_swedish():
     root = '/resources/speech/corpora/NST_swedish/sw_pcms'
     path_to_transcript = dict()
@@ -1188,6 +1234,7 @@ def build_path_to_transcript_nchlt_zul():
     return build_path_to_transcript_nchlt_template(root, lang_code='zul')
 
 
+@cached_manifest(sources=lambda root, lang_code: [f'{root}/transcriptions/nchlt_{lang_code}.{split}.xml' for split in ['trn', 'tst']])
 def build_path_to_transcript_nchlt_template(root, lang_code):
     path_to_transcript = dict()
     base_dir = Path(root).parent
@@ -1205,6 +1252,7 @@ def build_path_to_transcript_nchlt_template(root, lang_code):
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ['/resources/speech/corpora/BibleTTS/akuapem-twi'])
 def build_path_to_transcript_bibletts_akuapem_twi():
     path_to_transcript = dict()
     root = '/resources/speech/corpora/BibleTTS/akuapem-twi'
@@ -1218,6 +1266,7 @@ def build_path_to_transcript_bibletts_akuapem_twi():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: [f'/resources/speech/corpora/BembaSpeech/bem/{split}.tsv' for split in ['train', 'dev', 'test']])
 def build_path_to_transcript_bembaspeech():
     root = '/resources/speech/corpora/BembaSpeech/bem'
     path_to_transcript = dict()
@@ -1248,6 +1297,7 @@ def build_path_to_transcript_alffa_am():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: [f'/resources/speech/corpora/ALFFA/data_readspeech_wo/data/{split}/text' for split in ['train', 'dev', 'test']])
 def build_path_to_transcript_alffa_wo():
     root = '/resources/speech/corpora/ALFFA/data_readspeech_wo/data'
     path_to_transcript = dict()
@@ -1264,6 +1314,7 @@ def build_path_to_transcript_alffa_wo():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: [f'/resources/speech/corpora/malayalam/line_index_{gender}.tsv' for gender in ['female', 'male']])
 def build_path_to_transcript_malayalam():
     root = '/resources/speech/corpora/malayalam'
     path_to_transcript = dict()
@@ -1277,6 +1328,7 @@ def build_path_to_transcript_malayalam():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ['/resources/speech/corpora/msc_reviewed_speech/metadata.tsv'])
 def build_path_to_transcript_msc():
     root = '/resources/speech/corpora/msc_reviewed_speech'
     path_to_transcript = dict()
@@ -1289,6 +1341,7 @@ def build_path_to_transcript_msc():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ['/resources/speech/corpora/chuvash/transcripts/txt', '/resources/speech/corpora/chuvash/audio/split'])
 def build_path_to_transcript_chuvash():
     root = '/resources/speech/corpora/chuvash'
     path_to_transcript = dict()
@@ -1314,6 +1367,7 @@ def build_path_to_transcript_iban():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda root, split, replace_in_path: [Path(root, split, 'wav.scp'), Path(root, split, 'text')])
 def build_path_to_transcript_kaldi_template(root, split, replace_in_path=None):
     path_to_transcript = dict()
 
@@ -1362,6 +1416,7 @@ def build_path_to_transcript_javanese_speech():
     return build_path_to_transcript_south_asian_languages_template(root)
 
 
+@cached_manifest(sources=lambda root: [Path(root, 'utt_spk_text.tsv')])
 def build_path_to_transcript_south_asian_languages_template(root):
     path_to_transcript = dict()
 
@@ -1441,6 +1496,7 @@ def build_path_to_transcript_african_voices_yoruba_opb():
     return build_path_to_transcript_african_voices_template(root)
 
 
+@cached_manifest(sources=lambda root: [Path(root, 'txt.done.data')])
 def build_path_to_transcript_african_voices_template(root):
     path_to_transcript = dict()
 
@@ -1469,6 +1525,7 @@ def build_path_to_transcript_zambezi_voice_tonga():
     return build_path_to_transcript_zambezi_voice_template(root)
 
 
+@cached_manifest(sources=lambda root: [Path(root, f'{split}.tsv') for split in ['train', 'dev', 'test']])
 def build_path_to_transcript_zambezi_voice_template(root):
     path_to_transcript = dict()
 
@@ -1481,6 +1538,7 @@ def build_path_to_transcript_zambezi_voice_template(root):
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda root: [Path(root, f'{split}.tsv') for split in ['train', 'dev', 'test']])
 def build_path_to_transcript_fleurs_template(root):
     path_to_transcript = dict()
 
@@ -2004,6 +2062,7 @@ def build_path_to_transcript_fleurs_zulu():
     return build_path_to_transcript_fleurs_template(root)
 
 
+@cached_manifest(sources=lambda root: [f'{root}/text.xml'])
 def build_path_to_transcript_living_audio_dataset_template(root):
     path_to_transcript = dict()
     tree = ET.parse(f'{root}/text.xml')
@@ -2031,6 +2090,7 @@ def build_path_to_transcript_living_audio_dataset_russian():
     return build_path_to_transcript_living_audio_dataset_template(root)
 
 
+@cached_manifest(sources=lambda: ['/resources/speech/corpora/RomanianDB'])
 def build_path_to_transcript_romanian_db():
     root = '/resources/speech/corpora/RomanianDB'
     path_to_transcript = dict()
@@ -2055,6 +2115,7 @@ def build_path_to_transcript_romanian_db():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ['/resources/speech/corpora/ShEMO'])
 def build_path_to_transcript_shemo():
     root = '/resources/speech/corpora/ShEMO'
     path_to_transcript = dict()
@@ -2070,6 +2131,7 @@ def build_path_to_transcript_shemo():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda root, lang: [root])
 def build_path_to_transcript_mslt_template(root, lang='en'):
     path_to_transcript = dict()
 
@@ -2104,6 +2166,7 @@ def build_path_to_transcript_mslt_chinese():
     return build_path_to_transcript_mslt_template(root, lang='ch')
 
 
+@cached_manifest(sources=lambda: ['/resources/speech/corpora/Rajasthani_Hindi_Speech/Hindi-Speech-Data'])
 def build_path_to_transcript_rajasthani_hindi_speech():
     root = '/resources/speech/corpora/Rajasthani_Hindi_Speech/Hindi-Speech-Data'
     path_to_transcript = dict()
@@ -2117,6 +2180,7 @@ def build_path_to_transcript_rajasthani_hindi_speech():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ['/resources/speech/corpora/cmu_arctic'])
 def build_path_to_transcript_cmu_arctic():
     root = '/resources/speech/corpora/cmu_arctic'
     path_to_transcript = dict()
@@ -2133,6 +2197,7 @@ def build_path_to_transcript_cmu_arctic():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: ['/resources/speech/corpora/sevil_tatar/sevil/metadata.jsonl'])
 def build_path_to_transcript_sevil_tatar():
     root = '/resources/speech/corpora/sevil_tatar/sevil'
     path_to_transcript = dict()
@@ -2145,6 +2210,7 @@ def build_path_to_transcript_sevil_tatar():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda: [f'/resources/speech/corpora/ClArTTS/{split}.txt' for split in ['training', 'validation']])
 def build_path_to_transcript_clartts():
     root = '/resources/speech/corpora/ClArTTS'
     path_to_transcript = dict()
@@ -2162,6 +2228,7 @@ def build_path_to_transcript_clartts():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda root, lang: [Path(root, 'experiments', lang, f'{split}.csv') for split in ['train_full', 'val_full', 'test_common']])
 def build_path_to_transcript_snow_mountain_template(root, lang):
     path_to_transcript = dict()
 
@@ -2265,6 +2332,7 @@ def build_path_to_transcript_snow_mountain_telugu():
     return build_path_to_transcript_snow_mountain_template(root, language)
 
 
+@cached_manifest(sources=lambda: ['/resources/speech/corpora/ukrainian_lada/dataset_lada/accept/metadata.jsonl'])
 def build_path_to_transcript_ukrainian_lada():
     root = '/resources/speech/corpora/ukrainian_lada/dataset_lada/accept'
     path_to_transcript = dict()
@@ -2277,6 +2345,7 @@ def build_path_to_transcript_ukrainian_lada():
     return path_to_transcript
 
 
+@cached_manifest(sources=lambda root: [root])
 def build_path_to_transcript_m_ailabs_template(root):
     path_to_transcript = dict()
 
@@ -2353,6 +2422,7 @@ def build_path_to_transcript_m_ailabs_ukrainian():
     return build_path_to_transcript_m_ailabs_template(root)
 
 
+@cached_manifest(sources=lambda root: [Path(root, f'{split}.csv') for split in ['train', 'dev', 'test']])
 def build_path_to_transcript_cml_tts_template(root):
     path_to_transcript = dict()
 
@@ -2400,6 +2470,7 @@ def build_path_to_transcript_cml_tts_spanish():
     return build_path_to_transcript_cml_tts_template(root)
 
 
+@cached_manifest(sources=lambda lang, root: [Path(root, 'bible_texts', f'{lang}.txt'), Path(root, 'bible_audios', lang)])
 def build_path_to_transcript_mms_template(lang, root='/resources/speech/corpora/mms_synthesized_bible_speech'):
     path_to_transcript = dict()
 
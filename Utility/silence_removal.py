@@ -4,43 +4,39 @@ import torch
 from tqdm import tqdm
 
 from Preprocessing.TextFrontend import get_feature_to_index_lookup
+from Preprocessing.VoiceActivityDetector import get_voice_activity_detector
+from Utility.audio_archives import read_audio
 from Utility.path_to_transcript_dicts import *
 
 
-def make_silence_cleaned_versions(train_sets):
-    torch.hub._validate_not_a_forked_repo = lambda a, b, c: True  # torch 1.9 has a bug in the hub loading, this is a workaround
-    # careful: assumes 16kHz or 8kHz audio
-    silero_model, utils = torch.hub.load(repo_or_dir='snakers4/silero-vad',
-                                         model='silero_vad',
-                                         force_reload=False,
-                                         onnx=False,
-                                         verbose=False)
-    (get_speech_timestamps,
-     save_audio,
-     read_audio,
-     VADIterator,
-     collect_chunks) = utils
-    torch.set_grad_enabled(True)  # finding this issue was very infuriating: silero sets
-    # this to false globally during model loading rather than using inference mode or no_grad
+def make_silence_cleaned_versions(train_sets, vad_batch_size=16):
     device = "cuda" if torch.cuda.is_available() else "cpu"
-    silero_model = silero_model.to(device)
+    vad = get_voice_activity_detector(device=device)
 
     for train_set in train_sets:
+        waves_of_batch = list()
+        speech_timestamps_of_batch = list()
         for index in tqdm(range(len(train_set))):
-            filepath = train_set.datapoints[index][8]
-            phonemes = train_set.datapoints[index][0]
-            speech_length = train_set.datapoints[index][3]
-            durations = train_set.datapoints[index][4]
+            if index % vad_batch_size == 0:
+                # the VAD scores the files of a batch together, the rest is done one file at a time
+                waves_of_batch = list()
+                for index_in_batch in range(index, min(index + vad_batch_size, len(train_set))):
+                    wave, sr = read_audio(train_set.get_datapoint(index_in_batch)[8])
+                    waves_of_batch.append((wave, sr, librosa.resample(wave, orig_sr=sr, target_sr=16000)))
+                speech_timestamps_of_batch = vad.speech_timestamps([torch.Tensor(resampled_wave) for _, _, resampled_wave in waves_of_batch], sampling_rate=16000)
+            datapoint = train_set.get_datapoint(index)
+            filepath = datapoint[8]
+            phonemes = datapoint[0]
+            speech_length = datapoint[3]
+            durations = datapoint[4]
             cumsum = 0
             legal_silences = list()
             for phoneme_index, phone in enumerate(phonemes):
                 if phone[get_feature_to_index_lookup()["silence"]] == 1 or phone[get_feature_to_index_lookup()["end of sentence"]] == 1 or phone[get_feature_to_index_lookup()["questionmark"]] == 1 or phone[get_feature_to_index_lookup()["exclamationmark"]] == 1 or phone[get_feature_to_index_lookup()["fullstop"]] == 1:
                     legal_silences.append([cumsum, cumsum + durations[phoneme_index]])
                 cumsum = cumsum + durations[phoneme_index]
-            wave, sr = sf.read(filepath)
-            resampled_wave = librosa.resample(wave, orig_sr=sr, target_sr=16000)
-            with torch.inference_mode():
-                speech_timestamps = get_speech_timestamps(torch.Tensor(resampled_wave).to(device), silero_model, sampling_rate=16000)
+            wave, sr, resampled_wave = waves_of_batch[index % vad_batch_size]
+            speech_timestamps = speech_timestamps_of_batch[index % vad_batch_size]
             silences = list()
             prev_end = 0
             for speech_segment in speech_timestamps:
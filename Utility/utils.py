@@ -171,6 +171,45 @@ def cumsum_durations(durations):
     return out, centers
 
 
+def average_by_duration(x, durations, x_lengths=None, only_positive=False):
+    """
+    Averages frame level values over the frames that belong to each
+    token, with one scatter_add over all frames instead of a slice per
+    token. Works on a single sequence (x [T], durations [N]) or on a
+    padded batch (x [B, T], durations [B, N]). Tokens with a duration
+    of 0, or without any frame that counts, get an average of 0.
+
+    Args:
+        x (Tensor): Frame level values.
+        durations (LongTensor): Number of frames of each token.
+        x_lengths (LongTensor, optional): Number of valid frames of each item in the batch.
+        only_positive (bool): Whether frames with values <= 0 (e.g. unvoiced frames in a pitch curve) are left out.
+
+    Returns:
+        Tensor: Token level averages with the shape of durations.
+
+    """
+    if x.dim() == 1:
+        return average_by_duration(x.unsqueeze(0), durations.unsqueeze(0),
+                                   x_lengths=None if x_lengths is None else torch.as_tensor(x_lengths).view(1),
+                                   only_positive=only_positive).squeeze(0)
+    number_of_tokens = durations.size(1)
+    segment_ends = durations.cumsum(dim=1)
+    frame_indexes = torch.arange(x.size(1), device=x.device).unsqueeze(0).expand(x.size(0), -1).contiguous()
+    # the token a frame belongs to is the first one that ends after it, frames after the last token end up at number_of_tokens
+    frame_to_token = torch.searchsorted(segment_ends.contiguous(), frame_indexes, right=True)
+    frame_counts = frame_to_token < number_of_tokens
+    if x_lengths is not None:
+        frame_counts = frame_counts & (frame_indexes < torch.as_tensor(x_lengths, device=x.device).view(-1, 1))
+    if only_positive:
+        frame_counts = frame_counts & x.gt(0.0)
+    frame_to_token = frame_to_token.clamp(max=number_of_tokens)
+    sums = x.new_zeros(x.size(0), number_of_tokens + 1, dtype=torch.float64).scatter_add_(1, frame_to_token, torch.where(frame_counts, x.double(), 0.0))
+    counts = x.new_zeros(x.size(0), number_of_tokens + 1, dtype=torch.float64).scatter_add_(1, frame_to_token, frame_counts.double())
+    averages = torch.where(counts > 0, sums / counts.clamp(min=1.0), 0.0)
+    return averages[:, :number_of_tokens].to(x.dtype)
+
+
 def delete_old_checkpoints(checkpoint_dir, keep=5):
     checkpoint_list = list()
     for el in os.listdir(checkpoint_dir):